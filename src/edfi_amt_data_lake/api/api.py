@@ -3,23 +3,28 @@
 # The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
 # See the LICENSE and NOTICES files in the project root for more information.
 
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any
 
-import requests
 from dagster import get_dagster_logger
 from decouple import config
 
+from edfi_amt_data_lake.api.checkpoint import (
+    EndpointCheckpoint,
+    clear_checkpoints,
+    load_checkpoint,
+    save_checkpoint,
+)
+from edfi_amt_data_lake.api.paging import get_pages
+from edfi_amt_data_lake.api.silver_merge import merge_endpoint
+from edfi_amt_data_lake.api.silver_writer import SilverFileWriter
+from edfi_amt_data_lake.helper.api_client import get_api_client
 from edfi_amt_data_lake.helper.base import PATH, JSONFile
 from edfi_amt_data_lake.helper.changeVersionValues import ChangeVersionValues
 from edfi_amt_data_lake.helper.data_model_values import data_model_values
-from edfi_amt_data_lake.helper.helper import (
-    get_endpoint,
-    get_headers,
-    get_url,
-    save_file,
-)
-from edfi_amt_data_lake.helper.token import get_token
+from edfi_amt_data_lake.helper.helper import get_endpoint, get_url
 
 API_LIMIT = config("API_LIMIT", cast=int)
 LIMIT = API_LIMIT if API_LIMIT else 500
@@ -45,8 +50,7 @@ def _get_api_data_models() -> list:
     url = f"{config('API_URL')}"
     result = []
     try:
-        verify_cert = config('REQUESTS_CERT_VERIFICATION', default=True, cast=bool)
-        response = requests.get(url, verify=verify_cert)
+        response = get_api_client().get(url)
         if response.ok:
             response_data = response.json()
             result = response_data["dataModels"]
@@ -84,56 +88,136 @@ def is_tpdm_supported() -> bool:
     return False
 
 
-# Get a response from the Ed-Fi API
-def _api_call(url: str, token: str, version: ChangeVersionValues) -> list:
+# Some endpoints could not be extracted. Their checkpoints were saved, so running
+# the extraction again resumes them.
+class ExtractionError(Exception):
+    pass
+
+
+# Get a response from the Ed-Fi API and write it to the silver file page by page.
+# Returns the number of records extracted.
+def _api_call(
+    url: str,
+    version: ChangeVersionValues,
+    school_year: str,
+    checkpoint_key: str,
+    json_file: JSONFile,
+    json_file_sufix: str
+) -> int:
     logger = get_dagster_logger()
-    offset = 0
-    result: list[Any]
-    result = []
-    loop = True
-    headers = get_headers(token)
+    checkpoint = load_checkpoint(school_year, checkpoint_key, version.newestChangeVersion)
+    writer = SilverFileWriter(json_file, json_file_sufix, school_year, checkpoint)
+    if writer.checkpoint.offset or writer.checkpoint.page_tokens:
+        logger.info(f"Resuming {url} after {writer.checkpoint.records} records.")
     change_version_parameters = (
         f"&minChangeVersion={version.oldestChangeVersion}&maxChangeVersion={version.newestChangeVersion}"
         if not config('DISABLE_CHANGE_VERSION', default=True, cast=bool)
         else ""
     )
     try:
-        while loop:
-            endpoint = (
-                f"{url}?limit={LIMIT}&offset={offset}{change_version_parameters}"
-            )
-            verify_cert = config('REQUESTS_CERT_VERIFICATION', default=True, cast=bool)
-            response = requests.get(endpoint, headers=headers, verify=verify_cert)
-            response_data = ''
-            if response.ok:
-                response_data = response.json()
-                result.extend(response_data)
-                offset += LIMIT
-            if len(response_data) == 0:
-                loop = False
+        get_pages(url, LIMIT, change_version_parameters, writer)
     except BaseException as err:
         logger.error(f"Unexpected {err=}, {type(err)=}")
-    return result
+        writer.abort()
+        raise
+    writer.close()
+    return writer.records
+
+
+def _get_max_concurrency() -> int:
+    import os
+    os_cpu = config("OS_CPU", cast=int) if config("OS_CPU", default="") else os.cpu_count()
+    max_concurrency = config("API_MAX_CONCURRENCY", default=os_cpu, cast=int)
+    return max(1, max_concurrency)
+
+
+# Extract a single endpoint and measure how long it took
+def _extract_endpoint(
+    url: str,
+    version: ChangeVersionValues,
+    school_year: str,
+    checkpoint_key: str,
+    json_file: JSONFile,
+    json_file_sufix: str
+) -> tuple:
+    start = time.perf_counter()
+    records = _api_call(url, version, school_year, checkpoint_key, json_file, json_file_sufix)
+    return records, time.perf_counter() - start
+
+
+# A window that starts at change version 0 has every record, as does an
+# extraction without change versions.
+def _is_full_extraction(version: ChangeVersionValues) -> bool:
+    if config('DISABLE_CHANGE_VERSION', default=True, cast=bool):
+        return True
+    return f"{version.oldestChangeVersion}" in ("", "0")
+
+
+# Merge the records and deletes extracted into the silver data of every endpoint.
+def _merge_endpoints(json_files: list, version: ChangeVersionValues, school_year: str) -> None:
+    full_extraction = _is_full_extraction(version)
+    with ThreadPoolExecutor(max_workers=_get_max_concurrency()) as executor:
+        list(executor.map(
+            lambda json_file: merge_endpoint(json_file, school_year, version.newestChangeVersion, full_extraction),
+            json_files
+        ))
 
 
 # Get JSON from API endpoint and save to file
 def api_async(school_year: Any = None) -> None:
-    import os
-    from multiprocessing import Pool
-    token = get_token()
+    logger = get_dagster_logger()
     version = _get_change_version_values(school_year)
-    os_cpu = config("OS_CPU", cast=int) if config("OS_CPU") else os.cpu_count()
-    with Pool(processes=os_cpu) as pool:
+    max_concurrency = _get_max_concurrency()
+    logger.info(f"Extracting endpoints with {max_concurrency} concurrent workers.")
+    start = time.perf_counter()
+    failed_endpoints = []
+    json_files = []
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        futures = {}
         for endpoint in get_endpoint():
             url = get_url(endpoint[PATH], f"{school_year}")
             url_name = JSONFile(url.split("/")[-1])
-            data_async = pool.apply_async(_api_call, args=(url, token, version))
-            save_file(url_name, version.newestChangeVersion, data_async.get(), f"{school_year}")
-
-            # Deletes endpoint
+            json_files.append(url_name)
             deletes_endpoint = get_url(endpoint[PATH], f"{school_year}", True)
-            data_deletes_response_async = pool.apply_async(_api_call, args=(deletes_endpoint, token, version))
-            save_file(url_name, f"deletes_{version.newestChangeVersion}", data_deletes_response_async.get(), f"{school_year}")
+            for endpoint_url, json_file_sufix, checkpoint_key in [
+                (url, f"{version.newestChangeVersion}", url_name.name),
+                # Deletes endpoint
+                (deletes_endpoint, f"deletes_{version.newestChangeVersion}", f"{url_name.name}_deletes")
+            ]:
+                if load_checkpoint(f"{school_year}", checkpoint_key, version.newestChangeVersion).completed:
+                    logger.info(f"Endpoint {url_name.name}({json_file_sufix}) already extracted.")
+                    continue
+                future = executor.submit(
+                    _extract_endpoint,
+                    endpoint_url,
+                    version,
+                    f"{school_year}",
+                    checkpoint_key,
+                    url_name,
+                    json_file_sufix
+                )
+                futures[future] = (url_name, json_file_sufix, checkpoint_key)
+
+        # Every endpoint is written while it is extracted, mark it as completed.
+        for future in as_completed(futures):
+            url_name, json_file_sufix, checkpoint_key = futures[future]
+            try:
+                records, elapsed = future.result()
+                save_checkpoint(
+                    f"{school_year}",
+                    EndpointCheckpoint(checkpoint_key, version.newestChangeVersion, completed=True)
+                )
+                logger.info(f"Endpoint {url_name.name}({json_file_sufix}) extracted: {records} records in {elapsed:.2f}s")
+            except Exception as ex:
+                failed_endpoints.append(f"{url_name.name}({json_file_sufix})")
+                logger.error(f"Endpoint {url_name.name}({json_file_sufix}) failed: {ex}, Traceback: {traceback.format_exc()}")
+    logger.info(f"Extracted {len(futures)} endpoints in {time.perf_counter() - start:.2f}s")
+    if failed_endpoints:
+        raise ExtractionError(
+            f"Endpoints not extracted: {', '.join(failed_endpoints)}. Run the extraction again to resume them."
+        )
+    _merge_endpoints(json_files, version, f"{school_year}")
+    clear_checkpoints(f"{school_year}")
     return None
 
 
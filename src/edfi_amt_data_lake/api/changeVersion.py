@@ -6,11 +6,10 @@
 import os
 from pathlib import Path
 
-import requests
 from decouple import config
 
 from edfi_amt_data_lake.helper.changeVersionValues import ChangeVersionValues
-from edfi_amt_data_lake.helper.token import get_token
+from edfi_amt_data_lake.helper.token import get_with_token
 from edfi_amt_data_lake.helper.utils import delete_path_content
 
 
@@ -31,12 +30,9 @@ def get_change_version_values_from_file(file) -> ChangeVersionValues:
 
 
 def get_change_version_values_from_api(school_year="") -> ChangeVersionValues:
-    token = get_token()
-    verify_cert = config('REQUESTS_CERT_VERIFICATION', default=True, cast=bool)
     school_year_url = f"{school_year}/" if school_year else ""
     url = f"{config('API_URL')}{config('AVAILABLE_CHANGE_VERSIONS').format(school_year_url)}"
-    headers = {"Authorization": "Bearer " + token}
-    response = requests.get(url, headers=headers, verify=verify_cert)
+    response = get_with_token(url)
     changeVersionValues = ChangeVersionValues("", "")
     if response.ok:
         response_json = response.json()
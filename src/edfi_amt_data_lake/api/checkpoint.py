@@ -0,0 +1,99 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import json
+import os
+from typing import Any, Optional
+
+from decouple import config
+
+from edfi_amt_data_lake.helper.utils import delete_path_content
+
+
+def get_checkpoint_location() -> str:
+    return config(
+        "CHECKPOINT_LOCATION",
+        default=os.path.join(config("CHANGE_VERSION_FILEPATH"), "checkpoints")
+    )
+
+
+def _get_checkpoint_path(school_year: str) -> str:
+    return os.path.join(get_checkpoint_location(), f"{school_year}")
+
+
+# Progress of the extraction of one endpoint. offset is the next offset to request,
+# page_tokens the next page token of every keyset partition (None once the
+# partition is finished), records and size the records and bytes already
+# written to the silver part file.
+class EndpointCheckpoint:
+    def __init__(
+        self,
+        key: str,
+        change_version: Any,
+        offset: int = 0,
+        page_tokens: Optional[list] = None,
+        records: int = 0,
+        size: int = 0,
+        completed: bool = False
+    ):
+        self.key = key
+        self.change_version = f"{change_version}"
+        self.offset = offset
+        self.page_tokens = page_tokens
+        self.records = records
+        self.size = size
+        self.completed = completed
+
+    def to_dict(self) -> dict:
+        return {
+            "key": self.key,
+            "changeVersion": self.change_version,
+            "offset": self.offset,
+            "pageTokens": self.page_tokens,
+            "records": self.records,
+            "size": self.size,
+            "completed": self.completed
+        }
+
+    @staticmethod
+    def from_dict(values: dict) -> "EndpointCheckpoint":
+        return EndpointCheckpoint(
+            key=values["key"],
+            change_version=values["changeVersion"],
+            offset=values.get("offset", 0),
+            page_tokens=values.get("pageTokens"),
+            records=values.get("records", 0),
+            size=values.get("size", 0),
+            completed=values.get("completed", False)
+        )
+
+
+def load_checkpoint(school_year: str, key: str, change_version: Any) -> EndpointCheckpoint:
+    file_path = os.path.join(_get_checkpoint_path(school_year), f"{key}.json")
+    if os.path.isfile(file_path):
+        with open(file_path, "r") as file:
+            checkpoint = EndpointCheckpoint.from_dict(json.load(file))
+        # A checkpoint is only valid for the change version it was taken with.
+        if checkpoint.change_version == f"{change_version}":
+            return checkpoint
+    return EndpointCheckpoint(key, change_version)
+
+
+def save_checkpoint(school_year: str, checkpoint: EndpointCheckpoint) -> None:
+    path = _get_checkpoint_path(school_year)
+    os.makedirs(path, exist_ok=True)
+    file_path = os.path.join(path, f"{checkpoint.key}.json")
+    with open(f"{file_path}.tmp", "w") as file:
+        json.dump(checkpoint.to_dict(), file)
+    os.replace(f"{file_path}.tmp", file_path)
+
+
+def has_checkpoints() -> bool:
+    location = get_checkpoint_location()
+    return os.path.isdir(location) and any(files for _, _, files in os.walk(location))
+
+
+def clear_checkpoints(school_year: str) -> None:
+    delete_path_content(_get_checkpoint_path(school_year))
@@ -0,0 +1,191 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import closing
+from typing import Iterator, Optional
+
+import requests
+from dagster import get_dagster_logger
+from decouple import config
+
+from edfi_amt_data_lake.api.silver_writer import SilverFileWriter
+from edfi_amt_data_lake.helper.api_client import (
+    get_async_api_client,
+    is_async_client_enabled,
+)
+from edfi_amt_data_lake.helper.helper import get_headers
+from edfi_amt_data_lake.helper.token import get_token, get_with_token
+
+PAGING_MODE_SEQUENTIAL = "sequential"
+PAGING_MODE_OFFSET = "offset"
+PAGING_MODE_KEYSET = "keyset"
+PAGING_MODE_AUTO = "auto"
+PAGING_MODES = [PAGING_MODE_SEQUENTIAL, PAGING_MODE_OFFSET, PAGING_MODE_KEYSET, PAGING_MODE_AUTO]
+
+TOTAL_COUNT_HEADER = "Total-Count"
+NEXT_PAGE_TOKEN_HEADER = "Next-Page-Token"
+
+# Keyset paging (partitions + pageToken) is not offered by every ODS API version.
+# Once an API answers that it does not support it, stop asking for the rest of the run.
+_keyset_supported: Optional[bool] = None
+_keyset_lock = threading.Lock()
+
+
+# A page could not be extracted, even after retrying it. The pages written so far
+# and the checkpoint are kept so the endpoint can be resumed.
+class PageRequestError(Exception):
+    def __init__(self, url: str, response: Optional[requests.Response] = None, reason: str = ""):
+        self.url = url
+        self.status_code = response.status_code if response is not None else None
+        reason = f"{response.status_code} - {response.reason}" if response is not None else reason
+        super().__init__(f"Get page {url} Response: {reason}.")
+
+
+def get_paging_mode() -> str:
+    paging_mode = config("API_PAGING_MODE", default=PAGING_MODE_AUTO).lower()
+    if paging_mode not in PAGING_MODES:
+        get_dagster_logger().warning(f"Unknown API_PAGING_MODE {paging_mode}, using {PAGING_MODE_AUTO}.")
+        return PAGING_MODE_AUTO
+    return paging_mode
+
+
+def get_page_concurrency() -> int:
+    return max(1, config("API_PAGE_CONCURRENCY", default=4, cast=int))
+
+
+# GET a page and fail when the API does not answer successfully. Resources that
+# do not exist in the ODS API (404) are returned as an empty page.
+def _get_page(endpoint: str) -> tuple:
+    response = get_with_token(endpoint)
+    if response.status_code == 404:
+        return [], response.headers
+    if not response.ok:
+        raise PageRequestError(endpoint, response)
+    return response.json(), response.headers
+
+
+# Request pages one after another until an empty page comes back.
+def get_pages_sequential(url: str, limit: int, parameters: str, writer: SilverFileWriter) -> None:
+    checkpoint = writer.checkpoint
+    while True:
+        response_data, _ = _get_page(f"{url}?limit={limit}&offset={checkpoint.offset}{parameters}")
+        if len(response_data) == 0:
+            break
+        writer.write(response_data, offset=checkpoint.offset + limit)
+
+
+# The offset windows are requested in batches of API_PAGE_CONCURRENCY windows, the
+# next batch once the previous one is written: only a batch of the endpoint is in
+# memory.
+def _get_offset_windows(url: str, limit: int, parameters: str, offsets: range) -> Iterator[list]:
+    concurrency = get_page_concurrency()
+    batches = [offsets[start:start + concurrency] for start in range(0, len(offsets), concurrency)]
+    if is_async_client_enabled():
+        url_batches = ([f"{url}?limit={limit}&offset={offset}{parameters}" for offset in batch] for batch in batches)
+        with closing(
+            get_async_api_client().get_json_batches(url_batches, lambda: get_headers(get_token()))
+        ) as page_batches:
+            for batch, pages in zip(batches, page_batches):
+                for offset, page in zip(batch, pages):
+                    if page is None:
+                        raise PageRequestError(f"{url}?offset={offset}", reason="async request failed")
+                    yield page
+        return
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for batch in batches:
+            yield from executor.map(
+                lambda offset: _get_page(f"{url}?limit={limit}&offset={offset}{parameters}")[0],
+                batch
+            )
+
+
+# Request the first page with the total count, then request the remaining
+# offset windows in parallel and write them in order.
+def get_pages_by_offset(url: str, limit: int, parameters: str, writer: SilverFileWriter) -> None:
+    checkpoint = writer.checkpoint
+    first_page, headers = _get_page(f"{url}?limit={limit}&offset={checkpoint.offset}&totalCount=true{parameters}")
+    if len(first_page) == 0:
+        return
+    writer.write(first_page, offset=checkpoint.offset + limit)
+    total_count = headers.get(TOTAL_COUNT_HEADER)
+    if total_count is None:
+        # Without a total count there is no way to know the windows upfront.
+        get_pages_sequential(url, limit, parameters, writer)
+        return
+
+    # Windows come back in order, so the checkpoint always points right after
+    # the last window written.
+    for page in _get_offset_windows(url, limit, parameters, range(checkpoint.offset, int(total_count), limit)):
+        writer.write(page, offset=checkpoint.offset + limit)
+    # Records added after the count was taken are picked up sequentially.
+    get_pages_sequential(url, limit, parameters, writer)
+
+
+def _get_page_tokens(url: str, parameters: str) -> Optional[list]:
+    global _keyset_supported
+    if _keyset_supported is False:
+        return None
+    response = get_with_token(f"{url}/partitions?number={get_page_concurrency()}{parameters}")
+    if response.ok:
+        with _keyset_lock:
+            _keyset_supported = True
+        return response.json().get("pageTokens", [])
+    # A 404 only tells the resource is missing from this ODS, the other endpoints
+    # keep asking for keyset paging.
+    if response.status_code in (400, 405):
+        with _keyset_lock:
+            _keyset_supported = False
+    return None
+
+
+def _get_partition(url: str, limit: int, parameters: str, writer: SilverFileWriter, index: int) -> None:
+    page_tokens: list = writer.checkpoint.page_tokens or []
+    while page_tokens[index]:
+        response_data, headers = _get_page(f"{url}?pageToken={page_tokens[index]}&pageSize={limit}{parameters}")
+        writer.write(response_data, partition=(index, headers.get(NEXT_PAGE_TOKEN_HEADER)))
+
+
+# Request the partitions of the resource and page through each of them in
+# parallel with the pageToken keyset paging. Returns False when the API does not
+# offer keyset paging.
+def get_pages_by_keyset(url: str, limit: int, parameters: str, writer: SilverFileWriter) -> bool:
+    checkpoint = writer.checkpoint
+    if url.endswith("/deletes") or checkpoint.offset:
+        return False
+    if checkpoint.page_tokens is None:
+        checkpoint.page_tokens = _get_page_tokens(url, parameters)
+        if checkpoint.page_tokens is None:
+            return False
+        # Keep the partitions, a resumed extraction has to page through the same ones.
+        writer.write([])
+    with ThreadPoolExecutor(max_workers=get_page_concurrency()) as executor:
+        futures = [
+            executor.submit(_get_partition, url, limit, parameters, writer, index)
+            for index in range(len(checkpoint.page_tokens))
+        ]
+        # Let every partition write what it can, even when one of them fails.
+        wait(futures)
+    for future in futures:
+        future.result()
+    return True
+
+
+# Extract every record of the endpoint into the writer, starting from its
+# checkpoint. The writer moves the checkpoint forward with every page written, so
+# when a PageRequestError is raised the silver file and the checkpoint describe
+# the same progress.
+def get_pages(url: str, limit: int, parameters: str, writer: SilverFileWriter) -> None:
+    paging_mode = get_paging_mode()
+    if paging_mode == PAGING_MODE_SEQUENTIAL:
+        get_pages_sequential(url, limit, parameters, writer)
+        return
+    if paging_mode in (PAGING_MODE_KEYSET, PAGING_MODE_AUTO):
+        if get_pages_by_keyset(url, limit, parameters, writer):
+            return
+        if paging_mode == PAGING_MODE_KEYSET:
+            get_dagster_logger().warning(f"Keyset paging not available for {url}, using offset paging.")
+    get_pages_by_offset(url, limit, parameters, writer)
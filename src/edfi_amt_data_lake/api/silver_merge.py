@@ -0,0 +1,93 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import os
+from typing import Any
+
+from dagster import get_dagster_logger
+from decouple import config
+
+from edfi_amt_data_lake.api.silver_writer import PART_FILE_EXTENSION
+from edfi_amt_data_lake.helper.base import JSONFile
+from edfi_amt_data_lake.helper.helper import get_path
+from edfi_amt_data_lake.helper.silver_format import (
+    get_silver_files,
+    get_silver_format,
+    parse_file_name,
+    read_silver_file,
+    write_silver_file,
+)
+
+ID_FIELD = "id"
+
+
+def _remove_file(path: str, file_name: str) -> None:
+    file_path = os.path.join(path, file_name)
+    if os.path.isfile(file_path):
+        os.remove(file_path)
+
+
+# Merge the records extracted for the change version into the silver data of the
+# endpoint and compact it to a single file, {name}_{change_version}:
+# - A full extraction replaces whatever the endpoint had.
+# - A change version window is upserted by id over the newest previous file, and
+#   the ids of the deletes endpoint are removed.
+# The deletes files are removed last, so merging again after an interruption gives
+# the same result.
+def merge_endpoint(json_file: JSONFile, school_year: str, change_version: Any, full_extraction: bool) -> None:
+    logger = get_dagster_logger()
+    path = os.path.join(get_path(config('SILVER_DATA_LOCATION'), school_year), json_file.directory)
+    if not os.path.isdir(path):
+        return
+    for file_name in os.listdir(path):
+        # Left by an extraction that was not resumed.
+        if file_name.endswith(f".{PART_FILE_EXTENSION}"):
+            _remove_file(path, file_name)
+
+    change_version = int(change_version) if f"{change_version}".isdigit() else -1
+    silver_files = get_silver_files(path)
+    delta_files = [
+        silver_file for silver_file in silver_files
+        if not silver_file.is_deletes and silver_file.change_version == change_version
+    ]
+    base_files = [
+        silver_file for silver_file in silver_files
+        if not silver_file.is_deletes and silver_file.change_version < change_version
+    ]
+    deletes_files = [
+        silver_file for silver_file in silver_files
+        if silver_file.is_deletes and silver_file.change_version <= change_version
+    ]
+    merged_files = delta_files
+    if not full_extraction and base_files and (delta_files or deletes_files):
+        base_file = max(base_files, key=lambda silver_file: silver_file.change_version)
+        records_by_id: dict = {}
+        for silver_file in [base_file] + delta_files:
+            for record in read_silver_file(os.path.join(path, silver_file.file_name)):
+                records_by_id[record.get(ID_FIELD)] = record
+        deleted = 0
+        for silver_file in deletes_files:
+            for record in read_silver_file(os.path.join(path, silver_file.file_name)):
+                if records_by_id.pop(record.get(ID_FIELD), None) is not None:
+                    deleted += 1
+        silver_format = get_silver_format()
+        file_name = f"{json_file.name}_{change_version}.{silver_format}"
+        if records_by_id:
+            write_silver_file(os.path.join(path, file_name), list(records_by_id.values()), silver_format)
+            merged_files = [parse_file_name(file_name)]
+        else:
+            merged_files = []
+        logger.info(
+            f"Endpoint {json_file.name}({change_version}) merged: {len(records_by_id)} records, "
+            f"{deleted} deleted."
+        )
+    elif not full_extraction and base_files:
+        # Nothing changed, the newest previous file is still the data of the endpoint.
+        merged_files = [max(base_files, key=lambda silver_file: silver_file.change_version)]
+
+    merged_file_names = [silver_file.file_name for silver_file in merged_files]
+    for silver_file in base_files + delta_files + deletes_files:
+        if silver_file.file_name not in merged_file_names:
+            _remove_file(path, silver_file.file_name)
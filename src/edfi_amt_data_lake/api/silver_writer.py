@@ -0,0 +1,110 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import os
+import threading
+from typing import Any, Optional
+
+from dagster import get_dagster_logger
+from decouple import config
+
+from edfi_amt_data_lake.api.checkpoint import EndpointCheckpoint, save_checkpoint
+from edfi_amt_data_lake.helper.base import JSONFile
+from edfi_amt_data_lake.helper.helper import get_path
+from edfi_amt_data_lake.helper.silver_format import (
+    SILVER_FORMAT_PARQUET,
+    convert_ndjson_to_parquet,
+    encode_page,
+    get_footer,
+    get_header,
+    get_silver_format,
+)
+
+PART_FILE_EXTENSION = "part"
+
+
+# Writes the records of an endpoint to its silver file page by page, as they are
+# extracted, so the endpoint is never held in memory. Records go to a part file
+# that is renamed once the endpoint is complete. The checkpoint is saved after
+# every page with the size of the part file, so an interrupted extraction can be
+# resumed from the last page written. The format of the file is SILVER_DATA_FORMAT.
+class SilverFileWriter:
+    def __init__(self, json_file: JSONFile, json_file_sufix: Any, school_year: str, checkpoint: EndpointCheckpoint):
+        self.json_file = json_file
+        self.json_file_sufix = json_file_sufix
+        self.school_year = school_year
+        self.silver_format = get_silver_format()
+        self.path = os.path.join(get_path(config('SILVER_DATA_LOCATION'), school_year), json_file.directory)
+        self.file_path = os.path.join(self.path, f'{json_file.name}_{json_file_sufix}.{self.silver_format}')
+        self.part_file_path = f"{self.file_path}.{PART_FILE_EXTENSION}"
+        if checkpoint.size and not os.path.isfile(self.part_file_path):
+            # The records extracted so far are gone (or were written with another
+            # format), the endpoint has to be extracted again.
+            checkpoint = EndpointCheckpoint(checkpoint.key, checkpoint.change_version)
+        self.checkpoint = checkpoint
+        self._file: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    @property
+    def records(self) -> int:
+        return self.checkpoint.records
+
+    def _open(self) -> Any:
+        if self._file is None:
+            os.makedirs(self.path, exist_ok=True)
+            if self.checkpoint.size and os.path.isfile(self.part_file_path):
+                # Discard whatever was written after the last checkpoint.
+                self._file = open(self.part_file_path, "r+b")
+                self._file.truncate(self.checkpoint.size)
+                self._file.seek(self.checkpoint.size)
+            else:
+                self.checkpoint.records = 0
+                self._file = open(self.part_file_path, "wb")
+                self._file.write(get_header(self.silver_format))
+        return self._file
+
+    # Append a page and move the checkpoint forward: to the next offset, or to the
+    # next page token of a keyset partition, given as (index, page_token).
+    def write(self, records: list, offset: Optional[int] = None, partition: Optional[tuple] = None) -> None:
+        with self._lock:
+            if records:
+                file = self._open()
+                file.write(encode_page(self.silver_format, records, first_page=not self.checkpoint.records))
+                file.flush()
+                self.checkpoint.records += len(records)
+                self.checkpoint.size = file.tell()
+            if offset is not None:
+                self.checkpoint.offset = offset
+            if partition is not None and self.checkpoint.page_tokens is not None:
+                index, page_token = partition
+                self.checkpoint.page_tokens[index] = page_token
+            save_checkpoint(self.school_year, self.checkpoint)
+
+    # Finish the silver file. Endpoints without records do not get a file.
+    def close(self) -> None:
+        with self._lock:
+            if self._file is None and self.checkpoint.size:
+                self._open()
+            if self._file is None:
+                return
+            self._file.write(get_footer(self.silver_format))
+            self._file.close()
+            self._file = None
+            if self.silver_format == SILVER_FORMAT_PARQUET:
+                convert_ndjson_to_parquet(self.part_file_path, self.file_path)
+                os.remove(self.part_file_path)
+            else:
+                os.replace(self.part_file_path, self.file_path)
+            file_size = os.path.getsize(self.file_path) / 1000000
+            get_dagster_logger().info(
+                f"File {self.json_file.name}({self.json_file_sufix}) saved with {file_size} MB"
+            )
+
+    # Stop writing and keep the part file to resume it later.
+    def abort(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
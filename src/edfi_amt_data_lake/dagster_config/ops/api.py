@@ -10,8 +10,8 @@ from decouple import config
 
 from edfi_amt_data_lake.api.api import api_async
 from edfi_amt_data_lake.api.changeVersion import get_change_version_updated
+from edfi_amt_data_lake.api.checkpoint import has_checkpoints
 from edfi_amt_data_lake.helper.helper import get_school_year
-from edfi_amt_data_lake.helper.utils import delete_path_content
 from edfi_amt_data_lake.parquet.amt_parquet import generate_amt_parquet
 
 
@@ -26,9 +26,14 @@ def get_api_data() -> bool:
     if (config('GENERATE_SILVER_DATA', default=True, cast=bool)):
         logger = get_dagster_logger()
         try:
-            delete_path_content(config("SILVER_DATA_LOCATION"))
+            # Checkpoints left by an interrupted extraction are resumed with the
+            # data and change versions it already saved. The silver data is kept
+            # between executions, every extraction is merged into it.
+            resume = has_checkpoints()
+            if resume:
+                logger.info("Resuming the interrupted extraction.")
             for school_year in get_school_year():
-                if get_change_version_updated(school_year):
+                if resume or get_change_version_updated(school_year):
                     api_async(school_year)
                 return True
         except Exception as ex:
@@ -42,10 +47,13 @@ def generate_parquet(api_result_sucess) -> bool:
     if (config('GENERATE_GOLD_DATA', default=True, cast=bool)):
         logger = get_dagster_logger()
         try:
+            # A partially generated gold layer is not reported as a success.
+            successful = True
             if api_result_sucess:
                 for school_year in get_school_year():
-                    generate_amt_parquet(school_year)
-            return True
+                    if generate_amt_parquet(school_year):
+                        successful = False
+            return successful
         except Exception as ex:
             logger.error(f"An unhandled exception occured: {ex}, Traceback: {traceback.format_exc()}")
         return False
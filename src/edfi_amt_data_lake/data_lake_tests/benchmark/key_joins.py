@@ -0,0 +1,96 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+# Time the joins of student_history_dim on its natural keys: on the strings, as
+# the view joins, on integer ids encoded for every join, as they were with the
+# key encoder, and on integer ids already in the views, with the time to hash the
+# keys of the views they would be written by:
+#
+#   python -m edfi_amt_data_lake.data_lake_tests.benchmark.key_joins [rows]
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from edfi_amt_data_lake.parquet.Common.pandasWrapper import pdMerge
+
+DEFAULT_ROWS = 500000
+KEYS = ['StudentKey', 'StudentSchoolKey']
+
+
+def _views(rows: int) -> dict:
+    random = np.random.default_rng(rows)
+    students = np.array([str(604822 + row) for row in range(rows)], dtype=object)
+    student_schools = np.array([f"{student}-{255901 + row % 7}" for row, student in enumerate(students)], dtype=object)
+    return {
+        'student_school': pd.DataFrame({'StudentKey': students, 'StudentSchoolKey': student_schools}),
+        'enrollment': pd.DataFrame({
+            'StudentKey': students[random.permutation(rows)], 'EnrollmentHistory': 'Grand Bend High School'
+        }),
+        'attendance_history': pd.DataFrame({
+            'StudentSchoolKey': student_schools[random.permutation(rows)], 'AttendanceRate': random.random(rows)
+        }),
+        'discipline_action': pd.DataFrame({
+            'StudentSchoolKey': student_schools[random.permutation(rows)[:rows // 3]], 'ReferralsAndSuspensions': 1
+        }),
+    }
+
+
+def _join(views: dict, student_key: str, student_school_key: str) -> pd.DataFrame:
+    result = pdMerge(views['student_school'], views['enrollment'], 'inner', [student_key], [student_key], None, None)
+    for right in ['attendance_history', 'discipline_action']:
+        result = pdMerge(result, views[right], 'left', [student_school_key], [student_school_key], None, f'{right}_')
+    return result
+
+
+def _strings(views: dict) -> pd.DataFrame:
+    return _join(views, 'StudentKey', 'StudentSchoolKey')
+
+
+# The views with the ids of their keys, the string keys are only kept in the left
+# data frame of the joins.
+def _with_ids(views: dict, encode) -> dict:
+    return {
+        name: view.assign(**{f"{key}Id": encode(key, view[key]) for key in KEYS if key in view}).drop(
+            columns=[] if name == 'student_school' else [key for key in KEYS if key in view]
+        )
+        for name, view in views.items()
+    }
+
+
+# Every join looks the keys of both data frames up in the ids of the key.
+def _ids_per_join(views: dict) -> pd.DataFrame:
+    ids = {key: pd.Index(views['student_school'][key].unique()) for key in KEYS}
+    return _join(_with_ids(views, lambda key, keys: ids[key].get_indexer(keys)), 'StudentKeyId', 'StudentSchoolKeyId')
+
+
+def _hash_ids(views: dict) -> dict:
+    return _with_ids(views, lambda key, keys: pd.util.hash_pandas_object(keys, index=False).astype('int64'))
+
+
+def _time(function, *arguments) -> tuple:
+    start = time.perf_counter()
+    result = function(*arguments)
+    return time.perf_counter() - start, result
+
+
+def main(rows: int = DEFAULT_ROWS) -> None:
+    views = _views(rows)
+    strings_time, expected = _time(_strings, views)
+    per_join_time, result = _time(_ids_per_join, views)
+    assert result[expected.columns].equals(expected)
+    hash_time, hashed_views = _time(_hash_ids, views)
+    ids_time, result = _time(_join, hashed_views, 'StudentKeyId', 'StudentSchoolKeyId')
+    assert result[expected.columns].equals(expected)
+    print(f"{'joins of student_history_dim, ' + str(rows) + ' students':<50}{'time':>10}")
+    print(f"{'string keys':<50}{strings_time:>9.3f}s")
+    print(f"{'ids encoded for every join':<50}{per_join_time:>9.3f}s")
+    print(f"{'ids in the views':<50}{ids_time:>9.3f}s")
+    print(f"{'ids in the views, with hashing them':<50}{ids_time + hash_time:>9.3f}s")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS)
@@ -0,0 +1,221 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+# Time the column rules of the views row by row, as they were written with
+# DataFrame.apply, and with the pandasWrapper helpers that replaced them:
+#
+#   python -m edfi_amt_data_lake.data_lake_tests.benchmark.vectorized_rules [rows]
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from edfi_amt_data_lake.parquet.Common.pandasWrapper import (
+    coalesce,
+    default_if_empty,
+    explode_items,
+    join_columns,
+    to_flag,
+)
+
+DEFAULT_ROWS = 100000
+
+
+def _values(rows: int, values: list) -> np.ndarray:
+    return np.random.default_rng(rows).choice(np.array(values, dtype=object), rows)
+
+
+def _all_student_school_dim(rows: int):
+    data = pd.DataFrame({
+        'sexDescriptor': _values(rows, ['', 'Female', 'Male']),
+        'sexDescriptor_districtEdOrg': _values(rows, ['', 'Female', 'Male']),
+        'indicator': _values(rows, ['', 'Yes', 'No']),
+        'indicator_districtEdOrg': _values(rows, ['', 'Yes', 'No']),
+        'exitWithdrawDateKey': _values(rows, ['', '20220601', '20990601']),
+        'date_now': '20230101',
+    })
+
+    def row_wise():
+        sex = data.apply(lambda x: x['sexDescriptor'] if x['sexDescriptor'] != '' else x['sexDescriptor_districtEdOrg'], axis=1)
+        indicator = data.apply(lambda x: x['indicator'] if x['indicator'] != '' else x['indicator_districtEdOrg'], axis=1)
+        indicator = indicator.apply(lambda x: 'n/a' if x == '' else x)
+        enrolled = data.apply(
+            lambda x: 1 if x['exitWithdrawDateKey'] > x['date_now'] or x['exitWithdrawDateKey'] == '' else 0, axis=1
+        )
+        return [sex, indicator, enrolled]
+
+    def vectorized():
+        sex = coalesce(data, 'sexDescriptor', 'sexDescriptor_districtEdOrg')
+        data['InternetAccessInResidence'] = coalesce(data, 'indicator', 'indicator_districtEdOrg')
+        indicator = default_if_empty(data, 'InternetAccessInResidence', 'n/a')
+        enrolled = to_flag((data['exitWithdrawDateKey'] > data['date_now']) | (data['exitWithdrawDateKey'] == ''))
+        return [sex, indicator, enrolled]
+
+    return row_wise, vectorized
+
+
+def _contact_person_dim(rows: int):
+    data = pd.DataFrame({
+        'Address': _values(rows, ['1 Main St', '22 Oak Ave']),
+        'apartmentRoomSuiteNumber': _values(rows, ['', '4B']),
+        'primaryEmailAddressIndicator': _values(rows, [True, False, np.nan]),
+    })
+
+    def row_wise():
+        address = data.apply(
+            lambda r: (r["Address"] + ', ' + r["apartmentRoomSuiteNumber"]) if r["apartmentRoomSuiteNumber"] != '' else r["Address"], axis=1
+        )
+        email = data.apply(lambda r: ('Work') if r["primaryEmailAddressIndicator"] is True else 'Not specified', axis=1)
+        return [address, email]
+
+    def vectorized():
+        address = data["Address"].where(
+            data["apartmentRoomSuiteNumber"] == '', join_columns(data, ["Address", "apartmentRoomSuiteNumber"], ', ')
+        )
+        email = to_flag(data["primaryEmailAddressIndicator"].eq(True), 'Work', 'Not specified')
+        return [address, email]
+
+    return row_wise, vectorized
+
+
+def _staff_section_dim(rows: int):
+    data = pd.DataFrame({
+        'raceDescriptor': _values(rows, ['White', 'Asian', 'Black - African American']),
+        'raceDescriptor_count': _values(rows, [1, 2, 3]).astype(int),
+    })
+
+    def row_wise():
+        return [data.apply(lambda r: ('Multiracial') if r["raceDescriptor_count"] > 1 else r['raceDescriptor'], axis=1)]
+
+    def vectorized():
+        return [data["raceDescriptor"].mask(data["raceDescriptor_count"] > 1, 'Multiracial')]
+
+    return row_wise, vectorized
+
+
+def _chronic_absenteeism_attendance_fact(rows: int):
+    data = pd.DataFrame({
+        'ReportedAsAbsentFromSchool': _values(rows, [0, 1, 2, np.nan]).astype(float),
+        'ReportedAsAbsentFromHomeRoom': _values(rows, [0, 1]).astype(int),
+        'StudentKey': _values(rows, ['604822', '604823']),
+    })
+
+    def row_wise():
+        absent = data.apply(lambda r: 1 if r["ReportedAsAbsentFromSchool"] > 0 else 0, axis=1)
+        any_section = data.apply(lambda r: 1 if r["ReportedAsAbsentFromHomeRoom"] == 1 else 0, axis=1)
+        return [absent, any_section]
+
+    def vectorized():
+        return [to_flag(data["ReportedAsAbsentFromSchool"] > 0), to_flag(data["ReportedAsAbsentFromHomeRoom"] == 1)]
+
+    return row_wise, vectorized
+
+
+def _rls_user_authorization(rows: int):
+    data = pd.DataFrame({
+        'staffClassificationDescriptor_constantName': _values(
+            rows, ['AuthorizationScope.School', 'AuthorizationScope.District', 'AuthorizationScope.Section', np.nan]
+        ),
+        'endDateKey_staff_section_association': _values(rows, ['20220601', '20990601', 'nan']),
+        'date_now': '20230101',
+        'id': _values(rows, ['a', '', np.nan]),
+    })
+
+    def row_wise():
+        scope = data.apply(
+            lambda r: (True)
+            if r['staffClassificationDescriptor_constantName'] == 'AuthorizationScope.School'
+            or r['staffClassificationDescriptor_constantName'] == 'AuthorizationScope.District' else False, axis=1
+        )
+        result = pd.concat([data, scope.rename('scope')], axis=1).apply(
+            lambda r: (True)
+            if (r['endDateKey_staff_section_association'] >= r['date_now'] and r['id']) or r['scope'] else False, axis=1
+        )
+        return [scope, result]
+
+    def vectorized():
+        scope = data['staffClassificationDescriptor_constantName'].isin(
+            ['AuthorizationScope.School', 'AuthorizationScope.District']
+        )
+        result = (
+            (data['endDateKey_staff_section_association'] >= data['date_now']) & data['id'].astype(bool)
+        ) | scope
+        return [scope, result]
+
+    return row_wise, vectorized
+
+
+def _student_assessment_fact(rows: int):
+    data = pd.DataFrame({
+        'assessmentReference.assessmentIdentifier': _values(rows, ['ACT', 'SAT']),
+        'objectiveAssessmentReference.identificationCode': _values(rows, ['', 'O1', 'O2']),
+        'assessmentReference.namespace': 'uri://ed-fi.org/Assessment',
+    })
+
+    def row_wise():
+        return [data.apply(
+            lambda r: (r["assessmentReference.assessmentIdentifier"] + '-'
+                       + r["objectiveAssessmentReference.identificationCode"] + '-'
+                       + r["assessmentReference.namespace"])
+            if r["objectiveAssessmentReference.identificationCode"] != '' else '', axis=1
+        )]
+
+    def vectorized():
+        return [join_columns(data, [
+            "assessmentReference.assessmentIdentifier",
+            "objectiveAssessmentReference.identificationCode",
+            "assessmentReference.namespace"
+        ]).where(data["objectiveAssessmentReference.identificationCode"] != '', '')]
+
+    return row_wise, vectorized
+
+
+def _student_school_demographics_bridge(rows: int):
+    data = pd.DataFrame({
+        'descriptor_uses': [
+            [{'languageUseDescriptor': use}] for use in _values(rows, ['uri://ed-fi.org/LanguageUseDescriptor#Home language', 'uri://ed-fi.org/LanguageUseDescriptor#Native language'])
+        ],
+    })
+
+    def row_wise():
+        return [data['descriptor_uses'].explode().apply(pd.Series)['languageUseDescriptor']]
+
+    def vectorized():
+        return [explode_items(data, 'descriptor_uses', 'languageUseDescriptor')['descriptor_uses']]
+
+    return row_wise, vectorized
+
+
+VIEWS = {
+    'all_student_school_dim': _all_student_school_dim,
+    'contact_person_dim': _contact_person_dim,
+    'staff_section_dim': _staff_section_dim,
+    'chronic_absenteeism_attendance_fact': _chronic_absenteeism_attendance_fact,
+    'rls_user_authorization': _rls_user_authorization,
+    'student_assessment_fact': _student_assessment_fact,
+    'student_school_demographics_bridge': _student_school_demographics_bridge,
+}
+
+
+def _time(function) -> tuple:
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main(rows: int = DEFAULT_ROWS) -> None:
+    print(f"{'view':<40}{'row-wise':>12}{'vectorized':>12}{'speedup':>10}")
+    for name, create in VIEWS.items():
+        row_wise, vectorized = create(rows)
+        row_wise_time, expected = _time(row_wise)
+        vectorized_time, result = _time(vectorized)
+        for expected_column, column in zip(expected, result):
+            assert expected_column.astype(object).equals(column.astype(object)), name
+        print(f"{name:<40}{row_wise_time:>11.3f}s{vectorized_time:>11.3f}s{row_wise_time / vectorized_time:>9.0f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS)
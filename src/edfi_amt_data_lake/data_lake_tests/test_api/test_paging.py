@@ -0,0 +1,38 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+import pytest
+import requests
+
+from edfi_amt_data_lake.api import paging
+
+
+def test_offset_windows_are_requested_in_batches(monkeypatch) -> None:
+    requested = []
+
+    def get_page(url) -> tuple:
+        offset = int(url.split("offset=")[1])
+        requested.append(offset)
+        return [{"offset": offset}], {}
+
+    monkeypatch.setenv("API_PAGE_CONCURRENCY", "2")
+    monkeypatch.setenv("API_ASYNC_CLIENT", "False")
+    monkeypatch.setattr(paging, "_get_page", get_page)
+
+    windows = paging._get_offset_windows("http://ods/students", 100, "", range(100, 600, 100))
+
+    assert next(windows) == [{"offset": 100}]
+    assert set(requested) <= {100, 200}
+    assert [window[0]["offset"] for window in windows] == [200, 300, 400, 500]
+
+
+@pytest.mark.parametrize("status_code, supported", [(404, None), (400, False), (405, False)])
+def test_only_the_apis_without_keyset_paging_turn_it_off(monkeypatch, status_code, supported) -> None:
+    response = requests.Response()
+    response.status_code = status_code
+    monkeypatch.setattr(paging, "_keyset_supported", None)
+    monkeypatch.setattr(paging, "get_with_token", lambda url: response)
+
+    assert paging._get_page_tokens("http://ods/surveys", "") is None
+    assert paging._keyset_supported is supported
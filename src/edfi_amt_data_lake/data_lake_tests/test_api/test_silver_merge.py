@@ -0,0 +1,44 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+import os
+
+from edfi_amt_data_lake.api.silver_merge import merge_endpoint
+from edfi_amt_data_lake.helper.base import JSONFile
+from edfi_amt_data_lake.helper.silver_format import write_silver_file
+from edfi_amt_data_lake.parquet.Common.functions import getEndpointJson
+
+
+def _write(path, file_name, records) -> None:
+    os.makedirs(path, exist_ok=True)
+    write_silver_file(os.path.join(path, file_name), records, "json")
+
+
+def test_merge_upserts_changes_and_applies_deletes(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("SILVER_DATA_LOCATION", f"{tmp_path}/")
+    path = tmp_path / "students"
+    _write(path, "students_10.json", [{"id": "a", "v": 1}, {"id": "b", "v": 1}, {"id": "c", "v": 1}])
+    _write(path, "students_20.json", [{"id": "b", "v": 2}, {"id": "d", "v": 2}])
+    _write(path, "students_deletes_20.json", [{"id": "c"}])
+
+    merge_endpoint(JSONFile("students"), "", "20", full_extraction=False)
+
+    assert sorted(os.listdir(path)) == ["students_20.json"]
+    records = getEndpointJson("students", f"{tmp_path}/", "")
+    assert sorted(records, key=lambda record: record["id"]) == [
+        {"id": "a", "v": 1}, {"id": "b", "v": 2}, {"id": "d", "v": 2}
+    ]
+
+
+def test_full_extraction_replaces_previous_data(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("SILVER_DATA_LOCATION", f"{tmp_path}/")
+    path = tmp_path / "students"
+    _write(path, "students_10.json", [{"id": "a"}, {"id": "b"}])
+    _write(path, "students_20.json", [{"id": "b"}])
+    _write(path, "students_deletes_20.json", [{"id": "a"}])
+
+    merge_endpoint(JSONFile("students"), "", "20", full_extraction=True)
+
+    assert sorted(os.listdir(path)) == ["students_20.json"]
+    assert getEndpointJson("students", f"{tmp_path}/", "") == [{"id": "b"}]
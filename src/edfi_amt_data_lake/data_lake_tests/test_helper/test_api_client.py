@@ -0,0 +1,44 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from edfi_amt_data_lake.helper.api_client import AsyncApiClient, get_retry_delay
+
+
+def test_retry_delay_uses_retry_after_seconds() -> None:
+    assert get_retry_delay(0, "7") == 7
+
+
+def test_retry_delay_uses_retry_after_date() -> None:
+    retry_date = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 <= get_retry_delay(0, retry_date) <= 30
+
+
+def test_retry_delay_backoff_is_bounded() -> None:
+    for attempt in range(10):
+        assert 0 <= get_retry_delay(attempt) <= min(60, 2 ** attempt)
+
+
+def test_async_batches_are_requested_once_the_previous_one_is_consumed(monkeypatch) -> None:
+    httpx = pytest.importorskip("httpx")
+    requested = []
+
+    def handler(request):
+        requested.append(request.url.params["offset"])
+        return httpx.Response(200, json=[{"offset": request.url.params["offset"]}])
+
+    client = AsyncApiClient(max_connections_per_host=2, verify_cert=True)
+    monkeypatch.setattr(client, "_create_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    url_batches = [[f"http://ods/students?offset={offset}" for offset in batch] for batch in [[0, 1], [2]]]
+
+    batches = client.get_json_batches(url_batches, lambda: {"Authorization": "Bearer token"})
+
+    assert next(batches) == [[{"offset": "0"}], [{"offset": "1"}]]
+    assert sorted(requested) == ["0", "1"]
+    assert list(batches) == [[[{"offset": "2"}]]]
+    assert sorted(requested) == ["0", "1", "2"]
@@ -0,0 +1,24 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+from edfi_amt_data_lake.helper import token
+
+
+def test_short_lived_tokens_are_reused_until_halfway(monkeypatch) -> None:
+    requested = []
+    now = [1000.0]
+
+    def request_token() -> tuple:
+        requested.append(now[0])
+        return f"token{len(requested)}", 60
+
+    monkeypatch.setattr(token, "_request_token", request_token)
+    monkeypatch.setattr(token.time, "monotonic", lambda: now[0])
+    token_manager = token.TokenManager(refresh_margin=60)
+
+    assert token_manager.get_token() == "token1"
+    now[0] += 29
+    assert token_manager.get_token() == "token1"
+    now[0] += 1
+    assert token_manager.get_token() == "token2"
@@ -0,0 +1,61 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+import inspect
+
+from edfi_amt_data_lake.parquet.amt import amt_scheduler
+from edfi_amt_data_lake.parquet.amt.amt_planner import AmtPlan
+from edfi_amt_data_lake.parquet.amt.amt_views import AMT_VIEWS, get_amt_view
+
+
+def test_view_dependencies_are_registered_and_acyclic() -> None:
+    views = {view.name: view for view in AMT_VIEWS}
+    visited: set = set()
+
+    def visit(name, path) -> None:
+        assert name in views, f"{name} is not registered"
+        assert name not in path, f"Cycle: {' -> '.join(path + [name])}"
+        if name not in visited:
+            for dependency in views[name].views:
+                visit(dependency, path + [name])
+            visited.add(name)
+
+    for name in views:
+        visit(name, [])
+
+
+def test_views_come_after_the_views_they_read() -> None:
+    names = [view.name for view in AMT_VIEWS]
+    for position, view in enumerate(AMT_VIEWS):
+        for dependency in view.views:
+            assert dependency in names[:position], f"{view.name}: {dependency}"
+
+
+def test_views_reading_a_failed_view_are_not_generated(monkeypatch) -> None:
+    generated = []
+
+    def generate_view(name, school_year, readers, released, view_workers) -> bool:
+        generated.append(name)
+        return name != "all_student_school_dim"
+
+    monkeypatch.setenv("PARQUET_MAX_WORKERS", "1")
+    monkeypatch.setattr(amt_scheduler, "_generate_view", generate_view)
+    names = ["all_student_school_dim", "school_dim", "student_school_dim", "student_history_dim"]
+    plan = AmtPlan([get_amt_view(name) for name in names], {})
+
+    failed = amt_scheduler.run_amt_views(plan, "")
+
+    assert generated == ["all_student_school_dim", "school_dim"]
+    assert failed == ["all_student_school_dim", "student_school_dim", "student_history_dim"]
+
+
+def test_view_metadata_matches_view_code() -> None:
+    for view in AMT_VIEWS:
+        source = inspect.getsource(inspect.getmodule(view.function))
+        assert view.file_name in source, view.name
+        for endpoint in view.endpoints:
+            assert f"'{endpoint}'" in source or f'"{endpoint}"' in source, f"{view.name}: {endpoint}"
+        for dependency in view.views:
+            assert f"{dependency}(school_year" in source, f"{view.name}: {dependency}"
+        assert view.uses_today == ("today()" in source), view.name
@@ -0,0 +1,58 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+import pandas as pd
+import pytest
+
+from edfi_amt_data_lake.parquet.Common.chunking import get_chunk_numbers
+from edfi_amt_data_lake.parquet.Common.parquet_writer import (
+    ParquetChunkWriter,
+    ParquetWriterOptions,
+    read_parquet,
+)
+
+STUDENT_SCHOOL_ASSOCIATIONS = pd.DataFrame({
+    "schoolId": [255902, 255901, 255901, 255903, 255901, 255903],
+    "studentUniqueId": ["604825", "604822", "604823", "604826", "604824", "604827"],
+})
+
+
+def test_schools_are_kept_together_unless_over_the_budget() -> None:
+    row_bytes = pd.Series([10, 10, 10, 5, 10, 5])
+
+    chunk_numbers, chunks = get_chunk_numbers(
+        STUDENT_SCHOOL_ASSOCIATIONS, "schoolId", "studentUniqueId", row_bytes, budget=20
+    )
+
+    # 255901 is split in ranges of its students, 255902 fills the last one.
+    assert chunks == 3
+    assert chunk_numbers.tolist() == [1, 0, 0, 2, 1, 2]
+
+
+@pytest.mark.parametrize("engine", ["fastparquet", "pyarrow"])
+def test_chunks_are_written_in_order(tmp_path, monkeypatch, engine) -> None:
+    monkeypatch.setenv("PARQUET_ENGINE", engine)
+    file_path = str(tmp_path / "attendance.parquet")
+    writer = ParquetChunkWriter(file_path, ParquetWriterOptions(sort_by=["SchoolKey", "StudentKey"]))
+
+    writer.write(pd.DataFrame({"SchoolKey": ["255901", "255901"], "StudentKey": ["604823", "604822"]}))
+    writer.write(pd.DataFrame({"SchoolKey": pd.Series([], dtype=object), "StudentKey": pd.Series([], dtype=object)}))
+    writer.write(pd.DataFrame({"SchoolKey": ["255902"], "StudentKey": ["604822"]}))
+    writer.close()
+
+    assert writer.rows == 3
+    assert read_parquet(file_path).values.tolist() == [["255901", "604822"], ["255901", "604823"], ["255902", "604822"]]
+
+
+@pytest.mark.parametrize("engine", ["fastparquet", "pyarrow"])
+def test_chunks_with_different_categories_keep_their_values(tmp_path, monkeypatch, engine) -> None:
+    monkeypatch.setenv("PARQUET_ENGINE", engine)
+    file_path = str(tmp_path / "attendance.parquet")
+    writer = ParquetChunkWriter(file_path)
+
+    writer.write(pd.DataFrame({"AttendanceEvent": pd.Series(["Absence", "Tardy"], dtype="category")}))
+    writer.write(pd.DataFrame({"AttendanceEvent": pd.Series(["Present", "Absence"], dtype="category")}))
+    writer.close()
+
+    assert read_parquet(file_path)["AttendanceEvent"].tolist() == ["Absence", "Tardy", "Present", "Absence"]
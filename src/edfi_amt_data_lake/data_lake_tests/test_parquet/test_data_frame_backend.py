@@ -0,0 +1,100 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+import importlib.util
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from edfi_amt_data_lake.parquet.Common import data_frame_backend
+from edfi_amt_data_lake.parquet.Common.data_frame_backend import (
+    BACKEND_POLARS,
+    get_current_backend,
+    use_backend,
+)
+from edfi_amt_data_lake.parquet.Common.pandasWrapper import crossTab, pdMerge
+
+requires_polars = pytest.mark.skipif(importlib.util.find_spec("polars") is None, reason="polars is not installed")
+
+ATTENDANCE_EVENTS = pd.DataFrame({
+    "studentUniqueId": ["604825", "604822", None, "604822", "604823"],
+    "schoolId": [255902, 255901, 255901, 255901, 255901],
+    "attendanceEventCategoryDescriptor": ["Tardy", "Excused Absence", "Tardy", "Tardy", None],
+})
+
+STUDENTS = pd.DataFrame({
+    "studentUniqueId": ["604822", "604822", None, "604825"],
+    "schoolId": [255901, 255901, 255901, 255902],
+    "gradeLevel": pd.Series(["Ninth grade", "Tenth grade", "Ninth grade", np.nan], dtype="category"),
+    "hispanicLatinoEthnicity": [True, False, None, True],
+})
+
+
+@requires_polars
+@pytest.mark.parametrize("how", ["inner", "left"])
+@pytest.mark.parametrize("suffixes", [("_x", "_y"), (None, "_student")])
+def test_polars_merge_gives_the_pandas_merge(how, suffixes) -> None:
+    arguments = dict(
+        left=ATTENDANCE_EVENTS,
+        right=STUDENTS.rename(columns={"studentUniqueId": "studentKey"}),
+        how=how,
+        leftOn=["studentUniqueId", "schoolId"],
+        rightOn=["studentKey", "schoolId"],
+        suffixLeft=suffixes[0],
+        suffixRight=suffixes[1]
+    )
+    expected = pdMerge(**arguments)
+
+    with use_backend(BACKEND_POLARS):
+        result = pdMerge(**arguments)
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+@requires_polars
+def test_polars_merge_leaves_categorical_keys_of_other_categories_to_pandas() -> None:
+    student_school = pd.DataFrame({"SchoolKey": pd.Series(["255901", "255902"], dtype="category"), "StudentKey": ["604822", "604823"]})
+    school = pd.DataFrame({"SchoolKey": pd.Series(["255901"], dtype="category"), "SchoolName": ["Grand Bend High School"]})
+    expected = pdMerge(student_school, school, "left", ["SchoolKey"], ["SchoolKey"])
+
+    with use_backend(BACKEND_POLARS):
+        result = pdMerge(student_school, school, "left", ["SchoolKey"], ["SchoolKey"])
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+@requires_polars
+def test_polars_cross_tab_gives_the_pandas_cross_tab() -> None:
+    index = [ATTENDANCE_EVENTS["schoolId"], ATTENDANCE_EVENTS["studentUniqueId"]]
+    columns = ATTENDANCE_EVENTS["attendanceEventCategoryDescriptor"]
+    expected = crossTab(index, columns)
+
+    with use_backend(BACKEND_POLARS):
+        result = crossTab(index, columns)
+
+    pd.testing.assert_frame_equal(result.sort_index(), expected.sort_index())
+
+
+def test_the_backend_is_restored_after_the_view() -> None:
+    with use_backend(BACKEND_POLARS):
+        assert get_current_backend() == BACKEND_POLARS
+
+    assert get_current_backend() != BACKEND_POLARS
+
+
+def test_views_run_on_pandas_without_polars(monkeypatch) -> None:
+    monkeypatch.setitem(sys.modules, "polars", None)
+    monkeypatch.setattr(data_frame_backend, "_polars_missing", False)
+    arguments = dict(
+        left=ATTENDANCE_EVENTS, right=STUDENTS, how="left", leftOn=["studentUniqueId"], rightOn=["studentUniqueId"]
+    )
+    expected = pdMerge(**arguments)
+
+    with use_backend(BACKEND_POLARS):
+        result = pdMerge(**arguments)
+
+    pd.testing.assert_frame_equal(result, expected)
+    assert data_frame_backend._polars_missing
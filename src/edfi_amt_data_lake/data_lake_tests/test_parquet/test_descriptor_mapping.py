@@ -0,0 +1,32 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+import numpy as np
+import pandas as pd
+
+from edfi_amt_data_lake.parquet.Common.descriptor_mapping import get_descriptor_constant
+
+ATTENDANCE_EVENT = "uri://ed-fi.org/AttendanceEventCategoryDescriptor#"
+
+
+def test_descriptor_constant_of_each_mapping() -> None:
+    data = pd.DataFrame({
+        "id": [1, 2, 3, 4],
+        "attendanceEventCategoryDescriptor": [
+            ATTENDANCE_EVENT + "Tardy",
+            ATTENDANCE_EVENT + "excused absence",
+            np.nan,
+            "uri://ed-fi.org/AttendanceEventCategoryDescriptor#Unknown"
+        ]
+    })
+
+    result = get_descriptor_constant(data, "attendanceEventCategoryDescriptor")
+
+    assert data["attendanceEventCategoryDescriptor_codeValue"].tolist()[:2] == ["Tardy", "excused absence"]
+    # A code value with two mappings gets a row for each one.
+    assert result["id"].tolist() == [1, 2, 2, 3, 4]
+    assert result["attendanceEventCategoryDescriptor_constantName"].tolist()[:3] == [
+        "AttendanceEvent.Tardy", "AttendanceEvent.ExcusedAbsence", "AttendanceEvent.Absence"
+    ]
+    assert result["attendanceEventCategoryDescriptor_constantName"].iloc[3:].isna().all()
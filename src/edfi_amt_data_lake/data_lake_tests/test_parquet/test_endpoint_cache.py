@@ -0,0 +1,68 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+import os
+
+from edfi_amt_data_lake.helper.silver_format import read_silver_file, write_silver_file
+from edfi_amt_data_lake.parquet.Common.endpoint_cache import (
+    EndpointCache,
+    estimate_size,
+    get_endpoint_cache,
+    get_normalize_cache,
+)
+from edfi_amt_data_lake.parquet.Common.pandasWrapper import jsonNormalize
+
+
+def _write(tmp_path, name, records) -> str:
+    file_path = os.path.join(tmp_path, f"{name}_0.json")
+    write_silver_file(file_path, records, "json")
+    return file_path
+
+
+def test_endpoint_is_parsed_once_and_evicted_least_recently_used(tmp_path) -> None:
+    records = [{"id": f"{index}", "name": "x" * 20} for index in range(100)]
+    schools = _write(tmp_path, "schools", records)
+    students = _write(tmp_path, "students", records)
+    sections = _write(tmp_path, "sections", records)
+    cache = EndpointCache(memory_budget=estimate_size(records) * 2 + 1)
+
+    assert cache.get(schools, read_silver_file) is cache.get(schools, read_silver_file)
+    cache.get(students, read_silver_file)
+    cache.get(schools, read_silver_file)
+    cache.get(sections, read_silver_file)
+
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.evictions) == (2, 3, 1)
+    cache.get(schools, read_silver_file)
+    assert cache.stats.hits == 3
+    cache.get(students, read_silver_file)
+    assert cache.stats.misses == 4
+
+
+def test_new_silver_file_is_not_served_from_the_cache(tmp_path) -> None:
+    schools = _write(tmp_path, "schools", [{"id": "a"}])
+    cache = EndpointCache(memory_budget=1024 * 1024)
+    assert cache.get(schools, read_silver_file) == [{"id": "a"}]
+
+    _write(tmp_path, "schools", [{"id": "a"}, {"id": "b"}])
+
+    assert cache.get(schools, read_silver_file) == [{"id": "a"}, {"id": "b"}]
+    assert cache.stats.entries == 1
+
+
+def test_endpoint_is_normalized_once_per_spec(tmp_path) -> None:
+    schools = _write(tmp_path, "schools", [
+        {"id": "a", "schoolId": 1, "localEducationAgencyReference": {"localEducationAgencyId": 10}},
+        {"id": "b", "schoolId": 2}
+    ])
+    content = get_endpoint_cache().get(schools, read_silver_file)
+    normalize_cache = get_normalize_cache()
+    misses = normalize_cache.stats.misses
+
+    first = jsonNormalize(content, None, ["id", "schoolId"])
+    first["schoolId"] = 0
+    second = jsonNormalize(content, None, ["schoolId", "localEducationAgencyReference.localEducationAgencyId"])
+
+    assert normalize_cache.stats.misses == misses + 1
+    assert second["schoolId"].tolist() == [1, 2]
+    assert second.columns.tolist() == ["schoolId", "localEducationAgencyReference.localEducationAgencyId"]
@@ -0,0 +1,55 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+from edfi_amt_data_lake.parquet.Common.json_flattener import FlattenTable, jsonFlatten
+from edfi_amt_data_lake.parquet.Common.pandasWrapper import jsonNormalize
+
+STUDENT_ASSESSMENTS = [
+    {
+        "id": "a",
+        "administrationDate": "2022-03-01",
+        "studentReference": {"studentUniqueId": "604822"},
+        "scoreResults": [{"assessmentReportingMethodDescriptor": "uri://ed-fi.org/A#Scale score", "result": "25"}],
+        "studentObjectiveAssessments": [
+            {
+                "objectiveAssessmentReference": {"identificationCode": "O1"},
+                "scoreResults": [{"result": "5"}, {"result": "6"}]
+            }
+        ]
+    },
+    {
+        "id": "b",
+        "administrationDate": "2022-03-02",
+        "studentReference": {"studentUniqueId": "604823"},
+        "scoreResults": None,
+        "studentObjectiveAssessments": [],
+        "performanceLevels": [{"performanceLevelMet": True}]
+    }
+]
+
+
+def test_tables_match_json_normalize() -> None:
+    tables = {
+        "assessments": dict(recordPath=None, meta=["id", "administrationDate", ["studentReference", "studentUniqueId"]]),
+        "scores": dict(recordPath=["scoreResults"], meta=["id"], recordMeta=["assessmentReportingMethodDescriptor", "result"]),
+        "objectives": dict(
+            recordPath=["studentObjectiveAssessments", "scoreResults"],
+            meta=["id", ["studentObjectiveAssessments", "objectiveAssessmentReference", "identificationCode"]],
+            recordMeta=["result"]
+        ),
+        # Not in every record, so an empty table.
+        "levels": dict(recordPath=["performanceLevels"], meta=["id"], recordMeta=["performanceLevelMet"]),
+    }
+
+    result = jsonFlatten(STUDENT_ASSESSMENTS, {name: FlattenTable(**table) for name, table in tables.items()})
+
+    for name, table in tables.items():
+        expected = jsonNormalize(
+            STUDENT_ASSESSMENTS, table["recordPath"], table["meta"], recordMeta=table.get("recordMeta", [])
+        )
+        assert result[name].columns.tolist() == expected.columns.tolist()
+        assert result[name].dtypes.tolist() == expected.dtypes.tolist()
+        assert result[name].reset_index(drop=True).equals(expected.reset_index(drop=True))
+    assert result["objectives"]["result"].tolist() == ["5", "6"]
+    assert result["levels"].empty
@@ -0,0 +1,81 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+import numpy as np
+import pandas as pd
+
+from edfi_amt_data_lake.parquet.Common.pandasWrapper import (
+    CATEGORY,
+    coalesce,
+    create_parquet_file,
+    default_if_empty,
+    explode_items,
+    join_columns,
+    saveParquetFile,
+    to_flag,
+    to_output_schema,
+)
+
+
+def test_column_rules() -> None:
+    data = pd.DataFrame({
+        "sexDescriptor": ["Female", "", np.nan],
+        "sexDescriptor_districtEdOrg": ["Male", "Male", "Male"],
+        "indicator": [True, np.nan, False],
+        "code": ["O1", "", "O2"],
+    })
+
+    assert coalesce(data, "sexDescriptor", "sexDescriptor_districtEdOrg").tolist()[:2] == ["Female", "Male"]
+    assert default_if_empty(data, "sexDescriptor", "n/a").tolist()[:2] == ["Female", "n/a"]
+    assert to_flag(data["indicator"].eq(True), "Work", "Not specified").tolist() == ["Work", "Not specified", "Not specified"]
+    assert to_flag(data["code"] != "").tolist() == [1, 0, 1]
+    assert join_columns(data, ["sexDescriptor_districtEdOrg", "code"]).tolist() == ["Male-O1", "Male-", "Male-O2"]
+
+
+def test_explode_items() -> None:
+    data = pd.DataFrame({
+        "id": ["1", "2", "3", "4"],
+        "uses": [
+            [{"languageUseDescriptor": "Home language"}, {"languageUseDescriptor": "Native language"}],
+            [{"languageUseDescriptor": "Home language"}],
+            [],
+            np.nan,
+        ],
+    })
+
+    result = explode_items(data, "uses", "languageUseDescriptor")
+
+    assert result["id"].tolist() == ["1", "1", "2", "3", "4"]
+    assert result["uses"].tolist()[:3] == ["Home language", "Native language", "Home language"]
+    assert result["uses"].iloc[3:].isnull().all()
+
+
+def test_output_schema_is_written_dictionary_encoded(tmp_path) -> None:
+    data = pd.DataFrame({"StudentKey": ["604822", "604823"], "Sex": ["Female", np.nan]})
+
+    result = to_output_schema(data, {"Sex": CATEGORY, "GradeLevel": CATEGORY})
+    saveParquetFile(result, str(tmp_path), "dim.parquet", "")
+    saved = pd.read_parquet(tmp_path / "dim.parquet", engine="fastparquet")
+
+    assert result["StudentKey"].dtype == object
+    assert saved["Sex"].dtype == CATEGORY
+    assert saved["Sex"].astype(object).equals(data["Sex"])
+
+
+def test_views_read_by_a_view_are_not_generated_by_it(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("PARQUET_FILES_LOCATION", str(tmp_path))
+
+    @create_parquet_file
+    def grading_period_dim(file_name, columns, school_year) -> pd.DataFrame:
+        return pd.DataFrame({"GradingPeriodKey": ["1"]})
+
+    @create_parquet_file
+    def most_recent_grading_period(file_name, columns, school_year) -> pd.DataFrame:
+        return grading_period_dim("gradingPeriodDim.parquet", ["GradingPeriodKey"], school_year).data_frame.head(1)
+
+    assert not most_recent_grading_period("mostRecentGradingPeriod.parquet", ["GradingPeriodKey"], "").successful
+    assert not (tmp_path / "gradingPeriodDim.parquet").exists()
+
+    assert grading_period_dim("gradingPeriodDim.parquet", ["GradingPeriodKey"], "").successful
+    assert most_recent_grading_period("mostRecentGradingPeriod.parquet", ["GradingPeriodKey"], "").successful
@@ -0,0 +1,93 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+import pandas as pd
+import pytest
+
+from edfi_amt_data_lake.parquet.Common.parquet_writer import (
+    MonthPartition,
+    ParquetWriterOptions,
+    read_parquet,
+    write_parquet,
+)
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+GRADES = pd.DataFrame({
+    "SchoolKey": ["255901", "255902", "255901", "255902", "255901"],
+    "StudentKey": ["604825", "604822", "604822", "604823", "604824"],
+    "GradeType": pd.Series(["Final", "Semester", "Final", "Final", "Semester"], dtype="category"),
+})
+
+
+def test_view_options_override_settings(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("PARQUET_ENGINE", "pyarrow")
+    monkeypatch.setenv("PARQUET_COMPRESSION", "gzip")
+    monkeypatch.setenv("PARQUET_ROW_GROUP_SIZE", "2")
+    file_path = str(tmp_path / "grades.parquet")
+
+    write_parquet(GRADES, file_path, ParquetWriterOptions(compression="zstd", sort_by=["SchoolKey", "StudentKey"]))
+
+    metadata = pq.ParquetFile(file_path).metadata
+    assert metadata.num_row_groups == 3
+    assert metadata.row_group(0).column(0).compression == "ZSTD"
+    assert metadata.row_group(0).column(0).statistics.max == "255901"
+    result = read_parquet(file_path)
+    assert result["StudentKey"].tolist() == ["604822", "604824", "604825", "604822", "604823"]
+    assert result["GradeType"].dtype == "category"
+
+
+def test_views_are_read_with_the_engine_they_are_written_with(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("PARQUET_ENGINE", "fastparquet")
+    file_path = str(tmp_path / "grades.parquet")
+    options = ParquetWriterOptions(engine="pyarrow")
+    engines = []
+    pandas_read_parquet = pd.read_parquet
+
+    def read_parquet_with(path, engine) -> pd.DataFrame:
+        engines.append(engine)
+        return pandas_read_parquet(path, engine=engine)
+
+    write_parquet(GRADES, file_path, options)
+    monkeypatch.setattr(pd, "read_parquet", read_parquet_with)
+
+    assert read_parquet(file_path, options)["StudentKey"].tolist() == GRADES["StudentKey"].tolist()
+    assert engines == ["pyarrow"]
+
+
+def test_fastparquet_without_dictionary(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("PARQUET_ENGINE", "")
+    monkeypatch.setenv("PARQUET_DICTIONARY", "False")
+    file_path = str(tmp_path / "grades.parquet")
+
+    write_parquet(GRADES, file_path)
+
+    column = pq.ParquetFile(file_path).metadata.row_group(0).column(2)
+    assert column.compression == "SNAPPY"
+    assert "PLAIN_DICTIONARY" not in column.encodings and "RLE_DICTIONARY" not in column.encodings
+    assert read_parquet(file_path).equals(GRADES.astype({"GradeType": object}))
+
+
+@pytest.mark.parametrize("engine", ["fastparquet", "pyarrow"])
+def test_partitioned_view(tmp_path, monkeypatch, engine) -> None:
+    monkeypatch.setenv("PARQUET_ENGINE", engine)
+    monkeypatch.setenv("PARQUET_PARTITIONED_VIEWS", "True")
+    attendance = pd.DataFrame({
+        "StudentKey": ["604822", "604823", "604822", "604824"],
+        "SchoolKey": ["255901", "255901", "255902", None],
+        "DateKey": ["20220115", "20220203", "20220115", "20220301"],
+    })
+    options = ParquetWriterOptions(partition_by=["SchoolKey", MonthPartition("DateKey")])
+    file_path = str(tmp_path / "attendance.parquet")
+
+    write_parquet(attendance, file_path, options)
+
+    assert (tmp_path / "attendance.parquet" / "_metadata").is_file()
+    assert (tmp_path / "attendance.parquet" / "SchoolKey=255901" / "DateKeyMonth=202202").is_dir()
+    result = read_parquet(file_path, options, columns=attendance.columns.tolist())
+    assert result.sort_values("StudentKey", kind="stable", ignore_index=True).equals(
+        attendance.sort_values("StudentKey", kind="stable", ignore_index=True)
+    )
+    school = read_parquet(file_path, options, columns=attendance.columns.tolist(), partitions={"SchoolKey": ["255902"]})
+    assert school.values.tolist() == [["604822", "255902", "20220115"]]
@@ -0,0 +1,35 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+import pandas as pd
+
+from edfi_amt_data_lake.parquet.amt.rls.rls_user_student_data_authorization.main import (
+    expand_scope_authorization,
+)
+
+USER_SCOPE = pd.DataFrame({
+    "UserKey": ["207219", "207220", "207220"],
+    "ScopeKey": ["District-255901", "School-255901001", "Section-25590100102Trad220ALG112011-255901001"],
+    "Scope": ["District", "School", "Section"],
+})
+
+SCOPE_STUDENT = pd.DataFrame({
+    "ScopeKey": [
+        "District-255901", "District-255901", "School-255901001",
+        "Section-25590100102Trad220ALG112011-255901001"
+    ],
+    "StudentKey": ["604822", "604823", "604822", "604822"],
+})
+
+
+def test_scopes_are_expanded_to_user_student_pairs() -> None:
+    result = expand_scope_authorization(USER_SCOPE, SCOPE_STUDENT)
+
+    assert result.values.tolist() == [["207219", "604822"], ["207219", "604823"], ["207220", "604822"]]
+
+
+def test_scopes_are_expanded_for_the_users_given() -> None:
+    result = expand_scope_authorization(USER_SCOPE, SCOPE_STUDENT, users=["207220"])
+
+    assert result.values.tolist() == [["207220", "604822"]]
@@ -0,0 +1,55 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+import pandas as pd
+
+from edfi_amt_data_lake.parquet.Common.student_partitions import (
+    get_partition_workers,
+    get_student_partitions,
+    run_by_student_partition,
+    set_view_workers,
+)
+
+ATTENDANCE_EVENTS = pd.DataFrame({
+    "studentUniqueId": ["604822", "604823", "604822", "604824", "604825"],
+    "schoolId": [255901, 255901, 255901, 255902, 255902],
+})
+
+SCHOOLS = pd.DataFrame({"schoolId": [255901, 255902], "nameOfInstitution": ["Grand Bend High School", "Grand Bend Middle School"]})
+
+
+def _count_events(attendance_events: pd.DataFrame, schools: pd.DataFrame) -> pd.DataFrame:
+    return attendance_events.merge(schools).groupby(["studentUniqueId", "nameOfInstitution"]).size().reset_index()
+
+
+def test_student_keys_of_any_type_are_in_the_same_partition() -> None:
+    partitions = get_student_partitions(pd.Series(["604822", 604822, "604823"], dtype=object), 4)
+
+    assert partitions[0] == partitions[1]
+    assert all(0 <= partition < 4 for partition in partitions)
+
+
+def test_partitions_give_the_rows_of_a_single_process() -> None:
+    expected = _count_events(ATTENDANCE_EVENTS, SCHOOLS)
+
+    result = run_by_student_partition(
+        _count_events,
+        partitioned={"attendance_events": (ATTENDANCE_EVENTS, "studentUniqueId")},
+        shared={"schools": SCHOOLS},
+        workers=3
+    )
+
+    assert result.sort_values("studentUniqueId", ignore_index=True).equals(expected)
+
+
+def test_partitions_share_the_cpus_left_by_the_views(monkeypatch) -> None:
+    monkeypatch.setenv("OS_CPU", "8")
+    monkeypatch.setenv("PARQUET_PARTITION_WORKERS", "6")
+
+    set_view_workers(4)
+    try:
+        assert get_partition_workers() == 2
+    finally:
+        set_view_workers(1)
+    assert get_partition_workers() == 6
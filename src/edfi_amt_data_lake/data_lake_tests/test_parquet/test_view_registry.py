@@ -0,0 +1,33 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+import pandas as pd
+
+from edfi_amt_data_lake.parquet.Common.view_registry import ViewRegistry
+
+STUDENT_SCHOOL_DIM = "studentSchoolDim.parquet"
+
+
+def test_view_is_kept_until_its_last_reader() -> None:
+    view_registry = ViewRegistry()
+    view_registry.set_readers({STUDENT_SCHOOL_DIM: 2})
+    data_frame = pd.DataFrame({"StudentSchoolKey": ["604822-255901"]})
+
+    assert view_registry.add(STUDENT_SCHOOL_DIM, data_frame)
+    first = view_registry.get(STUDENT_SCHOOL_DIM)
+    first["StudentSchoolKey"] = ""
+    last = view_registry.get(STUDENT_SCHOOL_DIM)
+
+    assert last is data_frame
+    assert last["StudentSchoolKey"].tolist() == ["604822-255901"]
+    assert view_registry.get(STUDENT_SCHOOL_DIM) is None
+    assert view_registry.stats.releases == 1
+
+
+def test_view_read_by_its_only_reader_is_not_kept() -> None:
+    view_registry = ViewRegistry()
+    view_registry.set_readers({STUDENT_SCHOOL_DIM: 1})
+
+    assert not view_registry.add(STUDENT_SCHOOL_DIM, pd.DataFrame(), read=True)
+    assert not view_registry.add("schoolDim.parquet", pd.DataFrame())
@@ -0,0 +1,186 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+import requests
+from dagster import get_dagster_logger
+from decouple import config
+from requests.adapters import HTTPAdapter
+
+ACCEPT_ENCODING = "gzip, deflate"
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
+
+def get_max_connections_per_host() -> int:
+    return max(1, config("API_MAX_CONNECTIONS_PER_HOST", default=10, cast=int))
+
+
+def is_async_client_enabled() -> bool:
+    return config("API_ASYNC_CLIENT", default=False, cast=bool)
+
+
+def get_max_retries() -> int:
+    return max(0, config("API_MAX_RETRIES", default=5, cast=int))
+
+
+# Seconds to wait before retrying a request. The Retry-After header sent by the
+# API wins; otherwise exponential backoff with full jitter is used.
+def get_retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                retry_date = parsedate_to_datetime(retry_after)
+                return max(0.0, (retry_date - datetime.now(timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+    backoff = config("API_RETRY_BACKOFF", default=1.0, cast=float)
+    max_backoff = config("API_RETRY_MAX_BACKOFF", default=60.0, cast=float)
+    return random.uniform(0, min(max_backoff, backoff * 2 ** attempt))
+
+
+# Shared HTTP client for the Ed-Fi API. Connections are kept alive and pooled,
+# so every page does not pay a new TCP/TLS handshake, and the pool blocks when
+# all the connections to a host are in use, capping the requests in flight.
+# Connection errors and transient responses are retried up to max_retries times.
+class ApiClient:
+    def __init__(self, max_connections_per_host: int, verify_cert: bool, max_retries: int = 0):
+        self.verify_cert = verify_cert
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        self.session.headers.update({"Accept-Encoding": ACCEPT_ENCODING})
+        adapter = HTTPAdapter(
+            pool_connections=max_connections_per_host,
+            pool_maxsize=max_connections_per_host,
+            pool_block=True
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _send(self, method: str, url: str, headers: Optional[dict] = None, data: Any = None) -> requests.Response:
+        attempt = 0
+        while True:
+            try:
+                response = self.session.request(method, url, headers=headers, data=data, verify=self.verify_cert)
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+                delay = get_retry_delay(attempt, response.headers.get("Retry-After"))
+                reason = f"{response.status_code} - {response.reason}"
+                response.close()
+            except (requests.ConnectionError, requests.Timeout) as ex:
+                if attempt >= self.max_retries:
+                    raise
+                delay = get_retry_delay(attempt)
+                reason = f"{type(ex).__name__}"
+            attempt += 1
+            get_dagster_logger().warning(
+                f"Request {url} failed ({reason}). Retry {attempt} of {self.max_retries} in {delay:.1f}s."
+            )
+            time.sleep(delay)
+
+    def get(self, url: str, headers: Optional[dict] = None) -> requests.Response:
+        return self._send("GET", url, headers=headers)
+
+    def post(self, url: str, headers: Optional[dict] = None, data: Any = None) -> requests.Response:
+        return self._send("POST", url, headers=headers, data=data)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+# Asynchronous variant for high fan-out requests (e.g. the offset windows of an
+# endpoint). Requires the optional httpx package.
+class AsyncApiClient:
+    def __init__(self, max_connections_per_host: int, verify_cert: bool, max_retries: int = 0):
+        try:
+            import httpx
+        except ImportError as ex:
+            raise ImportError("API_ASYNC_CLIENT requires the httpx package to be installed.") from ex
+        self.httpx = httpx
+        self.verify_cert = verify_cert
+        self.max_connections_per_host = max_connections_per_host
+        self.max_retries = max_retries
+
+    async def _get_json(self, client: Any, url: str, headers: Optional[dict]) -> Optional[Any]:
+        attempt = 0
+        while True:
+            try:
+                response = await client.get(url, headers=headers)
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response.json() if response.is_success else None
+                delay = get_retry_delay(attempt, response.headers.get("Retry-After"))
+            except self.httpx.TransportError:
+                if attempt >= self.max_retries:
+                    return None
+                delay = get_retry_delay(attempt)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def _create_client(self) -> Any:
+        limits = self.httpx.Limits(
+            max_connections=self.max_connections_per_host,
+            max_keepalive_connections=self.max_connections_per_host
+        )
+        return self.httpx.AsyncClient(
+            limits=limits,
+            verify=self.verify_cert,
+            headers={"Accept-Encoding": ACCEPT_ENCODING}
+        )
+
+    async def _get_json_batch(self, client: Any, urls: list, headers: Optional[dict]) -> list:
+        return await asyncio.gather(*[self._get_json(client, url, headers) for url in urls])
+
+    # Yields the JSON content of every batch of urls, in the same order, or None
+    # for the urls that did not answer successfully. A batch is only requested once
+    # the previous one is consumed, so a single batch is kept in memory; the
+    # connections are kept between batches. get_headers is called for every batch,
+    # a refreshed token is used.
+    def get_json_batches(self, url_batches: Iterable[list], get_headers: Callable[[], dict]) -> Iterator[list]:
+        loop = asyncio.new_event_loop()
+        client = self._create_client()
+        try:
+            for urls in url_batches:
+                headers = get_headers()
+                yield loop.run_until_complete(self._get_json_batch(client, urls, headers))
+        finally:
+            loop.run_until_complete(client.aclose())
+            loop.close()
+
+
+_api_client: Optional[ApiClient] = None
+_async_api_client: Optional[AsyncApiClient] = None
+_api_client_lock = threading.Lock()
+
+
+def get_api_client() -> ApiClient:
+    global _api_client
+    with _api_client_lock:
+        if _api_client is None:
+            _api_client = ApiClient(
+                max_connections_per_host=get_max_connections_per_host(),
+                verify_cert=config('REQUESTS_CERT_VERIFICATION', default=True, cast=bool),
+                max_retries=get_max_retries()
+            )
+        return _api_client
+
+
+def get_async_api_client() -> AsyncApiClient:
+    global _async_api_client
+    with _api_client_lock:
+        if _async_api_client is None:
+            _async_api_client = AsyncApiClient(
+                max_connections_per_host=get_max_connections_per_host(),
+                verify_cert=config('REQUESTS_CERT_VERIFICATION', default=True, cast=bool),
+                max_retries=get_max_retries()
+            )
+        return _async_api_client
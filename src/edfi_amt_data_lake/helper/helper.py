@@ -5,14 +5,12 @@
 
 import json
 import os
-from typing import Any
+import shutil
 
 from dagster import get_dagster_logger
 from dagster.utils import file_relative_path
 from decouple import config
 
-from edfi_amt_data_lake.helper.base import JSONFile
-
 API_MODE = config("API_MODE")
 SCHOOL_YEAR = config("SCHOOL_YEAR")
 
@@ -31,22 +29,6 @@ def get_endpoint() -> list:
     return data
 
 
-# Create a function to save JSON into a file in the json directory.
-def save_file(json_file: JSONFile, json_file_sufix: Any, data: Any, school_year: str) -> None:
-    parquet_logger = get_dagster_logger()
-    if data:
-        json_location = get_path(config('SILVER_DATA_LOCATION'), school_year)
-        path = os.path.join(json_location, json_file.directory)
-        if not os.path.exists(path):
-            os.makedirs(path, exist_ok=True)
-        file_path = os.path.join(path, f'{json_file.name}_{json_file_sufix}.json')
-        with open(file_path, "w") as file:
-            json.dump(data, file, indent=4)
-            file_size = os.path.getsize(file_path) / 1000000
-            parquet_logger.info(f"File {json_file.name}({json_file_sufix}) saved with {file_size} MB")
-    return None
-
-
 # Create a function to get endpoint url.
 def get_url(endpoint: str, school_year: str, is_deletes_endpoint: bool = False) -> str:
     deletes = "/deletes" if is_deletes_endpoint else ""
@@ -69,6 +51,10 @@ def get_descriptor_mapping_config() -> list:
     return data
 
 
+def get_os_cpu() -> int:
+    return config("OS_CPU", cast=int) if config("OS_CPU", default="") else (os.cpu_count() or 1)
+
+
 def get_path(path: str, school_year: str):
     school_year_path = f"{school_year}/" if school_year else ""
     destination_folder = os.path.join(path, school_year_path) if school_year_path == '' else path
@@ -85,7 +71,11 @@ def delete_files_by_extension(path: str, extension_list: list[str]) -> None:
             for extension in extension_list:
                 if file.endswith(f"{extension}"):
                     file_to_remove = os.path.join(path, file)
-                    os.remove(file_to_remove)
+                    # The partitioned views are folders.
+                    if os.path.isdir(file_to_remove):
+                        shutil.rmtree(file_to_remove)
+                    else:
+                        os.remove(file_to_remove)
                     parquet_logger.debug(f'Deleted file: {file_to_remove}')
                     count_deleted_files += 1
         parquet_logger.info(f'Deleted files: {count_deleted_files}')
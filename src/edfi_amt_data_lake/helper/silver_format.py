@@ -0,0 +1,221 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import gzip
+import io
+import json
+import os
+from typing import Any, Iterator, Optional
+
+from dagster import get_dagster_logger
+from decouple import config
+
+SILVER_FORMAT_JSON = "json"
+SILVER_FORMAT_NDJSON = "ndjson"
+SILVER_FORMAT_NDJSON_GZIP = "ndjson.gz"
+SILVER_FORMAT_NDJSON_ZSTD = "ndjson.zst"
+SILVER_FORMAT_PARQUET = "parquet"
+# Longest extensions first, so "ndjson.gz" is not taken for "json".
+SILVER_FORMATS = [
+    SILVER_FORMAT_NDJSON_GZIP,
+    SILVER_FORMAT_NDJSON_ZSTD,
+    SILVER_FORMAT_NDJSON,
+    SILVER_FORMAT_PARQUET,
+    SILVER_FORMAT_JSON,
+]
+
+DELETES_SUFIX = "deletes"
+
+DEFAULT_GZIP_LEVEL = 6
+DEFAULT_ZSTD_LEVEL = 3
+PARQUET_BATCH_SIZE = 10000
+
+
+def get_silver_format() -> str:
+    silver_format = config("SILVER_DATA_FORMAT", default=SILVER_FORMAT_JSON).lower()
+    if silver_format not in SILVER_FORMATS:
+        get_dagster_logger().warning(f"Unknown SILVER_DATA_FORMAT {silver_format}, using {SILVER_FORMAT_JSON}.")
+        return SILVER_FORMAT_JSON
+    return silver_format
+
+
+# Empty to use the default level of the codec.
+def _get_compression_level(default: int) -> int:
+    compression_level = config("SILVER_DATA_COMPRESSION_LEVEL", default="")
+    return int(compression_level) if compression_level else default
+
+
+# Format of a silver file, from its extension. None when it is not a silver file.
+def get_file_format(file_name: str) -> Optional[str]:
+    for silver_format in SILVER_FORMATS:
+        if file_name.endswith(f".{silver_format}"):
+            return silver_format
+    return None
+
+
+# A silver file of an endpoint: {name}_{change_version}.{format}, or
+# {name}_deletes_{change_version}.{format} for the records deleted up to that
+# change version.
+class SilverFile:
+    def __init__(self, file_name: str, silver_format: str, change_version: int, is_deletes: bool):
+        self.file_name = file_name
+        self.silver_format = silver_format
+        self.change_version = change_version
+        self.is_deletes = is_deletes
+
+
+def parse_file_name(file_name: str) -> Optional[SilverFile]:
+    silver_format = get_file_format(file_name)
+    if silver_format is None:
+        return None
+    prefix, _, change_version = file_name[:-len(silver_format) - 1].rpartition("_")
+    return SilverFile(
+        file_name,
+        silver_format,
+        int(change_version) if change_version.isdigit() else -1,
+        prefix.endswith(f"_{DELETES_SUFIX}")
+    )
+
+
+def get_silver_files(path: str) -> list:
+    if not os.path.isdir(path):
+        return []
+    silver_files = [parse_file_name(file_name) for file_name in os.listdir(path)]
+    return [silver_file for silver_file in silver_files if silver_file is not None]
+
+
+# The newest file with the records of an endpoint.
+def get_latest_file(path: str) -> Optional[SilverFile]:
+    silver_files = [silver_file for silver_file in get_silver_files(path) if not silver_file.is_deletes]
+    return max(silver_files, key=lambda silver_file: silver_file.change_version, default=None)
+
+
+def _get_zstandard() -> Any:
+    try:
+        import zstandard
+    except ImportError as ex:
+        raise ImportError(f"SILVER_DATA_FORMAT {SILVER_FORMAT_NDJSON_ZSTD} requires the zstandard package.") from ex
+    return zstandard
+
+
+def _get_pyarrow() -> tuple:
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as ex:
+        raise ImportError(f"SILVER_DATA_FORMAT {SILVER_FORMAT_PARQUET} requires the pyarrow package.") from ex
+    return pyarrow, pyarrow.parquet
+
+
+# Bytes written at the start and at the end of a silver file.
+def get_header(silver_format: str) -> bytes:
+    return b"[" if silver_format == SILVER_FORMAT_JSON else b""
+
+
+def get_footer(silver_format: str) -> bytes:
+    return b"\n]" if silver_format == SILVER_FORMAT_JSON else b""
+
+
+# Encode a page of records to be appended to a silver file. Compressed pages are
+# written as independent gzip members / zstd frames, so a file can be appended to
+# (and truncated back to the end of a page) without decompressing it. Parquet files
+# are written as NDJSON while extracting and converted once the endpoint is complete.
+def encode_page(silver_format: str, records: list, first_page: bool) -> bytes:
+    if silver_format == SILVER_FORMAT_JSON:
+        separator = "\n" if first_page else ",\n"
+        return (separator + ",\n".join(json.dumps(record) for record in records)).encode("utf-8")
+    data = "".join(f"{json.dumps(record)}\n" for record in records).encode("utf-8")
+    if silver_format == SILVER_FORMAT_NDJSON_GZIP:
+        return gzip.compress(data, compresslevel=_get_compression_level(DEFAULT_GZIP_LEVEL))
+    if silver_format == SILVER_FORMAT_NDJSON_ZSTD:
+        return _get_zstandard().ZstdCompressor(level=_get_compression_level(DEFAULT_ZSTD_LEVEL)).compress(data)
+    return data
+
+
+def _read_ndjson(file: Any) -> Iterator[Any]:
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _read_batches(file_path: str, batch_size: int) -> Iterator[list]:
+    with open(file_path, "r") as file:
+        batch = []
+        for record in _read_ndjson(file):
+            batch.append(record)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+# Convert a complete NDJSON file to parquet, keeping the nested objects and arrays
+# as struct and list columns. The schema is taken from every batch, so a field that
+# only shows up in some records is kept, and the records are converted a batch at
+# a time to keep the memory bounded.
+def convert_ndjson_to_parquet(ndjson_path: str, parquet_path: str) -> None:
+    pyarrow, parquet = _get_pyarrow()
+    # Infer the struct of every record of the batch, not only the fields of the first one.
+    schema = pyarrow.unify_schemas(
+        [pyarrow.schema(pyarrow.array(batch).type) for batch in _read_batches(ndjson_path, PARQUET_BATCH_SIZE)],
+        promote_options="permissive"
+    )
+    with parquet.ParquetWriter(
+        f"{parquet_path}.tmp",
+        schema,
+        compression=config("SILVER_DATA_PARQUET_COMPRESSION", default="zstd")
+    ) as writer:
+        for batch in _read_batches(ndjson_path, PARQUET_BATCH_SIZE):
+            writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+    os.replace(f"{parquet_path}.tmp", parquet_path)
+
+
+# Write a whole silver file at once. The file is written aside and renamed, so a
+# reader never gets a partial file.
+def write_silver_file(file_path: str, records: list, silver_format: str) -> None:
+    temp_file_path = f"{file_path}.new"
+    with open(temp_file_path, "wb") as file:
+        file.write(get_header(silver_format))
+        for start in range(0, len(records), PARQUET_BATCH_SIZE):
+            file.write(encode_page(silver_format, records[start:start + PARQUET_BATCH_SIZE], first_page=start == 0))
+        file.write(get_footer(silver_format))
+    if silver_format == SILVER_FORMAT_PARQUET:
+        convert_ndjson_to_parquet(temp_file_path, file_path)
+        os.remove(temp_file_path)
+    else:
+        os.replace(temp_file_path, file_path)
+
+
+# Columnar files have a value for every field of the schema. The Ed-Fi API does
+# not send empty fields, drop them to get back the records as they were extracted.
+def _drop_nulls(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _drop_nulls(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        return [_drop_nulls(item) for item in value]
+    return value
+
+
+# Read every record of a silver file, whatever format it was written with.
+def read_silver_file(file_path: str) -> list:
+    silver_format = get_file_format(file_path)
+    if silver_format == SILVER_FORMAT_JSON:
+        with open(file_path, "r") as file:
+            return json.loads(file.read())
+    if silver_format == SILVER_FORMAT_NDJSON:
+        with open(file_path, "r") as file:
+            return list(_read_ndjson(file))
+    if silver_format == SILVER_FORMAT_NDJSON_GZIP:
+        with gzip.open(file_path, "rt") as file:
+            return list(_read_ndjson(file))
+    if silver_format == SILVER_FORMAT_NDJSON_ZSTD:
+        with open(file_path, "rb") as file:
+            reader = _get_zstandard().ZstdDecompressor().stream_reader(file, read_across_frames=True)
+            return list(_read_ndjson(io.TextIOWrapper(reader, encoding="utf-8")))
+    if silver_format == SILVER_FORMAT_PARQUET:
+        _, parquet = _get_pyarrow()
+        return [_drop_nulls(record) for record in parquet.read_table(file_path).to_pylist()]
+    raise ValueError(f"{file_path} is not a silver data file.")
@@ -4,28 +4,85 @@
 # See the LICENSE and NOTICES files in the project root for more information.
 
 import base64
+import threading
+import time
+from typing import Optional
 
 import requests
 from decouple import config
 
+from edfi_amt_data_lake.helper.api_client import get_api_client
+from edfi_amt_data_lake.helper.helper import get_headers
 
-# Get the API key from the environment variables
-def get_token() -> str:
-    # Get the token from the Ed-Fi API
+TOKEN_NOT_AVAILABLE = "Not able to get the token"
+DEFAULT_EXPIRES_IN = 1800
+
+
+# Request a new token from the Ed-Fi API. Returns the token and the seconds it is valid for.
+def _request_token() -> tuple:
     api_user = config('API_KEY')
     api_password = config('API_SECRET')
     api_url_token = f"{config('API_URL')}/{config('PREX_TOKEN')}"
-    verify_cert = config('REQUESTS_CERT_VERIFICATION', default=True, cast=bool)
 
     credential = ":".join((api_user, api_password))
     credential_encoded = base64.b64encode(credential.encode("utf-8"))
     access_headers = {"Authorization": b"Basic " + credential_encoded}
     access_params = {"grant_type": "client_credentials"}
 
-    response = requests.post(api_url_token, headers=access_headers, data=access_params, verify=verify_cert)
+    response = get_api_client().post(api_url_token, headers=access_headers, data=access_params)
 
     if response.status_code == 200:
-        return response.json()["access_token"]
+        response_json = response.json()
+        return response_json["access_token"], int(response_json.get("expires_in", DEFAULT_EXPIRES_IN))
 
     else:
-        return "Not able to get the token"
+        return None, 0
+
+
+# Token shared by every worker of the process. The token is refreshed before it
+# expires, so long extractions do not fail halfway with an expired token. Tokens
+# valid for less than twice the margin are refreshed halfway through instead.
+class TokenManager:
+    def __init__(self, refresh_margin: int):
+        self.refresh_margin = refresh_margin
+        self._token: Optional[str] = None
+        self._refresh_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_token(self) -> str:
+        with self._lock:
+            if self._token is None or time.monotonic() >= self._refresh_at:
+                token, expires_in = _request_token()
+                if token is None:
+                    self._token = None
+                    return TOKEN_NOT_AVAILABLE
+                self._token = token
+                self._refresh_at = time.monotonic() + expires_in - min(self.refresh_margin, expires_in // 2)
+            return self._token
+
+    # Discard the token if it was rejected, unless another worker already replaced it.
+    def invalidate(self, token: str) -> None:
+        with self._lock:
+            if self._token == token:
+                self._token = None
+
+
+_token_manager = TokenManager(
+    refresh_margin=config("API_TOKEN_REFRESH_MARGIN", default=60, cast=int)
+)
+
+
+# Get the API key from the environment variables
+def get_token() -> str:
+    return _token_manager.get_token()
+
+
+# GET an Ed-Fi API resource with the shared token. When the token is rejected
+# a new one is requested and the request is sent once more.
+def get_with_token(url: str) -> requests.Response:
+    token = get_token()
+    response = get_api_client().get(url, headers=get_headers(token))
+    if response.status_code == 401:
+        _token_manager.invalidate(token)
+        response = get_api_client().get(url, headers=get_headers(get_token()))
+    return response
@@ -0,0 +1,49 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import numpy as np
+import pandas as pd
+from decouple import config
+
+MB = 1024 * 1024
+
+
+# Memory budget, in bytes, of each chunk of the views generated in chunks. 0 when
+# they are generated at once.
+def get_chunk_memory_budget() -> int:
+    return max(0, config("PARQUET_CHUNK_MEMORY_MB", default=0, cast=int)) * MB
+
+
+# Split the rows of data in chunks whose cost, in bytes, stays under the budget.
+# The rows of a group (like a school) are kept in the same chunk, and a group over
+# the budget alone is split in ranges of split_column (like the students). The
+# chunks are in the order of the group and split values as strings, the order of
+# the sorted views. Returns the chunk number of every row and how many chunks.
+def get_chunk_numbers(
+    data: pd.DataFrame,
+    group_column: str,
+    split_column: str,
+    row_bytes: pd.Series,
+    budget: int
+) -> tuple:
+    units = pd.DataFrame({
+        "group": data[group_column].astype(str).to_numpy(),
+        "split": data[split_column].astype(str).to_numpy(),
+        "bytes": row_bytes.to_numpy()
+    })
+    group_bytes = units.groupby("group")["bytes"].transform("sum")
+    units["split"] = units["split"].where(group_bytes > budget, "")
+    unit_bytes = units.groupby(["group", "split"], sort=True)["bytes"].sum()
+    unit_chunks = np.zeros(len(unit_bytes), dtype=np.int64)
+    chunk, chunk_bytes = 0, 0
+    for position, size in enumerate(unit_bytes.to_numpy()):
+        if chunk_bytes and chunk_bytes + size > budget:
+            chunk, chunk_bytes = chunk + 1, 0
+        unit_chunks[position] = chunk
+        chunk_bytes += size
+    chunk_numbers = pd.Series(unit_chunks, index=unit_bytes.index).reindex(
+        pd.MultiIndex.from_frame(units[["group", "split"]])
+    ).to_numpy()
+    return chunk_numbers, (chunk + 1 if len(unit_bytes) else 0)
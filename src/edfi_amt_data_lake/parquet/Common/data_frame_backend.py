@@ -0,0 +1,165 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from dagster import get_dagster_logger
+from decouple import Csv, config
+
+BACKEND_PANDAS = "pandas"
+BACKEND_POLARS = "polars"
+
+# Joins run on Polars only for these, the other ones run on pandas.
+POLARS_JOINS = ["inner", "left"]
+
+_LEFT_ROW = "__left_row"
+_RIGHT_ROW = "__right_row"
+_KEY_ROW = "__key_row"
+_JOIN_KEY = "__join_key_{0}"
+_COUNT = "__count"
+
+_current_backend: ContextVar[str] = ContextVar("data_frame_backend", default=BACKEND_PANDAS)
+# Whether polars could not be imported, it is only warned about once.
+_polars_missing = False
+
+
+# File names of the views that opted in to Polars.
+def get_polars_views() -> list:
+    return config("POLARS_VIEWS", default="", cast=Csv())
+
+
+def get_view_backend(file_name: str) -> str:
+    return BACKEND_POLARS if file_name in get_polars_views() else BACKEND_PANDAS
+
+
+def get_current_backend() -> str:
+    return _current_backend.get()
+
+
+# Backend of the joins and cross tabulations of the pandasWrapper while a view is
+# generated. The views a view reads are generated with their own backend.
+@contextmanager
+def use_backend(backend: str):
+    token = _current_backend.set(backend)
+    try:
+        yield
+    finally:
+        _current_backend.reset(token)
+
+
+def merge(left: pd.DataFrame, right: pd.DataFrame, how: str, left_on: list, right_on: list, suffixes: tuple) -> pd.DataFrame:
+    if get_current_backend() == BACKEND_POLARS and how in POLARS_JOINS:
+        result = _run_on_polars(_polars_merge, left, right, how, list(left_on), list(right_on), suffixes)
+        if result is not None:
+            return result
+    return pd.merge(left, right, how=how, left_on=left_on, right_on=right_on, suffixes=suffixes)
+
+
+def crosstab(index: list, columns: pd.Series) -> pd.DataFrame:
+    if get_current_backend() == BACKEND_POLARS:
+        result = _run_on_polars(_polars_crosstab, index, columns)
+        if result is not None:
+            return result
+    return pd.crosstab(index, columns)
+
+
+# The data frames Polars can not take as they are, like object columns of mixed
+# types or join keys of different types, run on pandas. Without polars, every
+# view runs on pandas.
+def _run_on_polars(function, *arguments) -> Optional[pd.DataFrame]:
+    global _polars_missing
+    if _polars_missing:
+        return None
+    try:
+        return function(*arguments)
+    except ImportError as import_exception:
+        _polars_missing = True
+        get_dagster_logger().warning(f"POLARS_VIEWS run on pandas, polars can not be imported: {import_exception}")
+        return None
+    except Exception as polars_exception:
+        get_dagster_logger().debug(f"{function.__name__} runs on pandas: {polars_exception}")
+        return None
+
+
+# pd.merge with the join run as a lazy Polars query on the keys alone: Polars
+# finds the rows of left and right that match, nulls match nulls, and the columns
+# are taken from them on pandas, so their types and missing values stay as
+# pd.merge leaves them. The rows are in the order of pd.merge: the ones of left,
+# grouped by key in the order the keys first come in left for inner joins, and
+# then the ones of right they match.
+def _polars_merge(left: pd.DataFrame, right: pd.DataFrame, how: str, left_on: list, right_on: list, suffixes: tuple) -> pd.DataFrame:
+    import polars as pl
+
+    if not (left.columns.is_unique and right.columns.is_unique) or left.empty or right.empty:
+        return None
+    # pd.merge casts keys of different types, like categorical keys with other
+    # categories, to a common type: they run on pandas.
+    if any(left[left_key].dtype != right[right_key].dtype for left_key, right_key in zip(left_on, right_on)):
+        return None
+    # A key of the same name in both data frames is kept once, from left.
+    right_columns = right.columns.drop([
+        right_key for left_key, right_key in zip(left_on, right_on) if left_key == right_key
+    ])
+    overlapping = set(left.columns) & set(right_columns)
+    if overlapping and suffixes[0] is None and suffixes[1] is None:
+        return None
+    join_keys = [_JOIN_KEY.format(position) for position in range(len(left_on))]
+    left_keys = _to_polars(left[left_on], join_keys).with_columns(pl.Series(_LEFT_ROW, np.arange(len(left))))
+    right_keys = _to_polars(right[right_on], join_keys).with_columns(pl.Series(_RIGHT_ROW, np.arange(len(right))))
+    query = left_keys.lazy().join(right_keys.lazy(), on=join_keys, how=how, nulls_equal=True)
+    order = [_LEFT_ROW, _RIGHT_ROW]
+    if how == "inner":
+        query = query.with_columns(pl.col(_LEFT_ROW).min().over(join_keys).alias(_KEY_ROW))
+        order = [_KEY_ROW] + order
+    rows = query.sort(order, nulls_last=True).select(_LEFT_ROW, _RIGHT_ROW).collect()
+    if rows.is_empty():
+        return None
+    left_rows = rows[_LEFT_ROW].to_numpy()
+    right_rows = rows[_RIGHT_ROW].fill_null(-1).to_numpy()
+    left_result = left.take(left_rows).reset_index(drop=True)
+    right_result = right[right_columns].reset_index(drop=True)
+    # The rows of left with no match get missing values, like with pd.merge.
+    right_result = (
+        right_result.reindex(right_rows) if (right_rows < 0).any() else right_result.take(right_rows)
+    ).reset_index(drop=True)
+    return pd.concat([
+        left_result.set_axis([_get_suffixed(column, suffixes[0], overlapping) for column in left.columns], axis=1),
+        right_result.set_axis([_get_suffixed(column, suffixes[1], overlapping) for column in right_columns], axis=1)
+    ], axis=1)
+
+
+def _get_suffixed(column: str, suffix: Optional[str], overlapping: set) -> str:
+    return f"{column}{suffix}" if column in overlapping and suffix else column
+
+
+# pd.crosstab of the columns series by the index series, counted on Polars. Only
+# the counts, far fewer rows than the data, are pivoted on pandas. The rows are
+# sorted by the index values, the views join on them.
+def _polars_crosstab(index: list, columns: pd.Series) -> pd.DataFrame:
+    import polars as pl
+
+    names = [series.name for series in index] + [columns.name]
+    if None in names or len(set(names)) < len(names):
+        return None
+    data = pd.DataFrame({series.name: series.to_numpy() for series in index + [columns]})
+    counts = (
+        _to_polars(data, names).lazy()
+        .drop_nulls()
+        .group_by(names)
+        .agg(pl.len().cast(pl.Int64).alias(_COUNT))
+        .collect()
+        .to_pandas()
+    )
+    return counts.set_index(names).sort_index()[_COUNT].unstack(fill_value=0)
+
+
+def _to_polars(data: pd.DataFrame, columns: list):
+    import polars as pl
+
+    return pl.from_pandas(data.set_axis(columns, axis=1), include_index=False)
@@ -3,21 +3,85 @@
 # The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
 # See the LICENSE and NOTICES files in the project root for more information.
 
+from typing import Optional
+
+import numpy as np
 import pandas as pd
+from pandas.api.extensions import take
 
 from edfi_amt_data_lake.helper.helper import get_descriptor_mapping_config
-from edfi_amt_data_lake.parquet.Common.pandasWrapper import (
-    add_dataframe_column,
-    jsonNormalize,
-    pdMerge,
-    renameColumns,
-)
+from edfi_amt_data_lake.parquet.Common.pandasWrapper import add_dataframe_column
 
+MAPPING_COLUMNS = ['constantName', 'descriptor', 'codeValue']
 
-def get_descriptor_constant(data=pd.DataFrame, column=str):
-    if column in data:
+
+def _read_only(values: list, dtype=None) -> np.ndarray:
+    array = np.array(values, dtype=dtype)
+    array.setflags(write=False)
+    return array
+
+
+_NO_MAPPING = _read_only([-1])
+
+
+# The descriptor mapping, read once: its columns and the positions of the mappings
+# of each lower-cased 'descriptor#codeValue'. A code value can have several
+# mappings, like an unexcused absence that is an absence too.
+class DescriptorIndex:
+    def __init__(self, descriptor_mapping_content: list):
+        self.columns = {
+            column: _read_only([mapping.get(column, np.nan) for mapping in descriptor_mapping_content], dtype=object)
+            for column in MAPPING_COLUMNS
+        }
+        positions: dict = {}
+        for position, mapping in enumerate(descriptor_mapping_content):
+            key = f"{str(mapping.get('descriptor')).lower()}#{str(mapping.get('codeValue')).lower()}"
+            positions.setdefault(key, []).append(position)
+        self.positions = {key: _read_only(key_positions) for key, key_positions in positions.items()}
+
+    # The rows of the result and the mapping each one gets, -1 for the rows without
+    # a mapping, from the code of the key of each row.
+    def lookup(self, codes: np.ndarray, keys: list) -> tuple:
+        # The mappings of the keys one after the other, a missing key (code -1) is
+        # the last one.
+        key_positions = [self.positions.get(key, _NO_MAPPING) for key in keys] + [_NO_MAPPING]
+        key_lengths = np.array([len(positions) for positions in key_positions])
+        key_starts = np.cumsum(key_lengths) - key_lengths
+        row_lengths = key_lengths[codes]
+        rows = np.repeat(np.arange(len(codes)), row_lengths)
+        offsets = np.arange(len(rows)) - np.repeat(np.cumsum(row_lengths) - row_lengths, row_lengths)
+        return rows, np.concatenate(key_positions)[key_starts[codes][rows] + offsets]
+
+
+# The descriptor URIs are decoded once per distinct value: the code of the URI of
+# each row, and the descriptor and code value of each URI.
+def _decode_descriptor_uri(data: pd.Series) -> tuple:
+    codes, uris = pd.factorize(data)
+    descriptor_uri = pd.Series(uris, dtype=data.dtype).str.split("#")
+    return (
+        codes,
+        descriptor_uri.str.get(-2).str.split("/").str.get(-1),
+        descriptor_uri.str.get(-1)
+    )
+
+
+_descriptor_index: Optional[DescriptorIndex] = None
+
+
+def get_descriptor_index() -> Optional[DescriptorIndex]:
+    global _descriptor_index
+    if _descriptor_index is None:
         descriptor_mapping_content = get_descriptor_mapping_config()
         if descriptor_mapping_content is None:
+            return None
+        _descriptor_index = DescriptorIndex(descriptor_mapping_content)
+    return _descriptor_index
+
+
+def get_descriptor_constant(data=pd.DataFrame, column=str):
+    if column in data:
+        descriptor_index = get_descriptor_index()
+        if descriptor_index is None:
             data = pd.DataFrame()
             add_dataframe_column(
                 data,
@@ -28,34 +92,12 @@ def get_descriptor_constant(data=pd.DataFrame, column=str):
                 ]
             )
             return data
-        ############################
-        # descriptor_mapping
-        ############################
-        descriptor_mapping_normalized = jsonNormalize(
-            descriptor_mapping_content
-            , recordPath=None
-            , meta=['constantName', 'descriptor', 'codeValue']
-            , metaPrefix=None
-            , recordPrefix=None
-            , errors='ignore'
-        )
-        descriptor_mapping_normalized = renameColumns(descriptor_mapping_normalized, {
-            'codeValue': f"{column}_codeValue",
-            'constantName': f"{column}_constantName",
-            'descriptor': f"{column}_descriptor"
-        })
         if not data[column].empty:
-            if len(data[column].str.split('#')) > 0:
-                data[f"{column}_descriptor"] = data[column].str.split("#").str.get(-2)
-                data[f"{column}_codeValue"] = data[column].str.split("#").str.get(-1)
-                data[f"{column}_descriptor"] = data[f"{column}_descriptor"].str.split("/").str.get(-1)
-
-        if (
-            not (
-                f"{column}_descriptor" in descriptor_mapping_normalized
-                and f"{column}_descriptor" in data
-            )
-        ):
+            codes, descriptors, code_values = _decode_descriptor_uri(data[column])
+            data[f"{column}_descriptor"] = take(descriptors.to_numpy(), codes, allow_fill=True)
+            data[f"{column}_codeValue"] = take(code_values.to_numpy(), codes, allow_fill=True)
+
+        if not (f"{column}_descriptor" in data):
             add_dataframe_column(
                 data,
                 [
@@ -66,23 +108,34 @@ def get_descriptor_constant(data=pd.DataFrame, column=str):
             )
             return data
         ############################
-        # Join to get descriptor constant
+        # Descriptor constant, as a right join of the mapping to the data on the
+        # lower-cased descriptor and code value.
         ############################
-        data = pdMerge(
-            left=descriptor_mapping_normalized,
-            right=data,
-            how='right',
-            leftOn=[
-                descriptor_mapping_normalized[f"{column}_descriptor"].str.lower(),
-                descriptor_mapping_normalized[f"{column}_codeValue"].str.lower()
-            ],
-            rightOn=[
-                data[f"{column}_descriptor"].str.lower(),
-                data[f"{column}_codeValue"].str.lower()
-            ],
-            suffixLeft='_descriptor_mapping_normalized',
-            suffixRight='_data'
-        )
+        if data[column].empty:
+            codes = np.empty(0, dtype=int)
+            descriptors = data[f"{column}_descriptor"].str.lower()
+            code_values = data[f"{column}_codeValue"].str.lower()
+        else:
+            descriptors = descriptors.str.lower()
+            code_values = code_values.str.lower()
+        rows, mapping_rows = descriptor_index.lookup(codes, list(descriptors + '#' + code_values))
+        mapping_columns = [f"{column}_{mapping_column}" for mapping_column in MAPPING_COLUMNS]
+        result = data.take(rows)
+        result.columns = [
+            f"{data_column}_data" if data_column in mapping_columns else data_column for data_column in data.columns
+        ]
+        result.index = pd.Index(np.arange(len(rows)))
+        for position, mapping_column in enumerate(MAPPING_COLUMNS):
+            name = f"{column}_{mapping_column}"
+            result.insert(
+                position,
+                f"{name}_descriptor_mapping_normalized" if name in data else name,
+                take(descriptor_index.columns[mapping_column], mapping_rows, allow_fill=True)
+            )
+        # The join keys, typed like pandas does.
+        result.insert(0, 'key_0', pd.Series(take(descriptors.to_numpy(), codes[rows], allow_fill=True)).infer_objects().to_numpy())
+        result.insert(1, 'key_1', pd.Series(take(code_values.to_numpy(), codes[rows], allow_fill=True)).infer_objects().to_numpy())
+        return result
     else:
         add_dataframe_column(
             data,
@@ -0,0 +1,163 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from decouple import config
+
+DEFAULT_MEMORY_MB = 512
+SIZE_SAMPLE_RECORDS = 100
+
+
+# Memory taken by a parsed record: the dicts, lists and values it holds.
+def _get_deep_size(value: Any) -> int:
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_get_deep_size(key) + _get_deep_size(item) for key, item in value.items())
+    elif isinstance(value, list):
+        size += sum(_get_deep_size(item) for item in value)
+    return size
+
+
+# Memory taken by the parsed records of an endpoint, estimated from a sample of
+# evenly spaced records so it costs little next to parsing them.
+def estimate_size(records: list) -> int:
+    if not records:
+        return sys.getsizeof(records)
+    step = max(1, len(records) // SIZE_SAMPLE_RECORDS)
+    sample = records[::step]
+    return sys.getsizeof(records) + sum(_get_deep_size(record) for record in sample) * len(records) // len(sample)
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self.entries = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.hits} hits, {self.misses} misses, {self.evictions} evictions, "
+            f"{self.entries} entries in {self.bytes / 1024 / 1024:.1f} MB"
+        )
+
+
+# Values kept in memory, least recently used first. The least recently used values
+# are evicted to keep their size under the memory budget, a value bigger than the
+# budget is not kept.
+class MemoryCache:
+    def __init__(self, memory_budget: int):
+        self.memory_budget = memory_budget
+        self.stats = CacheStats()
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: tuple) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return entry[0]
+            self.stats.misses += 1
+            return None
+
+    def _add(self, key: tuple, value: Any, size: int) -> None:
+        if self.memory_budget <= 0 or size > self.memory_budget:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while self._entries and self.stats.bytes + size > self.memory_budget:
+                self._remove(next(iter(self._entries)))
+                self.stats.evictions += 1
+            self._entries[key] = (value, size)
+            self.stats.bytes += size
+            self.stats.entries = len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.stats.bytes = 0
+            self.stats.entries = 0
+
+    def _remove(self, key: tuple) -> None:
+        _, size = self._entries.pop(key)
+        self.stats.bytes -= size
+        self.stats.entries = len(self._entries)
+
+
+# Parsed silver files. A file is identified by its path, size and modification
+# time, so a new extraction is never served from the cache. The records are shared
+# by every view that reads the endpoint, they must not be modified.
+class EndpointCache(MemoryCache):
+    def get(self, file_path: str, load: Callable[[str], list]) -> list:
+        file_stat = os.stat(file_path)
+        key = (file_path, file_stat.st_size, file_stat.st_mtime_ns)
+        records = self._lookup(key)
+        if records is not None:
+            return records
+        records = load(file_path)
+        if self.memory_budget > 0:
+            with self._lock:
+                for cached_key in [cached_key for cached_key in self._entries if cached_key[0] == file_path]:
+                    self._remove(cached_key)
+            self._add(key, records, estimate_size(records))
+        return records
+
+    # The key of the silver file the records were parsed from, while they are cached.
+    def get_key(self, records: Any) -> Optional[tuple]:
+        with self._lock:
+            for key, (cached_records, _) in self._entries.items():
+                if cached_records is records:
+                    return key
+        return None
+
+
+# Data frames flattened from cached silver files, by the key of the silver file and
+# how it was flattened. The data frames are shared, they must not be modified.
+class NormalizeCache(MemoryCache):
+    def get(self, key: tuple, create: Callable[[], Any]) -> Any:
+        data_frame = self.lookup(key)
+        if data_frame is None:
+            data_frame = create()
+            self.add(key, data_frame)
+        return data_frame
+
+    def lookup(self, key: tuple) -> Any:
+        return self._lookup(key)
+
+    def add(self, key: tuple, data_frame: Any) -> None:
+        self._add(key, data_frame, int(data_frame.memory_usage(index=True, deep=True).sum()))
+
+
+_endpoint_cache: Optional[EndpointCache] = None
+_normalize_cache: Optional[NormalizeCache] = None
+
+
+def _get_memory_budget(setting: str) -> int:
+    memory_mb = config(setting, default="")
+    return (int(memory_mb) if memory_mb != "" else DEFAULT_MEMORY_MB) * 1024 * 1024
+
+
+# The caches of this process, every view generated in it shares them.
+def get_endpoint_cache() -> EndpointCache:
+    global _endpoint_cache
+    if _endpoint_cache is None:
+        _endpoint_cache = EndpointCache(_get_memory_budget("SILVER_CACHE_MEMORY_MB"))
+    return _endpoint_cache
+
+
+def get_normalize_cache() -> NormalizeCache:
+    global _normalize_cache
+    if _normalize_cache is None:
+        _normalize_cache = NormalizeCache(_get_memory_budget("NORMALIZE_CACHE_MEMORY_MB"))
+    return _normalize_cache
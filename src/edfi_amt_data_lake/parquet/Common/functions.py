@@ -3,19 +3,26 @@
 # The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
 # See the LICENSE and NOTICES files in the project root for more information.
 
-import json
 import os
 
+from edfi_amt_data_lake.helper.silver_format import get_latest_file, read_silver_file
+from edfi_amt_data_lake.parquet.Common.endpoint_cache import get_endpoint_cache
 
-def getEndpointJson(endpoint: str, rawDataLocation: str, school_year: str) -> str:
+
+def getEndpointPath(endpoint: str, rawDataLocation: str, school_year: str) -> str:
     school_year_path = f"/{school_year}/" if school_year else ""
-    endpointFilePath = f"{rawDataLocation}{school_year_path}{endpoint}"
+    return f"{rawDataLocation}{school_year_path}{endpoint}"
+
+
+# Records of the endpoint: the newest silver file, never the deletes files. The
+# records are parsed once and shared by the views, they must not be modified.
+def getEndpointJson(endpoint: str, rawDataLocation: str, school_year: str) -> str:
+    endpointFilePath = getEndpointPath(endpoint, rawDataLocation, school_year)
     if os.path.isdir(endpointFilePath):
-        jsonFiles = [pos_json for pos_json in os.listdir(endpointFilePath) if pos_json.endswith('.json')]
+        latestFile = get_latest_file(endpointFilePath)
 
-        if len(jsonFiles):
-            with open(f"{endpointFilePath}/{jsonFiles[0]}", "r") as jsonFile:
-                jsonContent = json.loads(jsonFile.read())
+        if latestFile:
+            jsonContent = get_endpoint_cache().get(f"{endpointFilePath}/{latestFile.file_name}", read_silver_file)
             return jsonContent
         else:
             return ''
@@ -0,0 +1,209 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from edfi_amt_data_lake.parquet.Common.endpoint_cache import (
+    get_endpoint_cache,
+    get_normalize_cache,
+)
+
+_MISSING = object()
+
+
+# A table flattened from the records of an endpoint, with the arguments of
+# jsonNormalize: the columns of the records (meta), or of the nested records in
+# recordPath (recordMeta) next to the columns of the records they are nested in
+# (meta).
+class FlattenTable:
+    def __init__(
+        self,
+        meta: list,
+        recordPath: Optional[Any] = None,
+        recordMeta: Optional[list] = None,
+        recordPrefix: Optional[str] = None,
+        errors: str = 'ignore'
+    ):
+        self.meta = [column if isinstance(column, list) else [column] for column in meta]
+        self.recordPath = None if recordPath is None else (recordPath if isinstance(recordPath, list) else [recordPath])
+        self.recordMeta = recordMeta or []
+        self.recordPrefix = recordPrefix
+        self.errors = errors
+        if recordPrefix:
+            self.recordMeta = [recordPrefix + column for column in self.recordMeta]
+        meta_columns = ['.'.join(column) for column in self.meta]
+        self.columns = list(dict.fromkeys(meta_columns + self.recordMeta))
+        if self.recordPath is None:
+            # Every field is flattened, the meta columns are read from the records.
+            self.record_columns = {column: column.split('.') for column in self.columns}
+            self.meta_columns: dict = {}
+            self.conflict_columns: dict = {}
+        else:
+            prefix = recordPrefix or ''
+            self.record_columns = {
+                column: column[len(prefix):].split('.')
+                for column in self.columns if column.startswith(prefix) and column not in meta_columns
+            }
+            self.meta_columns = {'.'.join(column): column for column in self.meta}
+            # A meta column also in the nested records is a conflict.
+            self.conflict_columns = {
+                column: column[len(prefix):].split('.')
+                for column in meta_columns if column.startswith(prefix)
+            }
+
+
+# Value of a flattened column: nested dicts are flattened to 'parent.child' columns,
+# the other values are kept as they are.
+def _get_flattened_value(record: Any, path: list) -> Any:
+    value = record
+    for field in path:
+        if not isinstance(value, dict) or field not in value:
+            return _MISSING
+        value = value[field]
+    return _MISSING if isinstance(value, dict) else value
+
+
+class _TableBuilder:
+    def __init__(self, table: FlattenTable):
+        self.table = table
+        self.failed = False
+        self.rows = 0
+        self.values: dict = {column: [] for column in table.record_columns}
+        self.present: dict = {column: False for column in table.record_columns}
+        self.meta_values: dict = {column: [] for column in table.meta_columns}
+        self.conflict = False
+
+    def add_record(self, record: Any) -> None:
+        for column, path in self.table.record_columns.items():
+            value = _get_flattened_value(record, path)
+            if value is _MISSING:
+                self.values[column].append(np.nan)
+            else:
+                self.values[column].append(value)
+                self.present[column] = True
+        self.rows += 1
+
+    # Same meta values and errors as pd.json_normalize.
+    def _pull_field(self, obj: Any, spec: Any) -> Any:
+        result = obj
+        try:
+            if isinstance(spec, list):
+                for field in spec:
+                    if result is None:
+                        raise KeyError(field)
+                    result = result[field]
+            else:
+                result = result[spec]
+        except KeyError:
+            if self.table.errors == 'ignore':
+                return np.nan
+            raise
+        return result
+
+    def _extract(self, data: Any, path: list, seen_meta: dict, level: int) -> None:
+        if isinstance(data, dict):
+            data = [data]
+        if len(path) > 1:
+            for obj in data:
+                for key, val in self.table.meta_columns.items():
+                    if level + 1 == len(val):
+                        seen_meta[key] = self._pull_field(obj, val[-1])
+                self._extract(obj[path[0]], path[1:], seen_meta, level + 1)
+        else:
+            for obj in data:
+                records = obj[path[0]]
+                if not isinstance(records, list):
+                    if pd.isnull(records):
+                        records = []
+                    else:
+                        raise TypeError(f"{obj} has non list value {records} for path {path[0]}. Must be list or null.")
+                for key, val in self.table.meta_columns.items():
+                    meta_value = seen_meta[key] if level + 1 > len(val) else self._pull_field(obj, val[level:])
+                    self.meta_values[key].extend([meta_value] * len(records))
+                for record in records:
+                    if not self.conflict:
+                        self.conflict = any(
+                            _get_flattened_value(record, conflict_path) is not _MISSING
+                            for conflict_path in self.table.conflict_columns.values()
+                        )
+                    self.add_record(record)
+
+    def add(self, record: Any) -> None:
+        if self.failed:
+            return
+        if self.table.recordPath is None:
+            self.add_record(record)
+            return
+        try:
+            self._extract(record, self.table.recordPath, {}, 0)
+        except KeyError:
+            # Like pd.json_normalize, a record without the record path (or a missing
+            # meta column with errors='raise') gives an empty table.
+            self.failed = True
+
+    # The same columns as jsonNormalize, with the dtypes inferred from the values
+    # but integers and booleans kept as objects, as they are once concatenated to
+    # the empty data frame. A column without any value, like a missing column or the
+    # meta of the nested records, is an object column.
+    def to_data_frame(self) -> pd.DataFrame:
+        if self.failed:
+            return pd.DataFrame(columns=self.table.columns)
+        if self.conflict:
+            raise ValueError(
+                f"Conflicting metadata name {list(self.table.conflict_columns)}, need distinguishing prefix "
+            )
+        columns = {}
+        for column in self.table.columns:
+            if column in self.meta_values:
+                columns[column] = pd.Series(self.meta_values[column], dtype=object)
+            elif column in self.values and self.present[column]:
+                series = pd.Series(self.values[column])
+                if series.dtype.kind in 'iub' or (series.dtype.kind == 'f' and series.isna().all()):
+                    series = series.astype(object)
+                columns[column] = series
+            else:
+                columns[column] = pd.Series(np.full(self.rows, np.nan, dtype=object))
+        return pd.DataFrame(columns, index=pd.RangeIndex(self.rows))
+
+
+def _to_key(value: Any) -> Any:
+    if isinstance(value, list):
+        return tuple(_to_key(item) for item in value)
+    return value
+
+
+# Flatten the tables of an endpoint in a single pass over its records. Each table
+# is the data frame jsonNormalize returns with the same arguments, but a column
+# without any value is always an object column. The tables of a cached endpoint
+# are cached too, a copy is returned so the views can modify them.
+def jsonFlatten(data, tables: dict) -> dict:
+    if not data:
+        return {name: pd.DataFrame(columns=table.columns) for name, table in tables.items()}
+    file_key = get_endpoint_cache().get_key(data)
+    if file_key is None:
+        return _flatten(data, tables)
+    normalize_cache = get_normalize_cache()
+    keys = {
+        name: (file_key, ('flatten', _to_key(table.recordPath), _to_key(table.meta), _to_key(table.recordMeta), table.errors))
+        for name, table in tables.items()
+    }
+    result = {name: normalize_cache.lookup(key) for name, key in keys.items()}
+    missing = {name: tables[name] for name, data_frame in result.items() if data_frame is None}
+    if missing:
+        for name, data_frame in _flatten(data, missing).items():
+            normalize_cache.add(keys[name], data_frame)
+            result[name] = data_frame
+    return {name: data_frame.copy() for name, data_frame in result.items()}
+
+
+def _flatten(data, tables: dict) -> dict:
+    builders = {name: _TableBuilder(table) for name, table in tables.items()}
+    for record in data:
+        for builder in builders.values():
+            builder.add(record)
+    return {name: builder.to_data_frame() for name, builder in builders.items()}
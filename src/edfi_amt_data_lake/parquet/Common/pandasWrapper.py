@@ -3,10 +3,13 @@
 # The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
 # See the LICENSE and NOTICES files in the project root for more information.
 
+import inspect
 import os
 import traceback
-from typing import Any
+from contextvars import ContextVar
+from typing import Any, Optional
 
+import numpy as np
 import pandas as pd
 from dagster import get_dagster_logger
 from decouple import config
@@ -15,10 +18,41 @@ from edfi_amt_data_lake.helper.data_frame_generation_result import (
     data_frame_generation_result,
 )
 from edfi_amt_data_lake.helper.helper import get_path
+from edfi_amt_data_lake.parquet.Common.data_frame_backend import (
+    crosstab,
+    get_view_backend,
+    merge,
+    use_backend,
+)
+from edfi_amt_data_lake.parquet.Common.endpoint_cache import (
+    get_endpoint_cache,
+    get_normalize_cache,
+)
+from edfi_amt_data_lake.parquet.Common.parquet_writer import (
+    ParquetChunkWriter,
+    ParquetWriterOptions,
+    parquet_exists,
+    read_parquet,
+    write_parquet,
+)
+from edfi_amt_data_lake.parquet.Common.view_registry import get_view_registry
+
+CATEGORY = 'category'
+
+# File name of the view being generated. The views it reads are only read, from
+# the registry or their parquet file: the scheduler generates every view in its
+# own task, after the views it reads.
+_generating_view: ContextVar[Optional[str]] = ContextVar("generating_view", default=None)
+
+
+# A view read by the view being generated has no parquet file, it failed or was
+# not generated yet. The view reading it fails.
+class ViewNotGeneratedError(Exception):
+    pass
 
 
 def pdMerge(left=pd.DataFrame, right=pd.DataFrame, how=str, leftOn=[str], rightOn=[str], suffixLeft='_x', suffixRight='_y') -> pd.DataFrame:
-    return pd.merge(
+    return merge(
         left,
         right,
         how=how,
@@ -60,17 +94,11 @@ def jsonNormalize(data, recordPath, meta, recordMeta=[], metaPrefix=None, record
     if not data:
         return empty_data_frame
     try:
-        df_result = pd.json_normalize(
-            data=data,
-            record_path=recordPath,
-            meta=meta,
-            record_prefix=recordPrefix,
-            errors=errors
-        )
-        # Concat normalize result and empty dataframe
+        df_result = _json_normalize(data, recordPath, meta, recordPrefix, errors)
+        # Concat the columns selected from the normalize result and empty dataframe
         result_dataframe = pd_concat([
             empty_data_frame,
-            df_result
+            df_result[list(dict.fromkeys(column for column in default_columns if column in df_result.columns))]
         ])
         # Select columns from meta
         result_dataframe = subset(
@@ -85,6 +113,31 @@ def jsonNormalize(data, recordPath, meta, recordMeta=[], metaPrefix=None, record
         return empty_data_frame
 
 
+def _to_key(value):
+    if isinstance(value, list):
+        return tuple(_to_key(item) for item in value)
+    return value
+
+
+# The content of an endpoint is flattened once per flatten spec and the views
+# select their columns from it. Without record path every field is flattened, so
+# the meta columns are not part of the spec.
+def _json_normalize(data, recordPath, meta, recordPrefix, errors) -> pd.DataFrame:
+    def normalize():
+        return pd.json_normalize(
+            data=data,
+            record_path=recordPath,
+            meta=meta,
+            record_prefix=recordPrefix,
+            errors=errors
+        )
+    file_key = get_endpoint_cache().get_key(data)
+    if file_key is None:
+        return normalize()
+    spec = (_to_key(recordPath), _to_key(meta), recordPrefix, errors) if recordPath else None
+    return get_normalize_cache().get((file_key, spec), normalize)
+
+
 def get_meta_columns(columns=[]):
     dataframe_columns = []
     if columns:
@@ -108,7 +161,7 @@ def create_empty_data_frame(columns=[], index=[]):
 
 
 def crossTab(index, columns) -> pd.DataFrame:
-    return pd.crosstab(index, columns)
+    return crosstab(index, columns)
 
 
 def fromDict(jsonContent, orient="index") -> pd.DataFrame:
@@ -125,16 +178,32 @@ def renameColumns(data=pd.DataFrame, renameColumns={}, errors='ignore') -> pd.Da
     return data.rename(columns=renameColumns)
 
 
-def saveParquetFile(data=pd.DataFrame, path=str, file_name=str, school_year=str) -> None:
+def saveParquetFile(data=pd.DataFrame, path=str, file_name=str, school_year=str, writer_options: Optional[ParquetWriterOptions] = None) -> None:
     parquet_logger = get_dagster_logger()
     destination_folder = get_path(path, school_year)
     destination_path = os.path.join(destination_folder, file_name)
     if not os.path.exists(destination_folder):
         os.makedirs(destination_folder, exist_ok=True)
-    data.to_parquet(f"{destination_path}", engine='fastparquet')
+    # The categorical columns are written dictionary-encoded.
+    write_parquet(data, f"{destination_path}", writer_options)
     parquet_logger.info(f'Parquet {file_name} (Saved!)')
 
 
+# Write the chunks of a view as they are generated. Returns the rows written.
+def saveParquetChunks(chunks, path, file_name, school_year, columns, column_types=None, writer_options: Optional[ParquetWriterOptions] = None) -> int:
+    parquet_logger = get_dagster_logger()
+    destination_folder = get_path(path, school_year)
+    if not os.path.exists(destination_folder):
+        os.makedirs(destination_folder, exist_ok=True)
+    writer = ParquetChunkWriter(os.path.join(destination_folder, file_name), writer_options)
+    for chunk in chunks:
+        if chunk is not None:
+            writer.write(to_output_schema(chunk[columns], column_types))
+    writer.close(to_output_schema(pd.DataFrame(columns=columns), column_types))
+    parquet_logger.info(f'Parquet {file_name} (Saved {writer.rows} rows!)')
+    return writer.rows
+
+
 def addColumnIfNotExists(data=pd.DataFrame, column=str, default_value='') -> pd.DataFrame:
     if column not in data:
         data[column] = default_value
@@ -216,27 +285,94 @@ def copy_value_by_column(data: pd.DataFrame, column: str, replace_value: Any):
     return data[column]
 
 
+# The value of column, or the value of fallback_column where column is empty.
+def coalesce(data: pd.DataFrame, column: str, fallback_column: str, empty_value: Any = '') -> pd.Series:
+    return data[column].where(data[column] != empty_value, data[fallback_column])
+
+
+# The value of column, or default_value where column is empty.
+def default_if_empty(data: pd.DataFrame, column: str, default_value: Any, empty_value: Any = '') -> pd.Series:
+    return data[column].mask(data[column] == empty_value, default_value)
+
+
+# true_value for the rows that meet the condition, false_value for the others.
+def to_flag(condition: pd.Series, true_value: Any = 1, false_value: Any = 0) -> pd.Series:
+    return pd.Series(np.where(condition, true_value, false_value), index=condition.index)
+
+
+# The values of the columns joined with the separator.
+def join_columns(data: pd.DataFrame, columns: list, separator: str = '-') -> pd.Series:
+    result = data[columns[0]]
+    for column in columns[1:]:
+        result = result + separator + data[column]
+    return result
+
+
+# One row per item of the list column, the column takes the value of key in the
+# item. The rows without items keep a missing value.
+def explode_items(data: pd.DataFrame, column: str, key: str) -> pd.DataFrame:
+    data = data.explode(column)
+    data[column] = data[column].astype(object).str.get(key)
+    return data
+
+
+# The output schema of a view: the dtype of some of its RESULT_COLUMNS, the other
+# columns keep the dtype they were generated with. Descriptors and the other columns
+# with a few distinct values are categories, each value is kept once in memory and
+# they are dictionary-encoded in the parquet file.
+def to_output_schema(data: pd.DataFrame, column_types: Optional[dict]) -> pd.DataFrame:
+    if data is None or not column_types:
+        return data
+    column_types = {column: column_type for column, column_type in column_types.items() if column in data}
+    return data.astype(column_types) if column_types else data
+
+
 def create_parquet_file(func) -> Any:
-    def inner(file_name, columns, school_year):
+    def inner(file_name, columns, school_year, column_types=None, writer_options=None):
         parquet_logger = get_dagster_logger()
         file_path = os.path.join(
             get_path(config('PARQUET_FILES_LOCATION'), school_year),
             file_name
         )
+        view_registry = get_view_registry()
         try:
-            result_data_frame = get_data_frame_from_file(file_path=file_path)
+            result_data_frame = view_registry.get(file_name)
+            if not (result_data_frame is None):
+                parquet_logger.debug(f'Read DataFrame {file_name} from the registry.')
+                return data_frame_generation_result(data_frame=result_data_frame, columns=columns)
+            result_data_frame = get_data_frame_from_file(
+                file_path=file_path,
+                writer_options=writer_options,
+                columns=columns
+            )
             result = None
             if not (result_data_frame is None):
                 parquet_logger.debug(f'Read DataFrame {file_name} from file.')
                 result = data_frame_generation_result(
-                    data_frame=result_data_frame,
+                    data_frame=to_output_schema(result_data_frame, column_types),
                     columns=columns
                 )
+                # The next views that read it get it from the registry.
+                if view_registry.add(file_name, result.data_frame, read=True):
+                    result.data_frame = result.data_frame.copy()
                 return result
             else:
+                reader = _generating_view.get()
+                if reader is not None:
+                    raise ViewNotGeneratedError(f"{file_name} read by {reader} was not generated.")
                 parquet_logger.debug(f'Create DataFrame {file_name} from script.')
+                token = _generating_view.set(file_name)
+                try:
+                    with use_backend(get_view_backend(file_name)):
+                        result_data_frame = func(file_name, columns, school_year)
+                        if inspect.isgenerator(result_data_frame):
+                            return _create_parquet_file_from_chunks(
+                                result_data_frame, file_path, file_name, columns, school_year, column_types, writer_options
+                            )
+                finally:
+                    _generating_view.reset(token)
                 result = data_frame_generation_result(
-                    data_frame=func(file_name, columns, school_year),
+                    data_frame=to_output_schema(result_data_frame, column_types),
                     columns=columns
                 )
                 if result.successful:
@@ -244,10 +380,16 @@ def create_parquet_file(func) -> Any:
                         data=result.data_frame,
                         path=f"{config('PARQUET_FILES_LOCATION')}",
                         file_name=file_name,
-                        school_year=school_year
+                        school_year=school_year,
+                        writer_options=writer_options
                     )
+                    if view_registry.add(file_name, result.data_frame):
+                        result.data_frame = result.data_frame.copy()
                 return result
         except Exception as data_frame_exception:
+            # The view that read it fails, not the one that was missing.
+            if isinstance(data_frame_exception, ViewNotGeneratedError) and _generating_view.get() is not None:
+                raise
             parquet_logger.error(f"Exception: {traceback.format_exc()}")
             return data_frame_generation_result(
                 successful=False,
@@ -256,12 +398,39 @@ def create_parquet_file(func) -> Any:
     return inner
 
 
-def get_data_frame_from_file(file_path: str) -> pd.DataFrame:
+# A view that yields its data frame in chunks, each one is written as soon as it
+# is generated. Only the views that read it get the whole data frame, read back
+# from its file; the result has none otherwise.
+def _create_parquet_file_from_chunks(chunks, file_path, file_name, columns, school_year, column_types, writer_options) -> data_frame_generation_result:
+    total_rows = saveParquetChunks(
+        chunks=chunks,
+        path=f"{config('PARQUET_FILES_LOCATION')}",
+        file_name=file_name,
+        school_year=school_year,
+        columns=columns,
+        column_types=column_types,
+        writer_options=writer_options
+    )
+    view_registry = get_view_registry()
+    if not view_registry.has_readers(file_name):
+        result = data_frame_generation_result(columns=columns)
+        result.total_rows = total_rows
+        return result
+    result = data_frame_generation_result(
+        data_frame=to_output_schema(read_parquet(file_path, writer_options, columns), column_types),
+        columns=columns
+    )
+    if view_registry.add(file_name, result.data_frame):
+        result.data_frame = result.data_frame.copy()
+    return result
+
+
+def get_data_frame_from_file(file_path: str, writer_options: Optional[ParquetWriterOptions] = None, columns: Optional[list] = None) -> pd.DataFrame:
     try:
         parquet_logger = get_dagster_logger()
-        if os.path.isfile(file_path):
+        if parquet_exists(file_path):
             parquet_logger.info(f'Read parquet from file {file_path}')
-            return pd.read_parquet(file_path, engine='fastparquet')
+            return read_parquet(file_path, writer_options, columns)
         else:
             return None
     except Exception:
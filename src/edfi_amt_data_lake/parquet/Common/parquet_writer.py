@@ -0,0 +1,366 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import os
+import shutil
+from typing import Any, Optional
+from urllib.parse import unquote
+
+import numpy as np
+import pandas as pd
+from dagster import get_dagster_logger
+from decouple import config
+
+ENGINE_FASTPARQUET = "fastparquet"
+ENGINE_PYARROW = "pyarrow"
+ENGINES = [ENGINE_FASTPARQUET, ENGINE_PYARROW]
+
+DEFAULT_ENGINE = ENGINE_FASTPARQUET
+DEFAULT_COMPRESSION = "snappy"
+COMPRESSIONS = ["snappy", "gzip", "zstd", "brotli", "lz4", "none"]
+
+# Folder name of the rows without a value in a partition column.
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def _get_optional_int(name: str) -> Optional[int]:
+    value = config(name, default="")
+    return int(value) if value else None
+
+
+def _get_optional_bool(name: str) -> Optional[bool]:
+    value = config(name, default="")
+    return config(name, cast=bool) if value else None
+
+
+def is_partitioning_enabled() -> bool:
+    return config("PARQUET_PARTITIONED_VIEWS", default=False, cast=bool)
+
+
+# Partition of the rows on the month, yyyymm, of a date key column. The month is
+# only in the folder names, it is not a column of the view.
+class MonthPartition:
+    def __init__(self, date_key_column: str):
+        self.column = date_key_column
+        self.name = f"{date_key_column}Month"
+
+    def values(self, data: pd.DataFrame) -> pd.Series:
+        return data[self.column].astype(object).str[:6]
+
+
+def _get_partition_name(partition: Any) -> str:
+    return partition if isinstance(partition, str) else partition.name
+
+
+def _get_partition_values(data: pd.DataFrame, partition: Any) -> pd.Series:
+    values = data[partition].astype(object) if isinstance(partition, str) else partition.values(data)
+    return values.where(values.notna(), NULL_PARTITION).astype(str)
+
+
+# How a view is written. A None option is taken from the PARQUET_* settings, and
+# when they are empty too, the engine default is used:
+#   engine: fastparquet or pyarrow, the views are read back with the same engine.
+#   compression, compression_level: the codec of every column and its level.
+#   row_group_size: rows in each row group.
+#   use_dictionary: dictionary-encode the columns. fastparquet only encodes the
+#     categorical columns, they are written as plain values without it.
+#   write_statistics: min/max of the columns, to skip the row groups on read.
+#   sort_by: columns the rows are sorted by, so the statistics of the row groups
+#     do not overlap on them.
+#   partition_by: columns (or MonthPartition) the rows are split by with
+#     PARQUET_PARTITIONED_VIEWS, the view is then a folder with a Column=value
+#     folder for each partition and a _metadata file.
+class ParquetWriterOptions:
+    def __init__(
+        self,
+        engine: Optional[str] = None,
+        compression: Optional[str] = None,
+        compression_level: Optional[int] = None,
+        row_group_size: Optional[int] = None,
+        use_dictionary: Optional[bool] = None,
+        write_statistics: Optional[bool] = None,
+        sort_by: Optional[list] = None,
+        partition_by: Optional[list] = None
+    ):
+        self.engine = engine
+        self.compression = compression
+        self.compression_level = compression_level
+        self.row_group_size = row_group_size
+        self.use_dictionary = use_dictionary
+        self.write_statistics = write_statistics
+        self.sort_by = sort_by
+        self.partition_by = partition_by
+
+
+def _get_engine(engine: Optional[str]) -> str:
+    engine = (engine or config("PARQUET_ENGINE", default="") or DEFAULT_ENGINE).lower()
+    if engine not in ENGINES:
+        get_dagster_logger().warning(f"Unknown PARQUET_ENGINE {engine}, using {DEFAULT_ENGINE}.")
+        return DEFAULT_ENGINE
+    return engine
+
+
+def _get_compression(compression: Optional[str]) -> str:
+    compression = (compression or config("PARQUET_COMPRESSION", default="") or DEFAULT_COMPRESSION).lower()
+    if compression not in COMPRESSIONS:
+        get_dagster_logger().warning(f"Unknown PARQUET_COMPRESSION {compression}, using {DEFAULT_COMPRESSION}.")
+        return DEFAULT_COMPRESSION
+    return compression
+
+
+# The options of a view, completed with the PARQUET_* settings.
+def get_parquet_writer_options(view_options: Optional[ParquetWriterOptions] = None) -> ParquetWriterOptions:
+    view_options = view_options or ParquetWriterOptions()
+    return ParquetWriterOptions(
+        engine=_get_engine(view_options.engine),
+        compression=_get_compression(view_options.compression),
+        compression_level=(
+            view_options.compression_level if view_options.compression_level is not None
+            else _get_optional_int("PARQUET_COMPRESSION_LEVEL")
+        ),
+        row_group_size=(
+            view_options.row_group_size if view_options.row_group_size is not None
+            else _get_optional_int("PARQUET_ROW_GROUP_SIZE")
+        ),
+        use_dictionary=(
+            view_options.use_dictionary if view_options.use_dictionary is not None
+            else _get_optional_bool("PARQUET_DICTIONARY")
+        ),
+        write_statistics=(
+            view_options.write_statistics if view_options.write_statistics is not None
+            else _get_optional_bool("PARQUET_STATISTICS")
+        ),
+        sort_by=view_options.sort_by,
+        partition_by=view_options.partition_by if is_partitioning_enabled() else None
+    )
+
+
+# The categorical columns of data as columns of their values.
+def _get_category_values(data: pd.DataFrame) -> pd.DataFrame:
+    categorical_columns = [column for column in data.columns if isinstance(data[column].dtype, pd.CategoricalDtype)]
+    if not categorical_columns:
+        return data
+    return data.astype({column: data[column].cat.categories.dtype for column in categorical_columns})
+
+
+def _fastparquet_arguments(data: pd.DataFrame, options: ParquetWriterOptions) -> tuple:
+    compression = None if options.compression == "none" else options.compression
+    if compression and options.compression_level is not None:
+        compression = {"_default": {"type": compression, "args": {"level": options.compression_level}}}
+    arguments: dict = {"compression": compression}
+    if options.row_group_size is not None:
+        arguments["row_group_offsets"] = options.row_group_size
+    if options.write_statistics is not None:
+        arguments["stats"] = options.write_statistics
+    if options.use_dictionary is False:
+        data = _get_category_values(data)
+    return data, arguments
+
+
+def _pyarrow_arguments(options: ParquetWriterOptions) -> dict:
+    arguments: dict = {"compression": None if options.compression == "none" else options.compression}
+    if options.compression_level is not None:
+        arguments["compression_level"] = options.compression_level
+    if options.row_group_size is not None:
+        arguments["row_group_size"] = options.row_group_size
+    if options.use_dictionary is not None:
+        arguments["use_dictionary"] = options.use_dictionary
+    if options.write_statistics is not None:
+        arguments["write_statistics"] = options.write_statistics
+    return arguments
+
+
+def parquet_exists(file_path: str) -> bool:
+    return os.path.isfile(file_path) or os.path.isdir(file_path)
+
+
+# Remove the parquet file of a view, or its folder when it is partitioned.
+def remove_parquet(file_path: str) -> None:
+    if os.path.isdir(file_path):
+        shutil.rmtree(file_path)
+    elif os.path.isfile(file_path):
+        os.remove(file_path)
+
+
+def _write_file(data: pd.DataFrame, file_path: str, options: ParquetWriterOptions, **partition_arguments) -> None:
+    if options.engine == ENGINE_PYARROW:
+        data.to_parquet(file_path, engine=ENGINE_PYARROW, **_pyarrow_arguments(options), **partition_arguments)
+    else:
+        data, arguments = _fastparquet_arguments(data, options)
+        data.to_parquet(file_path, engine=ENGINE_FASTPARQUET, **arguments, **partition_arguments)
+
+
+def _add_partition_columns(data: pd.DataFrame, options: ParquetWriterOptions) -> tuple:
+    partitions = options.partition_by or []
+    data = data.assign(**{
+        _get_partition_name(partition): _get_partition_values(data, partition) for partition in partitions
+    })
+    return data, [_get_partition_name(partition) for partition in partitions]
+
+
+def _write_pyarrow_metadata(dataset_path: str, metadata_collector: list) -> None:
+    import pyarrow.parquet as parquet
+    schema = metadata_collector[0].schema.to_arrow_schema()
+    parquet.write_metadata(schema, os.path.join(dataset_path, "_common_metadata"))
+    parquet.write_metadata(schema, os.path.join(dataset_path, "_metadata"), metadata_collector=metadata_collector)
+
+
+# The partitions are written to a folder next to the view, replacing it once
+# complete. fastparquet writes the _metadata file, with pyarrow it is written from
+# the footers of the files.
+def _write_dataset(data: pd.DataFrame, file_path: str, options: ParquetWriterOptions) -> None:
+    data, partition_columns = _add_partition_columns(data, options)
+    temporary_path = f"{file_path}.tmp"
+    remove_parquet(temporary_path)
+    if options.engine == ENGINE_PYARROW:
+        metadata_collector: list = []
+        _write_file(data, temporary_path, options, partition_cols=partition_columns, metadata_collector=metadata_collector)
+        _write_pyarrow_metadata(temporary_path, metadata_collector)
+    else:
+        _write_file(data, temporary_path, options, partition_cols=partition_columns)
+    remove_parquet(file_path)
+    os.replace(temporary_path, file_path)
+
+
+def write_parquet(data: pd.DataFrame, file_path: str, view_options: Optional[ParquetWriterOptions] = None) -> None:
+    options = get_parquet_writer_options(view_options)
+    if options.sort_by:
+        data = data.sort_values(options.sort_by, kind="stable", ignore_index=True)
+    if options.partition_by and not data.empty:
+        _write_dataset(data, file_path, options)
+        return
+    if os.path.isdir(file_path):
+        remove_parquet(file_path)
+    _write_file(data, file_path, options)
+
+
+# Writes a view a chunk at a time, so only the chunk being written is in memory.
+# The chunks are appended as row groups to a file next to the view, or as files of
+# their partitions, which replaces the view once closed. Each chunk is sorted on
+# sort_by, the chunks have to come in that order for the whole view to be sorted.
+class ParquetChunkWriter:
+    def __init__(self, file_path: str, view_options: Optional[ParquetWriterOptions] = None):
+        self.file_path = file_path
+        self.view_options = view_options
+        self.options = get_parquet_writer_options(view_options)
+        self.rows = 0
+        self._temporary_path = f"{file_path}.tmp"
+        self._empty_data: Optional[pd.DataFrame] = None
+        self._schema: Any = None
+        self._writer: Any = None
+        self._metadata_collector: list = []
+        remove_parquet(self._temporary_path)
+
+    def write(self, data: pd.DataFrame) -> None:
+        if data.empty:
+            if self._empty_data is None:
+                self._empty_data = data.head(0)
+            return
+        if self.options.sort_by:
+            data = data.sort_values(self.options.sort_by, kind="stable", ignore_index=True)
+        # fastparquet reads the categorical columns of a file with the categories
+        # of its first row group, the chunks are appended with their values. They
+        # are categorical again once read with the types of the view.
+        if self.options.engine != ENGINE_PYARROW:
+            data = _get_category_values(data)
+        if self.options.partition_by:
+            self._write_partitions(data)
+        elif self.options.engine == ENGINE_PYARROW:
+            self._write_pyarrow(data)
+        else:
+            import fastparquet
+            data, arguments = _fastparquet_arguments(data, self.options)
+            fastparquet.write(self._temporary_path, data, append=self.rows > 0, **arguments)
+        self.rows += len(data)
+
+    def _write_pyarrow(self, data: pd.DataFrame) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as parquet
+
+        # Every chunk is written with the types of the first one.
+        table = pa.Table.from_pandas(data, schema=self._schema, preserve_index=False)
+        if self._writer is None:
+            self._schema = table.schema
+            arguments = _pyarrow_arguments(self.options)
+            arguments.pop("row_group_size", None)
+            self._writer = parquet.ParquetWriter(self._temporary_path, self._schema, **arguments)
+        self._writer.write_table(table, row_group_size=self.options.row_group_size)
+
+    def _write_partitions(self, data: pd.DataFrame) -> None:
+        data, partition_columns = _add_partition_columns(data, self.options)
+        if self.options.engine == ENGINE_PYARROW:
+            _write_file(
+                data, self._temporary_path, self.options,
+                partition_cols=partition_columns, metadata_collector=self._metadata_collector
+            )
+        else:
+            import fastparquet
+            data, arguments = _fastparquet_arguments(data, self.options)
+            fastparquet.write(
+                self._temporary_path, data, partition_on=partition_columns, file_scheme="hive",
+                append=self.rows > 0, **arguments
+            )
+
+    # Replace the view with the chunks written. Without rows, the view is written
+    # empty with the columns of the chunks, or of empty_data when there were none.
+    def close(self, empty_data: Optional[pd.DataFrame] = None) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if self.rows == 0:
+            remove_parquet(self._temporary_path)
+            write_parquet(self._empty_data if self._empty_data is not None else empty_data, self.file_path, self.view_options)
+            return
+        if self.options.partition_by and self.options.engine == ENGINE_PYARROW:
+            _write_pyarrow_metadata(self._temporary_path, self._metadata_collector)
+        remove_parquet(self.file_path)
+        os.replace(self._temporary_path, self.file_path)
+
+
+# The Column=value folders of a partition file, the values as they were written.
+def _get_file_partitions(dataset_path: str, file_path: str) -> dict:
+    folders = os.path.relpath(os.path.dirname(file_path), dataset_path).split(os.sep)
+    partitions = dict(unquote(folder).split("=", 1) for folder in folders if "=" in folder)
+    return {column: np.nan if value == NULL_PARTITION else value for column, value in partitions.items()}
+
+
+# A view written as a single file or as partitions, read with the engine it was
+# written with. The values of the partition columns are read from the folder names
+# as strings, like they were written, and only the files of the partitions in
+# `partitions` ({column: [values]}) are read. The month partitions are dropped and
+# the columns are put back in the order of `columns`.
+def read_parquet(
+    file_path: str,
+    view_options: Optional[ParquetWriterOptions] = None,
+    columns: Optional[list] = None,
+    partitions: Optional[dict] = None
+) -> pd.DataFrame:
+    engine = _get_engine(view_options.engine if view_options else None)
+    if not os.path.isdir(file_path):
+        return pd.read_parquet(file_path, engine=engine)
+    data_frames = []
+    for folder, folders, file_names in os.walk(file_path):
+        folders.sort()
+        for file_name in sorted(file_names):
+            if file_name.startswith("_") or not file_name.endswith(".parquet"):
+                continue
+            partition_file_path = os.path.join(folder, file_name)
+            file_partitions = _get_file_partitions(file_path, partition_file_path)
+            if partitions and any(
+                column in file_partitions and file_partitions[column] not in values for column, values in partitions.items()
+            ):
+                continue
+            data = pd.read_parquet(partition_file_path, engine=engine)
+            for column, value in file_partitions.items():
+                data[column] = pd.Series(value, index=data.index, dtype=object)
+            data_frames.append(data)
+    data = pd.concat(data_frames, ignore_index=True) if data_frames else pd.DataFrame(columns=columns)
+    month_partitions = [
+        partition.name for partition in (view_options.partition_by if view_options and view_options.partition_by else [])
+        if isinstance(partition, MonthPartition)
+    ]
+    data = data.drop(columns=month_partitions, errors="ignore")
+    if columns and set(columns) == set(data.columns):
+        data = data[columns]
+    return data
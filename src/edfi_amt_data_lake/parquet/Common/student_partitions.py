@@ -0,0 +1,91 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+from dagster import get_dagster_logger
+from decouple import config
+
+from edfi_amt_data_lake.helper.helper import get_os_cpu
+from edfi_amt_data_lake.parquet.Common.data_frame_backend import (
+    get_current_backend,
+    use_backend,
+)
+
+# Views generated at the same time by the scheduler, each one in its own process.
+_view_workers = 1
+
+
+def set_view_workers(view_workers: int) -> None:
+    global _view_workers
+    _view_workers = max(1, view_workers)
+
+
+# PARQUET_PARTITION_WORKERS, capped by the CPUs (OS_CPU) each of the views
+# generated at the same time is left with, so the partitions of the views do not
+# take more processes than there are CPUs.
+def get_partition_workers() -> int:
+    partition_workers = max(1, config("PARQUET_PARTITION_WORKERS", default=1, cast=int))
+    return max(1, min(partition_workers, get_os_cpu() // _view_workers))
+
+
+# The partition of each student, from a hash of the key as a string: the rows of a
+# student are in the same partition whatever the endpoint and type of the column.
+def get_student_partitions(students: pd.Series, partitions: int) -> np.ndarray:
+    hashes = pd.util.hash_pandas_object(students.astype(str), index=False).to_numpy()
+    return (hashes % np.uint64(partitions)).astype(np.int64)
+
+
+# The partitions run with the backend of the view.
+def _run_partition(backend: str, function: Callable[..., Optional[pd.DataFrame]], **arguments) -> Optional[pd.DataFrame]:
+    with use_backend(backend):
+        return function(**arguments)
+
+
+def _get_partition(data: pd.DataFrame, student_column: str, partition: int, partitions: int) -> pd.DataFrame:
+    return data[get_student_partitions(data[student_column], partitions) == partition].reset_index(drop=True)
+
+
+# Run function on every partition of the students, each one in its own process,
+# and concatenate the results in the order of the partitions. The data frames of
+# `partitioned` ({argument: (data_frame, student column)}) are split by student,
+# the ones of `shared` ({argument: data_frame}) go whole to every partition, like
+# the calendar of the schools. Every partition process gets its own copy of the
+# shared data frames, their memory is taken once per worker. function has to be
+# a module function and the rows of a student must not depend on the rows of the
+# other students. With a single worker, function gets the data frames as they are.
+def run_by_student_partition(
+    function: Callable[..., Optional[pd.DataFrame]],
+    partitioned: dict,
+    shared: dict,
+    workers: Optional[int] = None
+) -> Optional[pd.DataFrame]:
+    workers = workers or get_partition_workers()
+    if workers == 1:
+        return function(
+            **{argument: data for argument, (data, _) in partitioned.items()},
+            **shared
+        )
+    get_dagster_logger().info(f"{function.__name__} in {workers} student partitions.")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                _run_partition,
+                get_current_backend(),
+                function,
+                **{
+                    argument: _get_partition(data, student_column, partition, workers)
+                    for argument, (data, student_column) in partitioned.items()
+                },
+                **shared
+            )
+            for partition in range(workers)
+        ]
+        results = [future.result() for future in futures]
+    results = [result for result in results if result is not None]
+    return pd.concat(results, ignore_index=True) if results else None
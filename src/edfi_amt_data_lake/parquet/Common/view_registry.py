@@ -0,0 +1,89 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import threading
+from typing import Iterable, Optional
+
+import pandas as pd
+
+
+class ViewRegistryStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.releases = 0
+
+    def __str__(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses, {self.releases} releases"
+
+
+# Data frames of the views generated (or read) during a run, by file name, kept
+# until the views that read them got them. The scheduler sets how many times each
+# view is going to be read: a view is only kept when it has readers left, the last
+# reader gets the data frame itself and the others a copy, as the views modify the
+# data frames they read.
+class ViewRegistry:
+    def __init__(self):
+        self.stats = ViewRegistryStats()
+        self._readers: dict = {}
+        self._entries: dict = {}
+        self._lock = threading.Lock()
+
+    def set_readers(self, readers: dict) -> None:
+        with self._lock:
+            self._readers = dict(readers)
+
+    def has_readers(self, file_name: str) -> bool:
+        with self._lock:
+            return self._readers.get(file_name, 0) > 0
+
+    # Keep the data frame of a view for its readers; read tells whether it was
+    # read by one of them. Returns whether the data frame was kept.
+    def add(self, file_name: str, data_frame: pd.DataFrame, read: bool = False) -> bool:
+        with self._lock:
+            readers = self._readers.get(file_name, 0) - (1 if read else 0)
+            if readers <= 0:
+                return False
+            self._entries[file_name] = [data_frame, readers]
+            return True
+
+    def get(self, file_name: str) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._entries.get(file_name)
+            if entry is None:
+                if file_name in self._readers:
+                    self.stats.misses += 1
+                return None
+            self.stats.hits += 1
+            entry[1] -= 1
+            if entry[1] > 0:
+                return entry[0].copy()
+            del self._entries[file_name]
+            self.stats.releases += 1
+            return entry[0]
+
+    # Drop the data frames of the views whose readers are done, like the readers
+    # generated in other processes.
+    def release(self, file_names: Iterable[str]) -> None:
+        with self._lock:
+            for file_name in file_names:
+                if self._entries.pop(file_name, None) is not None:
+                    self.stats.releases += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._readers = {}
+            self._entries.clear()
+
+
+_view_registry: Optional[ViewRegistry] = None
+
+
+# The registry of this process, every view generated in it shares it.
+def get_view_registry() -> ViewRegistry:
+    global _view_registry
+    if _view_registry is None:
+        _view_registry = ViewRegistry()
+    return _view_registry
@@ -0,0 +1,168 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import hashlib
+import inspect
+import json
+import os
+from datetime import date
+from typing import Optional
+
+from dagster import get_dagster_logger
+from dagster.utils import file_relative_path
+from decouple import config
+
+from edfi_amt_data_lake.api.api import is_tpdm_supported
+from edfi_amt_data_lake.helper.helper import get_path
+from edfi_amt_data_lake.helper.silver_format import get_latest_file
+from edfi_amt_data_lake.parquet.amt.amt_views import AMT_VIEWS, AmtView
+from edfi_amt_data_lake.parquet.Common.data_frame_backend import get_view_backend
+from edfi_amt_data_lake.parquet.Common.functions import getEndpointPath
+from edfi_amt_data_lake.parquet.Common.parquet_writer import (
+    parquet_exists,
+    remove_parquet,
+)
+
+STATE_FILE_NAME = "amt_state.json"
+DESCRIPTOR_MAP_FILE = "../../helper/descriptor_map/descriptor_map.json"
+COMMON_CODE_FOLDER = "../Common"
+
+# Settings the parquet files of the views are written with.
+OUTPUT_SETTINGS = [
+    "PARQUET_ENGINE",
+    "PARQUET_COMPRESSION",
+    "PARQUET_COMPRESSION_LEVEL",
+    "PARQUET_ROW_GROUP_SIZE",
+    "PARQUET_DICTIONARY",
+    "PARQUET_STATISTICS",
+    "PARQUET_PARTITIONED_VIEWS",
+]
+
+
+def is_incremental_generation_enabled() -> bool:
+    return config("INCREMENTAL_PARQUET_GENERATION", default=True, cast=bool)
+
+
+def _get_parquet_path(school_year: str) -> str:
+    return get_path(config('PARQUET_FILES_LOCATION'), school_year)
+
+
+def _get_file_hash(file_path: str) -> str:
+    with open(file_path, "rb") as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+# The code shared by the views, like the pandasWrapper and the parquet writer.
+def _get_common_code_hash() -> str:
+    folder = file_relative_path(__file__, COMMON_CODE_FOLDER)
+    code_hash = hashlib.sha1()
+    for file_name in sorted(os.listdir(folder)):
+        if file_name.endswith(".py"):
+            code_hash.update(file_name.encode())
+            code_hash.update(_get_file_hash(os.path.join(folder, file_name)).encode())
+    return code_hash.hexdigest()
+
+
+# The silver file an endpoint is read from. A new extraction (or merge) gives a
+# new file name, size or modification time.
+def _get_endpoint_signature(endpoint: str, school_year: str) -> Optional[list]:
+    path = getEndpointPath(endpoint, config('SILVER_DATA_LOCATION'), school_year)
+    latest_file = get_latest_file(path)
+    if latest_file is None:
+        return None
+    file_stat = os.stat(os.path.join(path, latest_file.file_name))
+    return [latest_file.file_name, file_stat.st_size, file_stat.st_mtime_ns]
+
+
+# Everything a view is generated from, but the other views: its silver endpoints,
+# its code and the shared code, the descriptor mapping, the settings it is written
+# with and, for the views that filter on it, the date.
+def get_view_signature(view: AmtView, school_year: str) -> dict:
+    signature = {
+        "code": _get_file_hash(inspect.getsourcefile(view.function) or ""),
+        "commonCode": _get_common_code_hash(),
+        "settings": {
+            **{setting: config(setting, default="") for setting in OUTPUT_SETTINGS},
+            "backend": get_view_backend(view.file_name)
+        },
+        "descriptorMap": _get_file_hash(file_relative_path(__file__, DESCRIPTOR_MAP_FILE)),
+        "endpoints": {endpoint: _get_endpoint_signature(endpoint, school_year) for endpoint in view.endpoints}
+    }
+    if view.uses_today:
+        signature["today"] = date.today().isoformat()
+    return signature
+
+
+def _load_state(school_year: str) -> dict:
+    file_path = os.path.join(_get_parquet_path(school_year), STATE_FILE_NAME)
+    if os.path.isfile(file_path):
+        with open(file_path, "r") as file:
+            return json.load(file)
+    return {}
+
+
+# Views to generate and the signature of every view at planning time.
+class AmtPlan:
+    def __init__(self, views: list, signatures: dict, disabled_views: Optional[list] = None):
+        self.views = views
+        self.signatures = signatures
+        self.disabled_views = disabled_views or []
+
+
+# Plan the views that have to be generated: the views without a parquet file, the
+# views whose inputs changed since they were generated and, transitively, the views
+# that read any of them. The parquet files of the other views are kept. The EPP
+# views are only planned when the ODS API has the TPDM data model and the disabled
+# views are not planned. Without INCREMENTAL_PARQUET_GENERATION every view is
+# planned.
+def plan_amt_views(school_year: str) -> AmtPlan:
+    logger = get_dagster_logger()
+    state = _load_state(school_year).get("views", {}) if is_incremental_generation_enabled() else {}
+    tpdm_supported = is_tpdm_supported()
+    disabled_views = [view for view in AMT_VIEWS if not view.is_enabled()]
+    amt_views = [
+        view for view in AMT_VIEWS
+        if (tpdm_supported or not view.requires_tpdm) and view not in disabled_views
+    ]
+    signatures = {view.name: get_view_signature(view, school_year) for view in amt_views}
+    stale_views = set(
+        view.name for view in amt_views
+        if state.get(view.name) != signatures[view.name]
+        or not parquet_exists(os.path.join(_get_parquet_path(school_year), view.file_name))
+    )
+    changed = True
+    while changed:
+        changed = False
+        for view in amt_views:
+            if view.name not in stale_views and any(name in stale_views for name in view.views):
+                stale_views.add(view.name)
+                changed = True
+    views = [view for view in amt_views if view.name in stale_views]
+    logger.info(
+        f"{len(views)} of {len(amt_views)} views to generate: {', '.join(view.name for view in views) or '-'}"
+    )
+    return AmtPlan(views, signatures, disabled_views)
+
+
+# Remove the parquet files (or partition folders) of the planned views, so they are
+# generated again, and the ones of the disabled views.
+def clean_planned_views(plan: AmtPlan, school_year: str) -> None:
+    for view in plan.views + plan.disabled_views:
+        remove_parquet(os.path.join(_get_parquet_path(school_year), view.file_name))
+
+
+# Save the signature of the views generated, views that failed are planned again
+# next time.
+def save_amt_state(plan: AmtPlan, school_year: str) -> None:
+    path = _get_parquet_path(school_year)
+    os.makedirs(path, exist_ok=True)
+    views = {
+        view.name: plan.signatures[view.name] for view in AMT_VIEWS
+        if view.name in plan.signatures and parquet_exists(os.path.join(path, view.file_name))
+    }
+    file_path = os.path.join(path, STATE_FILE_NAME)
+    with open(f"{file_path}.tmp", "w") as file:
+        json.dump({"views": views}, file)
+    os.replace(f"{file_path}.tmp", file_path)
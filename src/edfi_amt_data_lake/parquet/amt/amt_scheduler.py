@@ -0,0 +1,171 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+
+from dagster import get_dagster_logger
+from decouple import config
+
+from edfi_amt_data_lake.helper.helper import get_os_cpu
+from edfi_amt_data_lake.parquet.amt.amt_planner import AmtPlan
+from edfi_amt_data_lake.parquet.amt.amt_views import AmtView, get_amt_view
+from edfi_amt_data_lake.parquet.Common.endpoint_cache import (
+    get_endpoint_cache,
+    get_normalize_cache,
+)
+from edfi_amt_data_lake.parquet.Common.student_partitions import set_view_workers
+from edfi_amt_data_lake.parquet.Common.view_registry import get_view_registry
+
+
+def get_parquet_max_workers() -> int:
+    max_workers = config("PARQUET_MAX_WORKERS", default=get_os_cpu(), cast=int)
+    return max(1, max_workers)
+
+
+# Runs in a worker process: the view is looked up by name, only whether it was
+# generated goes back, the data frame is already in its parquet file. The silver
+# endpoints parsed and flattened by the process are kept for the next views it
+# generates, and so are the data frames of the views until their readers are
+# done: readers tells how many views read each one, released the views whose
+# readers are done. view_workers views are generated at the same time, the
+# student partitions of a view share the CPUs left.
+def _generate_view(name: str, school_year: str, readers: dict, released: list, view_workers: int) -> bool:
+    set_view_workers(view_workers)
+    view_registry = get_view_registry()
+    view_registry.set_readers(readers)
+    view_registry.release(released)
+    successful = get_amt_view(name).function(school_year).successful
+    get_dagster_logger().debug(
+        f"Caches after {name}: silver endpoints {get_endpoint_cache().stats}, "
+        f"normalized {get_normalize_cache().stats}, views {view_registry.stats}"
+    )
+    return successful
+
+
+# The planned views each view waits for. The views that are not planned already
+# have their parquet file, so they are read and never waited for.
+def _get_dependencies(views: list) -> dict:
+    names = set(view.name for view in views)
+    return {view.name: set(name for name in view.views if name in names) for view in views}
+
+
+# How many of the planned views read each view, by the file name of the view.
+def _get_readers(views: list) -> dict:
+    readers: dict = {}
+    for view in views:
+        for name in view.views:
+            file_name = get_amt_view(name).file_name
+            readers[file_name] = readers.get(file_name, 0) + 1
+    return readers
+
+
+def _log_view_result(view: AmtView, successful: bool, elapsed: float) -> None:
+    logger = get_dagster_logger()
+    if successful:
+        logger.info(f"View {view.name} generated in {elapsed:.2f}s.")
+    else:
+        logger.error(f"View {view.name} failed after {elapsed:.2f}s.")
+
+
+# The planned views that read a failed view, directly or through other views.
+# They are not generated, the views they read are missing.
+def _get_blocked_views(views: list, failed: str) -> list:
+    blocked = set([failed])
+    changed = True
+    while changed:
+        changed = False
+        for view in views:
+            if view.name not in blocked and any(name in blocked for name in view.views):
+                blocked.add(view.name)
+                changed = True
+    return [view for view in views if view.name in blocked and view.name != failed]
+
+
+def _log_blocked_views(blocked: list, failed: str) -> None:
+    logger = get_dagster_logger()
+    for view in blocked:
+        logger.error(f"View {view.name} not generated, {failed} failed.")
+
+
+# Generate the planned views, a view starts as soon as the views it reads are
+# generated and up to PARQUET_MAX_WORKERS views are generated at the same time,
+# each in its own process. The views that read a failed view are not started,
+# they fail too. Returns the names of the views that failed.
+def run_amt_views(plan: AmtPlan, school_year: str) -> list:
+    logger = get_dagster_logger()
+    max_workers = min(get_parquet_max_workers(), max(1, len(plan.views)))
+    dependencies = _get_dependencies(plan.views)
+    readers = _get_readers(plan.views)
+    pending = list(plan.views)
+    failed: list = []
+    logger.info(f"Generating {len(plan.views)} views with {max_workers} workers.")
+    if max_workers == 1:
+        # Same order as AMT_VIEWS, every view after the views it reads, in this
+        # process.
+        while pending:
+            view = pending.pop(0)
+            start = time.time()
+            successful = _generate_view(view.name, school_year, readers, [], 1)
+            _log_view_result(view, successful, time.time() - start)
+            if not successful:
+                failed.append(view.name)
+                blocked = _get_blocked_views(pending, view.name)
+                _log_blocked_views(blocked, view.name)
+                failed.extend(blocked_view.name for blocked_view in blocked)
+                pending = [pending_view for pending_view in pending if pending_view not in blocked]
+        logger.info(
+            f"Caches: silver endpoints {get_endpoint_cache().stats}, normalized {get_normalize_cache().stats}, "
+            f"views {get_view_registry().stats}"
+        )
+        get_endpoint_cache().clear()
+        get_normalize_cache().clear()
+        get_view_registry().clear()
+        return failed
+
+    # The readers of a view left to finish, once they are all done its data frame
+    # is dropped by the workers that keep it.
+    pending_readers = dict(readers)
+    released: list = []
+
+    def release_views(view: AmtView) -> None:
+        for name in view.views:
+            file_name = get_amt_view(name).file_name
+            pending_readers[file_name] -= 1
+            if pending_readers[file_name] == 0:
+                released.append(file_name)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        running: dict[Future, tuple[AmtView, float]] = {}
+        while pending or running:
+            for view in [view for view in pending if not dependencies[view.name]]:
+                if len(running) >= max_workers:
+                    break
+                pending.remove(view)
+                future = executor.submit(_generate_view, view.name, school_year, readers, released, max_workers)
+                running[future] = (view, time.time())
+            if not running:
+                raise ValueError(f"Circular dependency between the views {[view.name for view in pending]}")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                view, start = running.pop(future)
+                try:
+                    successful = future.result()
+                except Exception as view_exception:
+                    logger.error(f"View {view.name} worker failed: {view_exception!r}")
+                    successful = False
+                _log_view_result(view, successful, time.time() - start)
+                release_views(view)
+                for view_dependencies in dependencies.values():
+                    view_dependencies.discard(view.name)
+                if not successful:
+                    failed.append(view.name)
+                    blocked = _get_blocked_views(pending, view.name)
+                    _log_blocked_views(blocked, view.name)
+                    for blocked_view in blocked:
+                        pending.remove(blocked_view)
+                        failed.append(blocked_view.name)
+                        release_views(blocked_view)
+    return failed
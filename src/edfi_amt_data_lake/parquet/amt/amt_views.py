@@ -0,0 +1,680 @@
+# SPDX-License-Identifier: Apache-2.0
+# Licensed to the Ed-Fi Alliance under one or more agreements.
+# The Ed-Fi Alliance licenses this file to you under the Apache License, Version 2.0.
+# See the LICENSE and NOTICES files in the project root for more information.
+
+from typing import Any, Callable, Optional
+
+from edfi_amt_data_lake.parquet.amt.asmt.assessment_fact.main import assessment_fact
+from edfi_amt_data_lake.parquet.amt.asmt.student_assessment_fact.main import (
+    student_assessment_fact,
+)
+from edfi_amt_data_lake.parquet.amt.base.academic_time_period_dim.main import (
+    academic_time_period_dim,
+)
+from edfi_amt_data_lake.parquet.amt.base.all_student_school_dim.main import (
+    all_student_school_dim,
+)
+from edfi_amt_data_lake.parquet.amt.base.class_period_dim.main import class_period_dim
+from edfi_amt_data_lake.parquet.amt.base.contact_person_dim.main import (
+    contact_person_dim,
+)
+from edfi_amt_data_lake.parquet.amt.base.date_dim.main import date_dim
+from edfi_amt_data_lake.parquet.amt.base.demographics_dim.main import demographics_dim
+from edfi_amt_data_lake.parquet.amt.base.grading_period_dim.main import (
+    grading_period_dim,
+)
+from edfi_amt_data_lake.parquet.amt.base.local_education_agency_dim.main import (
+    local_education_agency_dim,
+)
+from edfi_amt_data_lake.parquet.amt.base.most_recent_grading_period.main import (
+    most_recent_grading_period,
+)
+from edfi_amt_data_lake.parquet.amt.base.school_dim.main import school_dim
+from edfi_amt_data_lake.parquet.amt.base.section_dim.main import section_dim
+from edfi_amt_data_lake.parquet.amt.base.staff_section_dim.main import staff_section_dim
+from edfi_amt_data_lake.parquet.amt.base.student_local_education_agency_demographics_bridge.main import (
+    student_local_education_agency_demographics_bridge,
+)
+from edfi_amt_data_lake.parquet.amt.base.student_local_education_agency_dim.main import (
+    student_local_education_agency_dim,
+)
+from edfi_amt_data_lake.parquet.amt.base.student_program_dim.main import (
+    student_program_dim,
+)
+from edfi_amt_data_lake.parquet.amt.base.student_school_demographics_bridge.main import (
+    student_school_demographics_bridge,
+)
+from edfi_amt_data_lake.parquet.amt.base.student_school_dim.main import (
+    student_school_dim,
+)
+from edfi_amt_data_lake.parquet.amt.base.student_section_dim.main import (
+    student_section_dim,
+)
+from edfi_amt_data_lake.parquet.amt.chrab.chronic_absenteeism_attendance_fact.main import (
+    chronic_absenteeism_attendance_fact,
+)
+from edfi_amt_data_lake.parquet.amt.epp.candidate_dim.main import candidate_dim
+from edfi_amt_data_lake.parquet.amt.epp.candidate_survey_dim.main import (
+    candidate_survey_dim,
+)
+from edfi_amt_data_lake.parquet.amt.epp.epp_dim.main import epp_dim
+from edfi_amt_data_lake.parquet.amt.epp.epp_financial_aid_fact.main import (
+    epp_financial_aid_fact,
+)
+from edfi_amt_data_lake.parquet.amt.epp.evaluation_element_rating_dim.main import (
+    evaluation_element_rating_dim,
+)
+from edfi_amt_data_lake.parquet.amt.epp.race_descriptor_dim.main import (
+    race_descriptor_dim,
+)
+from edfi_amt_data_lake.parquet.amt.epp.sex_descriptor_dim.main import (
+    sex_descriptor_dim,
+)
+from edfi_amt_data_lake.parquet.amt.epp.term_descriptor_dim.main import (
+    term_descriptor_dim,
+)
+from edfi_amt_data_lake.parquet.amt.equity.feeder_school_dim.main import (
+    feeder_school_dim,
+)
+from edfi_amt_data_lake.parquet.amt.equity.student_discipline_action_dim.main import (
+    student_discipline_action_dim,
+)
+from edfi_amt_data_lake.parquet.amt.equity.student_history_dim.main import (
+    student_history_dim,
+)
+from edfi_amt_data_lake.parquet.amt.equity.student_program_cohort_dim.main import (
+    student_program_cohort_dim,
+)
+from edfi_amt_data_lake.parquet.amt.equity.student_school_food_service_program_dim.main import (
+    student_school_food_service_program_dim,
+)
+from edfi_amt_data_lake.parquet.amt.ews.student_early_warning_fact.main import (
+    student_early_warning_fact,
+)
+from edfi_amt_data_lake.parquet.amt.ews.student_section_grade_fact.main import (
+    student_section_grade_fact,
+)
+from edfi_amt_data_lake.parquet.amt.rls.rls_staff_classification_descriptor_scope_list.main import (
+    rls_staff_classification_descriptor_scope_list,
+)
+from edfi_amt_data_lake.parquet.amt.rls.rls_student_data_authorization.main import (
+    rls_student_data_authorization,
+)
+from edfi_amt_data_lake.parquet.amt.rls.rls_user_authorization.main import (
+    rls_user_authorization,
+)
+from edfi_amt_data_lake.parquet.amt.rls.rls_user_dim.main import rls_user_dim
+from edfi_amt_data_lake.parquet.amt.rls.rls_user_student_data_authorization.main import (
+    is_user_student_pairs_enabled,
+    rls_scope_student_authorization,
+    rls_user_scope_authorization,
+    rls_user_student_data_authorization,
+)
+
+
+# An AMT view (dimension, fact, ...) and what it is generated from: the silver
+# endpoints and the other views it reads. A view with `enabled` is only generated
+# when it returns True, like the views of a format chosen in the settings. A view
+# with `uses_today` filters on the date it is generated, like the enrollments and
+# assignments still active.
+class AmtView:
+    def __init__(
+        self,
+        name: str,
+        collection: str,
+        function: Callable[[Any], Any],
+        file_name: str,
+        endpoints: list,
+        views: Optional[list] = None,
+        requires_tpdm: bool = False,
+        enabled: Optional[Callable[[], bool]] = None,
+        uses_today: bool = False
+    ):
+        self.name = name
+        self.collection = collection
+        self.function = function
+        self.file_name = file_name
+        self.endpoints = endpoints
+        self.views = views or []
+        self.requires_tpdm = requires_tpdm
+        self.enabled = enabled
+        self.uses_today = uses_today
+
+    def is_enabled(self) -> bool:
+        return self.enabled is None or self.enabled()
+
+
+# Every AMT view, after the views it reads. The views are generated in this order
+# when they are generated one at a time.
+AMT_VIEWS = [
+    AmtView(
+        name="assessment_fact",
+        collection="asmt",
+        function=assessment_fact,
+        file_name="asmt_AssessmentFact.parquet",
+        endpoints=[
+            "academicSubjectDescriptors",
+            "assessmentCategoryDescriptors",
+            "assessmentReportingMethodDescriptors",
+            "assessments",
+            "gradeLevelDescriptors",
+            "objectiveAssessments",
+            "resultDatatypeTypeDescriptors",
+        ]
+    ),
+    AmtView(
+        name="student_assessment_fact",
+        collection="asmt",
+        function=student_assessment_fact,
+        file_name="asmt_StudentAssessmentFact.parquet",
+        endpoints=[
+            "assessmentReportingMethodDescriptors",
+            "performanceLevelDescriptors",
+            "studentAssessments",
+            "studentSchoolAssociations",
+        ],
+        uses_today=True
+    ),
+    AmtView(
+        name="all_student_school_dim",
+        collection="base",
+        function=all_student_school_dim,
+        file_name="allStudentSchoolDim.parquet",
+        endpoints=[
+            "schools",
+            "studentEducationOrganizationAssociations",
+            "studentSchoolAssociations",
+            "students",
+        ],
+        uses_today=True
+    ),
+    AmtView(
+        name="class_period_dim",
+        collection="base",
+        function=class_period_dim,
+        file_name="classPeriodDim.parquet",
+        endpoints=[
+            "sections",
+        ]
+    ),
+    AmtView(
+        name="contact_person_dim",
+        collection="base",
+        function=contact_person_dim,
+        file_name="contactPersonDim.parquet",
+        endpoints=[
+            "parents",
+            "studentParentAssociations",
+        ],
+        uses_today=True
+    ),
+    AmtView(
+        name="date_dim",
+        collection="base",
+        function=date_dim,
+        file_name="dateDim.parquet",
+        endpoints=[
+            "calendarDates",
+        ]
+    ),
+    AmtView(
+        name="demographics_dim",
+        collection="base",
+        function=demographics_dim,
+        file_name="demographicDim.parquet",
+        endpoints=[
+            "cohortYearTypeDescriptors",
+            "disabilityDescriptors",
+            "disabilityDesignationDescriptors",
+            "languageDescriptors",
+            "languageUseDescriptors",
+            "raceDescriptors",
+            "schoolYearTypes",
+            "studentCharacteristicDescriptors",
+            "tribalAffiliationDescriptors",
+        ]
+    ),
+    AmtView(
+        name="grading_period_dim",
+        collection="base",
+        function=grading_period_dim,
+        file_name="gradingPeriodDim.parquet",
+        endpoints=[
+            "gradingPeriodDescriptors",
+            "gradingPeriods",
+        ]
+    ),
+    AmtView(
+        name="local_education_agency_dim",
+        collection="base",
+        function=local_education_agency_dim,
+        file_name="localEducationAgencyDim.parquet",
+        endpoints=[
+            "educationServiceCenters",
+            "localEducationAgencies",
+            "stateEducationAgencies",
+        ]
+    ),
+    AmtView(
+        name="most_recent_grading_period",
+        collection="base",
+        function=most_recent_grading_period,
+        file_name="mostRecentGradingPeriod.parquet",
+        endpoints=[],
+        views=[
+            "grading_period_dim",
+        ]
+    ),
+    AmtView(
+        name="school_dim",
+        collection="base",
+        function=school_dim,
+        file_name="schoolDim.parquet",
+        endpoints=[
+            "educationServiceCenters",
+            "localEducationAgencies",
+            "schools",
+            "stateEducationAgencies",
+        ]
+    ),
+    AmtView(
+        name="student_program_dim",
+        collection="base",
+        function=student_program_dim,
+        file_name="studentProgramDim.parquet",
+        endpoints=[
+            "programTypeDescriptors",
+            "programs",
+            "studentProgramAssociations",
+            "studentSchoolAssociations",
+        ],
+        uses_today=True
+    ),
+    AmtView(
+        name="section_dim",
+        collection="base",
+        function=section_dim,
+        file_name="sectionDim.parquet",
+        endpoints=[
+            "academicSubjectDescriptors",
+            "courseOfferings",
+            "courses",
+            "educationalEnvironmentDescriptors",
+            "schools",
+            "sections",
+            "sessions",
+            "termDescriptors",
+        ]
+    ),
+    AmtView(
+        name="staff_section_dim",
+        collection="base",
+        function=staff_section_dim,
+        file_name="staffSectionDim.parquet",
+        endpoints=[
+            "staffSectionAssociations",
+            "staffs",
+        ],
+        uses_today=True
+    ),
+    AmtView(
+        name="student_local_education_agency_demographics_bridge",
+        collection="base",
+        function=student_local_education_agency_demographics_bridge,
+        file_name="studentLocalEducationAgencyDemographicsBridge.parquet",
+        endpoints=[
+            "schools",
+            "studentEducationOrganizationAssociations",
+            "studentSchoolAssociations",
+        ],
+        uses_today=True
+    ),
+    AmtView(
+        name="student_school_demographics_bridge",
+        collection="base",
+        function=student_school_demographics_bridge,
+        file_name="studentSchoolDemographicsBridge.parquet",
+        endpoints=[
+            "studentEducationOrganizationAssociations",
+            "studentSchoolAssociations",
+        ],
+        uses_today=True
+    ),
+    AmtView(
+        name="student_section_dim",
+        collection="base",
+        function=student_section_dim,
+        file_name="studentSectionDim.parquet",
+        endpoints=[
+            "academicSubjectDescriptors",
+            "courseOfferings",
+            "courses",
+            "sections",
+            "staffSectionAssociations",
+            "staffs",
+            "studentSectionAssociations",
+        ]
+    ),
+    AmtView(
+        name="academic_time_period_dim",
+        collection="base",
+        function=academic_time_period_dim,
+        file_name="academicTimePeriodDim.parquet",
+        endpoints=[
+            "gradingPeriodDescriptors",
+            "gradingPeriods",
+            "schoolYearTypes",
+            "sessions",
+            "termDescriptors",
+        ]
+    ),
+    AmtView(
+        name="student_local_education_agency_dim",
+        collection="base",
+        function=student_local_education_agency_dim,
+        file_name="studentLocalEducationAgencyDim.parquet",
+        endpoints=[
+            "localEducationAgencies",
+            "studentEducationOrganizationAssociations",
+            "studentSchoolAssociations",
+            "students",
+        ],
+        uses_today=True
+    ),
+    AmtView(
+        name="student_school_dim",
+        collection="base",
+        function=student_school_dim,
+        file_name="studentSchoolDim.parquet",
+        endpoints=[],
+        views=[
+            "all_student_school_dim",
+        ]
+    ),
+    AmtView(
+        name="chronic_absenteeism_attendance_fact",
+        collection="chrab",
+        function=chronic_absenteeism_attendance_fact,
+        file_name="chrab_chronicAbsenteeismAttendanceFact.parquet",
+        endpoints=[
+            "calendarDates",
+            "studentSchoolAssociations",
+            "studentSchoolAttendanceEvents",
+            "studentSectionAssociations",
+            "studentSectionAttendanceEvents",
+        ],
+        uses_today=True
+    ),
+    AmtView(
+        name="candidate_survey_dim",
+        collection="epp",
+        function=candidate_survey_dim,
+        file_name="epp_candidateSurveyDim.parquet",
+        endpoints=[
+            "candidates",
+            "surveyQuestionResponses",
+            "surveyQuestions",
+            "surveyResponsePersonTargetAssociations",
+            "surveyResponses",
+            "surveys",
+        ],
+        requires_tpdm=True
+    ),
+    AmtView(
+        name="evaluation_element_rating_dim",
+        collection="epp",
+        function=evaluation_element_rating_dim,
+        file_name="epp_EvaluationElementRatingDim.parquet",
+        endpoints=[
+            "candidates",
+            "evaluationElementRatings",
+            "evaluationObjectives",
+            "termDescriptors",
+        ],
+        requires_tpdm=True
+    ),
+    AmtView(
+        name="term_descriptor_dim",
+        collection="epp",
+        function=term_descriptor_dim,
+        file_name="epp_TermDescriptorDim.parquet",
+        endpoints=[
+            "termDescriptors",
+        ],
+        requires_tpdm=True
+    ),
+    AmtView(
+        name="race_descriptor_dim",
+        collection="epp",
+        function=race_descriptor_dim,
+        file_name="epp_RaceDescriptorDim.parquet",
+        endpoints=[
+            "raceDescriptors",
+        ],
+        requires_tpdm=True
+    ),
+    AmtView(
+        name="sex_descriptor_dim",
+        collection="epp",
+        function=sex_descriptor_dim,
+        file_name="epp_SexDescriptorDim.parquet",
+        endpoints=[
+            "sexDescriptors",
+        ],
+        requires_tpdm=True
+    ),
+    AmtView(
+        name="epp_financial_aid_fact",
+        collection="epp",
+        function=epp_financial_aid_fact,
+        file_name="epp_FinancialAidFact.parquet",
+        endpoints=[
+            "aidTypeDescriptors",
+            "candidates",
+            "financialAids",
+            "students",
+        ],
+        requires_tpdm=True
+    ),
+    AmtView(
+        name="epp_dim",
+        collection="epp",
+        function=epp_dim,
+        file_name="epp_EppDim.parquet",
+        endpoints=[
+            "schools",
+        ],
+        requires_tpdm=True
+    ),
+    AmtView(
+        name="candidate_dim",
+        collection="epp",
+        function=candidate_dim,
+        file_name="epp_CandidateDim.parquet",
+        endpoints=[
+            "candidateEducatorPreparationProgramAssociations",
+            "candidates",
+            "credentials",
+            "people",
+            "raceDescriptors",
+            "sexDescriptors",
+            "students",
+        ],
+        requires_tpdm=True
+    ),
+    AmtView(
+        name="student_discipline_action_dim",
+        collection="equity",
+        function=student_discipline_action_dim,
+        file_name="equity_StudentDisciplineActionDim.parquet",
+        endpoints=[
+            "disciplineActions",
+            "disciplineDescriptors",
+            "studentschoolAssociations",
+        ],
+        uses_today=True
+    ),
+    AmtView(
+        name="student_program_cohort_dim",
+        collection="equity",
+        function=student_program_cohort_dim,
+        file_name="equity_StudentProgramCohortDim.parquet",
+        endpoints=[
+            "cohortTypeDescriptors",
+            "cohorts",
+            "gradeLevelDescriptors",
+            "programTypeDescriptors",
+            "studentCohortAssociations",
+            "studentSchoolAssociations",
+        ],
+        uses_today=True
+    ),
+    AmtView(
+        name="feeder_school_dim",
+        collection="equity",
+        function=feeder_school_dim,
+        file_name="equity_FeederSchoolDim.parquet",
+        endpoints=[
+            "feederSchoolAssociations",
+            "schools",
+        ],
+        uses_today=True
+    ),
+    AmtView(
+        name="student_school_food_service_program_dim",
+        collection="equity",
+        function=student_school_food_service_program_dim,
+        file_name="equity_StudentSchoolFoodServiceProgramDim.parquet",
+        endpoints=[
+            "programTypeDescriptors",
+            "schoolFoodServiceProgramServiceDescriptors",
+            "studentSchoolAssociations",
+            "studentSchoolFoodServiceProgramAssociations",
+        ],
+        uses_today=True
+    ),
+    AmtView(
+        name="student_history_dim",
+        collection="equity",
+        function=student_history_dim,
+        file_name="equity_StudentHistoryDim.parquet",
+        endpoints=[
+            "grades",
+        ],
+        views=[
+            "all_student_school_dim",
+            "school_dim",
+            "student_school_dim",
+            "student_section_dim",
+            "chronic_absenteeism_attendance_fact",
+            "student_discipline_action_dim",
+        ]
+    ),
+    AmtView(
+        name="student_early_warning_fact",
+        collection="ews",
+        function=student_early_warning_fact,
+        file_name="ews_StudentEarlyWarningFact.parquet",
+        endpoints=[
+            "calendarDates",
+            "disciplineIncidents",
+            "studentDisciplineIncidentBehaviorAssociations",
+            "studentSchoolAssociations",
+            "studentSchoolAttendanceEvents",
+            "studentSectionAssociations",
+            "studentSectionAttendanceEvents",
+        ],
+        uses_today=True
+    ),
+    AmtView(
+        name="student_section_grade_fact",
+        collection="ews",
+        function=student_section_grade_fact,
+        file_name="ews_studentSectionGradeFact.parquet",
+        endpoints=[
+            "grades",
+            "gradingPeriodDescriptors",
+            "gradingPeriods",
+        ]
+    ),
+    AmtView(
+        name="rls_student_data_authorization",
+        collection="rls",
+        function=rls_student_data_authorization,
+        file_name="rls_StudentDataAuthorization.parquet",
+        endpoints=[
+            "studentSectionAssociations",
+        ]
+    ),
+    AmtView(
+        name="rls_user_dim",
+        collection="rls",
+        function=rls_user_dim,
+        file_name="rls_userDim.parquet",
+        endpoints=[
+            "staffs",
+        ]
+    ),
+    AmtView(
+        name="rls_user_authorization",
+        collection="rls",
+        function=rls_user_authorization,
+        file_name="rls_UserAuthorization.parquet",
+        endpoints=[
+            "staffEducationOrganizationAssignmentAssociations",
+            "staffSectionAssociations",
+        ],
+        uses_today=True
+    ),
+    AmtView(
+        name="rls_user_scope_authorization",
+        collection="rls",
+        function=rls_user_scope_authorization,
+        file_name="rls_UserScopeAuthorization.parquet",
+        endpoints=[
+            "staffEducationOrganizationAssignmentAssociations",
+            "staffSectionAssociations",
+        ],
+        uses_today=True
+    ),
+    AmtView(
+        name="rls_scope_student_authorization",
+        collection="rls",
+        function=rls_scope_student_authorization,
+        file_name="rls_ScopeStudentAuthorization.parquet",
+        endpoints=[
+            "schools",
+            "studentSchoolAssociations",
+            "studentSectionAssociations",
+        ],
+        views=[
+            "rls_user_scope_authorization",
+        ],
+        uses_today=True
+    ),
+    AmtView(
+        name="rls_user_student_data_authorization",
+        collection="rls",
+        function=rls_user_student_data_authorization,
+        file_name="rls_UserStudentDataAuthorization.parquet",
+        endpoints=[],
+        views=[
+            "rls_user_scope_authorization",
+            "rls_scope_student_authorization",
+        ],
+        enabled=is_user_student_pairs_enabled,
+        uses_today=True
+    ),
+    AmtView(
+        name="rls_staff_classification_descriptor_scope_list",
+        collection="rls",
+        function=rls_staff_classification_descriptor_scope_list,
+        file_name="rls_StaffClassificationDescriptorScopeList.parquet",
+        endpoints=[]
+    )
+]
+
+
+def get_amt_view(name: str) -> AmtView:
+    return next(view for view in AMT_VIEWS if view.name == name)
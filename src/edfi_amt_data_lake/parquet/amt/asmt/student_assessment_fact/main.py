@@ -11,16 +11,20 @@ from edfi_amt_data_lake.helper.data_frame_generation_result import (
     data_frame_generation_result,
 )
 from edfi_amt_data_lake.parquet.Common.functions import getEndpointJson
+from edfi_amt_data_lake.parquet.Common.json_flattener import FlattenTable, jsonFlatten
 from edfi_amt_data_lake.parquet.Common.pandasWrapper import (
+    CATEGORY,
     create_parquet_file,
     get_descriptor_code_value_from_uri,
     is_data_frame_empty,
+    join_columns,
     jsonNormalize,
     pdMerge,
     renameColumns,
     subset,
     to_datetime_key,
 )
+from edfi_amt_data_lake.parquet.Common.parquet_writer import ParquetWriterOptions
 
 ENDPOINT_STUDENT_ASSESSSMENTS = "studentAssessments"
 ENDPOINT_STUDENT_SCHOOL_ASSOCIATION = "studentSchoolAssociations"
@@ -51,6 +55,22 @@ RESULT_COLUMNS = [
     'StudentAssessmentPerformanceResult'
 ]
 
+RESULT_COLUMN_TYPES = {
+    'AssessedGradeLevel': CATEGORY,
+    'ResultDataType': CATEGORY,
+    'ReportingMethod': CATEGORY,
+    'PerformanceResult': CATEGORY,
+    'StudentAssessmentResultDataType': CATEGORY,
+    'StudentAssessmentReportingMethod': CATEGORY,
+    'StudentAssessmentPerformanceResult': CATEGORY
+}
+
+# Sorted by school, the statistics of the row groups filter the schools on read.
+PARQUET_WRITER_OPTIONS = ParquetWriterOptions(
+    sort_by=['SchoolKey', 'StudentKey', 'AdministrationDateKey'],
+    partition_by=['SchoolKey']
+)
+
 
 @create_parquet_file
 def student_assessment_fact_dataframe(
@@ -128,56 +148,80 @@ def student_assessment_fact_dataframe(
     ############################
     # student assessment
     ############################
-    student_assessment_content = jsonNormalize(
+    student_assessment_tables = jsonFlatten(
         student_assessment_json,
-        recordPath=None,
-        meta=[
-            'id',
-            'administrationDate',
-            'studentAssessmentIdentifier',
-            'assessmentReference.assessmentIdentifier',
-            'assessmentReference.namespace',
-            'studentReference.studentUniqueId',
-            'whenAssessedGradeLevelDescriptor'
-        ],
-        metaPrefix=None,
-        recordPrefix=None,
-        errors="ignore",
+        {
+            'student_assessment': FlattenTable(
+                meta=[
+                    'id',
+                    'administrationDate',
+                    'studentAssessmentIdentifier',
+                    'assessmentReference.assessmentIdentifier',
+                    'assessmentReference.namespace',
+                    'studentReference.studentUniqueId',
+                    'whenAssessedGradeLevelDescriptor'
+                ]
+            ),
+            'student_objective_assessment': FlattenTable(
+                recordPath=['studentObjectiveAssessments'],
+                meta=['id'],
+                recordMeta=['objectiveAssessmentReference.identificationCode']
+            ),
+            'score_results': FlattenTable(
+                recordPath=['scoreResults'],
+                meta=['id'],
+                recordMeta=[
+                    'assessmentReportingMethodDescriptor',
+                    'result',
+                    'resultDatatypeTypeDescriptor'
+                ]
+            ),
+            'performance_levels': FlattenTable(
+                recordPath=['performanceLevels'],
+                meta=['id'],
+                recordMeta=[
+                    'assessmentReportingMethodDescriptor',
+                    'performanceLevelDescriptor',
+                    'performanceLevelMet'
+                ]
+            ),
+            'objective_assessment_score_results': FlattenTable(
+                recordPath=['studentObjectiveAssessments', 'scoreResults'],
+                meta=[
+                    'id',
+                    ['studentObjectiveAssessments', 'objectiveAssessmentReference', 'identificationCode']
+                ],
+                recordMeta=[
+                    'assessmentReportingMethodDescriptor',
+                    'result',
+                    'resultDatatypeTypeDescriptor'
+                ]
+            ),
+            'objective_assessment_performance_levels': FlattenTable(
+                recordPath=['studentObjectiveAssessments', 'performanceLevels'],
+                meta=[
+                    'id',
+                    ['studentObjectiveAssessments', 'objectiveAssessmentReference', 'identificationCode']
+                ],
+                recordMeta=[
+                    'assessmentReportingMethodDescriptor',
+                    'performanceLevelDescriptor',
+                    'performanceLevelMet'
+                ]
+            )
+        }
     )
+    student_assessment_content = student_assessment_tables['student_assessment']
     if is_data_frame_empty(student_assessment_content):
         return None
     ############################
     # Student Objective Assessment
     ############################
-    student_objective_assessment = jsonNormalize(
-        student_assessment_json,
-        recordPath=[
-            'studentObjectiveAssessments'
-        ],
-        meta=['id'],
-        metaPrefix=None,
-        recordMeta=[
-            'objectiveAssessmentReference.identificationCode',
-        ],
-        recordPrefix=None,
-        errors='ignore'
-    )
+    student_objective_assessment = student_assessment_tables['student_objective_assessment']
     ############################
     # Student Assessments Score Result
     ############################
-    student_assessment_score_results = jsonNormalize(
-        student_assessment_json,
-        recordPath=['scoreResults'],
-        meta=['id'],
-        metaPrefix=None,
-        recordMeta=[
-            'assessmentReportingMethodDescriptor',
-            'result',
-            'resultDatatypeTypeDescriptor'
-        ],
-        recordPrefix=None,
-        errors='ignore'
-    )
+    student_assessment_score_results = student_assessment_tables['score_results']
     get_descriptor_code_value_from_uri(student_assessment_score_results, 'assessmentReportingMethodDescriptor')
     student_assessment_score_results = pdMerge(
         left=student_assessment_score_results,
@@ -191,19 +235,7 @@ def student_assessment_fact_dataframe(
     ############################
     # Student Assessments Performance Level
     ############################
-    student_assessment_performance_levels = jsonNormalize(
-        student_assessment_json,
-        recordPath=['performanceLevels'],
-        meta=['id'],
-        metaPrefix=None,
-        recordMeta=[
-            'assessmentReportingMethodDescriptor',
-            'performanceLevelDescriptor',
-            'performanceLevelMet'
-        ],
-        recordPrefix=None,
-        errors='ignore'
-    )
+    student_assessment_performance_levels = student_assessment_tables['performance_levels']
     get_descriptor_code_value_from_uri(student_assessment_performance_levels, 'assessmentReportingMethodDescriptor')
     get_descriptor_code_value_from_uri(student_assessment_performance_levels, 'performanceLevelDescriptor')
     student_assessment_performance_levels = pdMerge(
@@ -227,21 +259,7 @@ def student_assessment_fact_dataframe(
     ############################
     # Student Objective Assessments Score Results
     ############################
-    student_objective_assessment_scoreResults = jsonNormalize(
-        student_assessment_json,
-        recordPath=['studentObjectiveAssessments', 'scoreResults'],
-        meta=[
-            'id',
-            ['studentObjectiveAssessments', 'objectiveAssessmentReference', 'identificationCode']
-        ],
-        recordMeta=[
-            'assessmentReportingMethodDescriptor',
-            'result',
-            'resultDatatypeTypeDescriptor'
-        ],
-        recordPrefix=None,
-        errors='ignore'
-    )
+    student_objective_assessment_scoreResults = student_assessment_tables['objective_assessment_score_results']
     get_descriptor_code_value_from_uri(student_objective_assessment_scoreResults, 'assessmentReportingMethodDescriptor')
     student_objective_assessment_scoreResults = pdMerge(
         left=student_objective_assessment_scoreResults,
@@ -255,22 +273,7 @@ def student_assessment_fact_dataframe(
     ############################
     # Student Objective Assessments Performance Level
     ############################
-    student_objective_assessment_performanceLevels = jsonNormalize(
-        student_assessment_json,
-        recordPath=['studentObjectiveAssessments', 'performanceLevels'],
-        meta=[
-            'id',
-            ['studentObjectiveAssessments', 'objectiveAssessmentReference', 'identificationCode']
-        ],
-        metaPrefix=None,
-        recordMeta=[
-            'assessmentReportingMethodDescriptor',
-            'performanceLevelDescriptor',
-            'performanceLevelMet'
-        ],
-        recordPrefix=None,
-        errors='ignore'
-    )
+    student_objective_assessment_performanceLevels = student_assessment_tables['objective_assessment_performance_levels']
     get_descriptor_code_value_from_uri(student_objective_assessment_performanceLevels, 'performanceLevelDescriptor')
     get_descriptor_code_value_from_uri(student_objective_assessment_performanceLevels, 'assessmentReportingMethodDescriptor')
     student_objective_assessment_performanceLevels = pdMerge(
@@ -453,21 +456,20 @@ def student_assessment_fact_dataframe(
         + data_frame['schoolReference.schoolId'].astype(str)
     ).astype(str)
 
-    data_frame["StudentObjectiveAssessmentKey"] = data_frame.apply(
-        lambda r: (r["studentReference.studentUniqueId"] + '-'
-                   + r["objectiveAssessmentReference.identificationCode"] + '-'
-                   + r["assessmentReference.assessmentIdentifier"] + '-'
-                   + r["studentAssessmentIdentifier"] + '-'
-                   + r["assessmentReference.namespace"])
-        if r["objectiveAssessmentReference.identificationCode"] != '' else '', axis=1
-    )
+    has_objective_assessment = data_frame["objectiveAssessmentReference.identificationCode"] != ''
+    data_frame["StudentObjectiveAssessmentKey"] = join_columns(data_frame, [
+        "studentReference.studentUniqueId",
+        "objectiveAssessmentReference.identificationCode",
+        "assessmentReference.assessmentIdentifier",
+        "studentAssessmentIdentifier",
+        "assessmentReference.namespace"
+    ]).where(has_objective_assessment, '')
 
-    data_frame["ObjectiveAssessmentKey"] = data_frame.apply(
-        lambda r: (r["assessmentReference.assessmentIdentifier"] + '-'
-                   + r["objectiveAssessmentReference.identificationCode"] + '-'
-                   + r["assessmentReference.namespace"])
-        if r["objectiveAssessmentReference.identificationCode"] != '' else '', axis=1
-    )
+    data_frame["ObjectiveAssessmentKey"] = join_columns(data_frame, [
+        "assessmentReference.assessmentIdentifier",
+        "objectiveAssessmentReference.identificationCode",
+        "assessmentReference.namespace"
+    ]).where(has_objective_assessment, '')
 
     # Rename result columns to AMT View column name.
     data_frame = renameColumns(data_frame, {
@@ -504,5 +506,7 @@ def student_assessment_fact(school_year) -> data_frame_generation_result:
     return student_assessment_fact_dataframe(
         file_name="asmt_StudentAssessmentFact.parquet",
         columns=RESULT_COLUMNS,
+        column_types=RESULT_COLUMN_TYPES,
+        writer_options=PARQUET_WRITER_OPTIONS,
         school_year=school_year
     )
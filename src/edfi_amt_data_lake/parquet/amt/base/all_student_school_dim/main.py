@@ -12,11 +12,15 @@ from edfi_amt_data_lake.helper.data_frame_generation_result import (
     data_frame_generation_result,
 )
 from edfi_amt_data_lake.parquet.Common.functions import getEndpointJson
+from edfi_amt_data_lake.parquet.Common.json_flattener import FlattenTable, jsonFlatten
 from edfi_amt_data_lake.parquet.Common.pandasWrapper import (
+    CATEGORY,
     add_dataframe_column,
     addColumnIfNotExists,
+    coalesce,
     create_empty_data_frame,
     create_parquet_file,
+    default_if_empty,
     get_descriptor_code_value_from_uri,
     jsonNormalize,
     pdMerge,
@@ -24,6 +28,7 @@ from edfi_amt_data_lake.parquet.Common.pandasWrapper import (
     replace_null,
     subset,
     to_datetime_key,
+    to_flag,
 )
 
 ENDPOINT_STUDENT_SCHOOL_ASSOCIATIONS = 'studentSchoolAssociations'
@@ -55,6 +60,17 @@ RESULT_COLUMNS = [
     'ExitWithdrawDate'
 ]
 
+RESULT_COLUMN_TYPES = {
+    'GradeLevel': CATEGORY,
+    'LimitedEnglishProficiency': CATEGORY,
+    'Sex': CATEGORY,
+    'InternetAccessInResidence': CATEGORY,
+    'InternetAccessTypeInResidence': CATEGORY,
+    'InternetPerformance': CATEGORY,
+    'DigitalDevice': CATEGORY,
+    'DeviceAccess': CATEGORY
+}
+
 
 def all_student_school_dim_data_frame_base(
     file_name: str,
@@ -150,20 +166,31 @@ def all_student_school_dim_data_frame_base(
         addColumnIfNotExists(result_data_frame, 'indicator_digital_device')
         addColumnIfNotExists(result_data_frame, 'indicator_device_access')
     else:
-        student_school_education_organization_associations_normalized = jsonNormalize(
-            data=student_school_education_organization_associations_content,
-            recordPath=None,
-            meta=[
-                'id',
-                ['educationOrganizationReference', 'educationOrganizationId'],
-                ['studentReference', 'studentUniqueId'],
-                'hispanicLatinoEthnicity',
-                'limitedEnglishProficiencyDescriptor',
-                'sexDescriptor'
-            ],
-            metaPrefix=None,
-            recordPrefix=None,
-            errors='ignore'
+        student_school_education_organization_associations_tables = jsonFlatten(
+            student_school_education_organization_associations_content,
+            {
+                'associations': FlattenTable(
+                    meta=[
+                        'id',
+                        ['educationOrganizationReference', 'educationOrganizationId'],
+                        ['studentReference', 'studentUniqueId'],
+                        'hispanicLatinoEthnicity',
+                        'limitedEnglishProficiencyDescriptor',
+                        'sexDescriptor'
+                    ]
+                ),
+                'indicators': FlattenTable(
+                    recordPath=['studentIndicators'],
+                    meta=['id'],
+                    recordMeta=[
+                        'indicatorName',
+                        'indicator'
+                    ]
+                )
+            }
+        )
+        student_school_education_organization_associations_normalized = (
+            student_school_education_organization_associations_tables['associations']
         )
 
         replace_null(student_school_education_organization_associations_normalized, 'limitedEnglishProficiencyDescriptor', '')
@@ -171,21 +198,8 @@ def all_student_school_dim_data_frame_base(
         get_descriptor_code_value_from_uri(student_school_education_organization_associations_normalized, 'limitedEnglishProficiencyDescriptor')
         get_descriptor_code_value_from_uri(student_school_education_organization_associations_normalized, 'sexDescriptor')
 
-        student_school_education_organization_associations_indicators_normalized = jsonNormalize(
-            data=student_school_education_organization_associations_content,
-            recordPath=[
-                'studentIndicators'
-            ],
-            meta=[
-                'id'
-            ],
-            recordMeta=[
-                'indicatorName',
-                'indicator'
-            ],
-            metaPrefix=None,
-            recordPrefix=None,
-            errors='ignore'
+        student_school_education_organization_associations_indicators_normalized = (
+            student_school_education_organization_associations_tables['indicators']
         )
         if student_school_education_organization_associations_indicators_normalized.empty:
             addColumnIfNotExists(student_school_education_organization_associations_normalized, 'indicator')
@@ -425,64 +439,42 @@ def all_student_school_dim_data_frame_base(
     # District Education Organization ends
     result_data_frame = result_data_frame.fillna('')
     # LimitedEnglishProficiency
-    result_data_frame['LimitedEnglishProficiency'] = (
-        result_data_frame.apply(
-            lambda x: x['limitedEnglishProficiencyDescriptor'] if x['limitedEnglishProficiencyDescriptor'] != '' else x['limitedEnglishProficiencyDescriptor_districtEdOrg'], axis=1
-        )
+    result_data_frame['LimitedEnglishProficiency'] = coalesce(
+        result_data_frame, 'limitedEnglishProficiencyDescriptor', 'limitedEnglishProficiencyDescriptor_districtEdOrg'
     )
 
     # IsHispanic
-    result_data_frame['IsHispanic'] = (
-        result_data_frame.apply(
-            lambda x: x['hispanicLatinoEthnicity'] if x['hispanicLatinoEthnicity'] != '' else x['hispanicLatinoEthnicity_districtEdOrg'], axis=1
-        )
-    )
+    result_data_frame['IsHispanic'] = coalesce(result_data_frame, 'hispanicLatinoEthnicity', 'hispanicLatinoEthnicity_districtEdOrg')
 
-    result_data_frame['IsHispanic'] = result_data_frame['IsHispanic'].apply(
-        lambda x: False if x == '' else x
-    )
+    result_data_frame['IsHispanic'] = default_if_empty(result_data_frame, 'IsHispanic', False)
 
     result_data_frame["IsHispanic"] = result_data_frame["IsHispanic"].astype(int)
 
     # Sex
-    result_data_frame['Sex'] = (
-        result_data_frame.apply(
-            lambda x: x['sexDescriptor'] if x['sexDescriptor'] != '' else x['sexDescriptor_districtEdOrg'], axis=1
-        )
-    )
+    result_data_frame['Sex'] = coalesce(result_data_frame, 'sexDescriptor', 'sexDescriptor_districtEdOrg')
     # Internet Access In Residence
     result_data_frame['InternetAccessInResidence'] = (
-        result_data_frame.apply(
-            lambda x: x['indicator'] if x['indicator'] != '' else x['indicator_districtEdOrg'], axis=1
-        )
+        coalesce(result_data_frame, 'indicator', 'indicator_districtEdOrg')
     ).astype(str)
 
     # Internet Access Type In Residence
     result_data_frame['InternetAccessTypeInResidence'] = (
-        result_data_frame.apply(
-            lambda x: x['indicator_internet_access_type_in_residence'] if x['indicator_internet_access_type_in_residence'] != '' else x['indicator_internet_access_type_in_residence_districtEdOrg'], axis=1
-        )
+        coalesce(result_data_frame, 'indicator_internet_access_type_in_residence', 'indicator_internet_access_type_in_residence_districtEdOrg')
     ).astype(str)
 
     # Internet Performance In Residence
     result_data_frame['InternetPerformance'] = (
-        result_data_frame.apply(
-            lambda x: x['indicator_internet_performance_in_residence'] if x['indicator_internet_performance_in_residence'] != '' else x['indicator_internet_performance_in_residence_districtEdOrg'], axis=1
-        )
+        coalesce(result_data_frame, 'indicator_internet_performance_in_residence', 'indicator_internet_performance_in_residence_districtEdOrg')
     ).astype(str)
 
     # Digital Device
     result_data_frame['DigitalDevice'] = (
-        result_data_frame.apply(
-            lambda x: x['indicator_digital_device'] if x['indicator_digital_device'] != '' else x['indicator_digital_device_districtEdOrg'], axis=1
-        )
+        coalesce(result_data_frame, 'indicator_digital_device', 'indicator_digital_device_districtEdOrg')
     ).astype(str)
 
     # Device Access
     result_data_frame['DeviceAccess'] = (
-        result_data_frame.apply(
-            lambda x: x['indicator_device_access'] if x['indicator_device_access'] != '' else x['indicator_device_access_districtEdOrg'], axis=1
-        )
+        coalesce(result_data_frame, 'indicator_device_access', 'indicator_device_access_districtEdOrg')
     ).astype(str)
 
     result_data_frame = subset(result_data_frame, [
@@ -536,39 +528,27 @@ def all_student_school_dim_data_frame_base(
         lambda x: 'Unknown' if x == '' else str(int(x))
     )
     result_data_frame['SchoolYear'] = result_data_frame['SchoolYear'].astype(str)
-    result_data_frame['LimitedEnglishProficiency'] = result_data_frame['LimitedEnglishProficiency'].apply(
-        lambda x: 'Not applicable' if x == '' else x
+    result_data_frame['LimitedEnglishProficiency'] = default_if_empty(
+        result_data_frame, 'LimitedEnglishProficiency', 'Not applicable'
     )
 
-    result_data_frame['InternetAccessInResidence'] = result_data_frame['InternetAccessInResidence'].apply(
-        lambda x: 'n/a' if x == '' else x
-    )
+    result_data_frame['InternetAccessInResidence'] = default_if_empty(result_data_frame, 'InternetAccessInResidence', 'n/a')
 
-    result_data_frame['InternetAccessTypeInResidence'] = result_data_frame['InternetAccessTypeInResidence'].apply(
-        lambda x: 'n/a' if x == '' else x
-    )
+    result_data_frame['InternetAccessTypeInResidence'] = default_if_empty(result_data_frame, 'InternetAccessTypeInResidence', 'n/a')
 
-    result_data_frame['InternetPerformance'] = result_data_frame['InternetPerformance'].apply(
-        lambda x: 'n/a' if x == '' else x
-    )
+    result_data_frame['InternetPerformance'] = default_if_empty(result_data_frame, 'InternetPerformance', 'n/a')
 
-    result_data_frame['DigitalDevice'] = result_data_frame['DigitalDevice'].apply(
-        lambda x: 'n/a' if x == '' else x
-    )
+    result_data_frame['DigitalDevice'] = default_if_empty(result_data_frame, 'DigitalDevice', 'n/a')
 
-    result_data_frame['DeviceAccess'] = result_data_frame['DeviceAccess'].apply(
-        lambda x: 'n/a' if x == '' else x
-    )
+    result_data_frame['DeviceAccess'] = default_if_empty(result_data_frame, 'DeviceAccess', 'n/a')
 
     result_data_frame['exitWithdrawDateKey'] = to_datetime_key(result_data_frame, 'ExitWithdrawDate')
     result_data_frame['date_now'] = date.today()
     result_data_frame['date_now'] = to_datetime_key(result_data_frame, 'date_now')
 
-    result_data_frame['IsEnrolled'] = (
-        result_data_frame.apply(
-            lambda x: 1
-            if x['exitWithdrawDateKey'] > x['date_now'] or x['exitWithdrawDateKey'] == '' else 0, axis=1
-        )
+    result_data_frame['IsEnrolled'] = to_flag(
+        (result_data_frame['exitWithdrawDateKey'] > result_data_frame['date_now'])
+        | (result_data_frame['exitWithdrawDateKey'] == '')
     )
 
     return result_data_frame[
@@ -593,5 +573,6 @@ def all_student_school_dim(school_year) -> data_frame_generation_result:
     return all_student_school_dim_data_frame(
         file_name="allStudentSchoolDim.parquet",
         columns=RESULT_COLUMNS,
+        column_types=RESULT_COLUMN_TYPES,
         school_year=school_year
     )
@@ -13,15 +13,18 @@ from edfi_amt_data_lake.helper.data_frame_generation_result import (
 from edfi_amt_data_lake.parquet.Common.descriptor_mapping import get_descriptor_constant
 from edfi_amt_data_lake.parquet.Common.functions import getEndpointJson
 from edfi_amt_data_lake.parquet.Common.pandasWrapper import (
+    CATEGORY,
     create_parquet_file,
     get_descriptor_code_value_from_uri,
     is_data_frame_empty,
+    join_columns,
     jsonNormalize,
     pdMerge,
     renameColumns,
     replace_null,
     subset,
     to_datetime_key,
+    to_flag,
 )
 
 ENDPOINT_STUDENT_PARENT_ASSOCIATIONS = 'studentParentAssociations'
@@ -52,6 +55,11 @@ RESULT_COLUMNS = [
     'PostalCode'
 ]
 
+RESULT_COLUMN_TYPES = {
+    'RelationshipToStudent': CATEGORY,
+    'PrimaryEmailAddress': CATEGORY
+}
+
 
 @create_parquet_file
 def contact_person_dim_dataframe(
@@ -168,8 +176,9 @@ def contact_person_dim_dataframe(
         parents_address_normalize['streetNumberName']
     )
 
-    parents_address_normalize["Address"] = parents_address_normalize.apply(
-        lambda r: (r["Address"] + ', ' + r["apartmentRoomSuiteNumber"]) if r["apartmentRoomSuiteNumber"] != '' else r["Address"], axis=1
+    parents_address_normalize["Address"] = parents_address_normalize["Address"].where(
+        parents_address_normalize["apartmentRoomSuiteNumber"] == '',
+        join_columns(parents_address_normalize, ["Address", "apartmentRoomSuiteNumber"], ', ')
     )
 
     parents_address_normalize["Address"] = (
@@ -452,13 +461,13 @@ def contact_person_dim_dataframe(
     result_data_frame['PrimaryEmailAddress'] = 'Not specified'
 
     # Parent Email - Work Email - Primary Email Address - Work
-    result_data_frame["PrimaryEmailAddress"] = result_data_frame.apply(
-        lambda r: ('Work') if r["primaryEmailAddressIndicator"] is True else 'Not specified', axis=1
+    result_data_frame["PrimaryEmailAddress"] = to_flag(
+        result_data_frame["primaryEmailAddressIndicator"].eq(True), 'Work', 'Not specified'
     )
 
     # Parent Email - Work Email - Primary Email Address - Personal
-    result_data_frame["PrimaryEmailAddress"] = result_data_frame.apply(
-        lambda r: ('Personal') if r["primaryEmailAddressIndicator_parents_mails_personal"] is True else 'Not specified', axis=1
+    result_data_frame["PrimaryEmailAddress"] = to_flag(
+        result_data_frame["primaryEmailAddressIndicator_parents_mails_personal"].eq(True), 'Personal', 'Not specified'
     )
 
     result_data_frame = subset(result_data_frame, [
@@ -545,5 +554,6 @@ def contact_person_dim(school_year) -> data_frame_generation_result:
     return contact_person_dim_dataframe(
         file_name="contactPersonDim.parquet",
         columns=RESULT_COLUMNS,
+        column_types=RESULT_COLUMN_TYPES,
         school_year=school_year
     )
@@ -10,6 +10,7 @@ from decouple import config
 
 from edfi_amt_data_lake.parquet.Common.functions import getEndpointJson
 from edfi_amt_data_lake.parquet.Common.pandasWrapper import (
+    CATEGORY,
     addColumnIfNotExists,
     create_parquet_file,
     get_descriptor_code_value_from_uri,
@@ -46,6 +47,13 @@ RESULT_COLUMNS = [
     'LoginId'
 ]
 
+RESULT_COLUMN_TYPES = {
+    'PersonalTitlePrefix': CATEGORY,
+    'Sex': CATEGORY,
+    'Race': CATEGORY,
+    'HighestCompletedLevelOfEducation': CATEGORY
+}
+
 
 @create_parquet_file
 def staff_section_dim_dataframe(
@@ -164,8 +172,8 @@ def staff_section_dim_dataframe(
 
         staff_races_normalized = staff_races_normalized.drop_duplicates(subset='id')
 
-        staff_races_normalized["raceDescriptor"] = staff_races_normalized.apply(
-            lambda r: ('Multiracial') if r["raceDescriptor_count"] > 1 else r['raceDescriptor'], axis=1
+        staff_races_normalized["raceDescriptor"] = staff_races_normalized["raceDescriptor"].mask(
+            staff_races_normalized["raceDescriptor_count"] > 1, 'Multiracial'
         )
 
         staff_normalized = pdMerge(
@@ -265,5 +273,6 @@ def staff_section_dim(school_year) -> None:
     return staff_section_dim_dataframe(
         file_name="staffSectionDim.parquet",
         columns=RESULT_COLUMNS,
+        column_types=RESULT_COLUMN_TYPES,
         school_year=school_year
     )
@@ -13,6 +13,7 @@ from edfi_amt_data_lake.parquet.Common.functions import getEndpointJson
 from edfi_amt_data_lake.parquet.Common.pandasWrapper import (
     addColumnIfNotExists,
     create_parquet_file,
+    explode_items,
     get_descriptor_code_value_from_uri,
     get_reference_from_href,
     is_data_frame_empty,
@@ -318,7 +319,6 @@ def get_student_demographic(content, item) -> pd.DataFrame:
             'descriptor_periods.endDate',
             ''
         )
-        student_demographic_descriptor_normalize['descriptor_periods'] = student_demographic_descriptor_normalize['descriptor_periods.endDate'].explode().apply(pd.Series)
         addColumnIfNotExists(
             student_demographic_descriptor_normalize,
             'endDate',
@@ -342,8 +342,11 @@ def get_student_demographic(content, item) -> pd.DataFrame:
     if not student_demographic_descriptor_normalize.empty:
         if derived_path != '':
             derived_column = f'descriptor_{derived_path}'
-            student_demographic_descriptor_normalize_derived = student_demographic_descriptor_normalize.copy()
-            student_demographic_descriptor_normalize_derived[derived_column] = student_demographic_descriptor_normalize[derived_column].explode().apply(pd.Series)
+            # One row for each derived descriptor of a descriptor, like each use of a
+            # language.
+            student_demographic_descriptor_normalize_derived = explode_items(
+                student_demographic_descriptor_normalize, derived_column, item['derived_descriptor']
+            )
             student_demographic_descriptor_normalize_derived.loc[
                 student_demographic_descriptor_normalize_derived[derived_column].isnull(),
                 derived_column
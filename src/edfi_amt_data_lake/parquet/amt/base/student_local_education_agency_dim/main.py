@@ -11,6 +11,7 @@ from decouple import config
 
 from edfi_amt_data_lake.parquet.Common.functions import getEndpointJson
 from edfi_amt_data_lake.parquet.Common.pandasWrapper import (
+    CATEGORY,
     copy_value_by_column,
     create_parquet_file,
     get_descriptor_code_value_from_uri,
@@ -45,6 +46,17 @@ RESULT_COLUMNS = [
     'DigitalDevice',
     'DeviceAccess'
 ]
+
+RESULT_COLUMN_TYPES = {
+    'LimitedEnglishProficiency': CATEGORY,
+    'Sex': CATEGORY,
+    'InternetAccessInResidence': CATEGORY,
+    'InternetAccessTypeInResidence': CATEGORY,
+    'InternetPerformance': CATEGORY,
+    'DigitalDevice': CATEGORY,
+    'DeviceAccess': CATEGORY
+}
+
 INDICATOR_LIST_MAP = [
     {
         'source_column': 'Internet Access In Residence',
@@ -342,5 +354,6 @@ def student_local_education_agency_dim(school_year) -> None:
     return student_local_education_agency_dataframe(
         file_name="studentLocalEducationAgencyDim.parquet",
         columns=RESULT_COLUMNS,
+        column_types=RESULT_COLUMN_TYPES,
         school_year=school_year
     )
@@ -11,6 +11,7 @@ from edfi_amt_data_lake.parquet.amt.base.all_student_school_dim.main import (
     all_student_school_dim,
 )
 from edfi_amt_data_lake.parquet.Common.pandasWrapper import (
+    CATEGORY,
     create_parquet_file,
     is_data_frame_empty,
 )
@@ -36,6 +37,17 @@ RESULT_COLUMNS = [
     'DeviceAccess'
 ]
 
+RESULT_COLUMN_TYPES = {
+    'GradeLevel': CATEGORY,
+    'LimitedEnglishProficiency': CATEGORY,
+    'Sex': CATEGORY,
+    'InternetAccessInResidence': CATEGORY,
+    'InternetAccessTypeInResidence': CATEGORY,
+    'InternetPerformance': CATEGORY,
+    'DigitalDevice': CATEGORY,
+    'DeviceAccess': CATEGORY
+}
+
 
 @create_parquet_file
 def student_school_dim_data_frame(
@@ -62,5 +74,6 @@ def student_school_dim(school_year) -> data_frame_generation_result:
     return student_school_dim_data_frame(
         file_name="studentSchoolDim.parquet",
         columns=RESULT_COLUMNS,
+        column_types=RESULT_COLUMN_TYPES,
         school_year=school_year
     )
@@ -4,13 +4,19 @@
 # See the LICENSE and NOTICES files in the project root for more information.
 
 from datetime import date
+from typing import Iterator
 
 import pandas as pd
+from dagster import get_dagster_logger
 from decouple import config
 
 from edfi_amt_data_lake.helper.data_frame_generation_result import (
     data_frame_generation_result,
 )
+from edfi_amt_data_lake.parquet.Common.chunking import (
+    get_chunk_memory_budget,
+    get_chunk_numbers,
+)
 from edfi_amt_data_lake.parquet.Common.descriptor_mapping import get_descriptor_constant
 from edfi_amt_data_lake.parquet.Common.functions import getEndpointJson
 from edfi_amt_data_lake.parquet.Common.pandasWrapper import (
@@ -25,6 +31,11 @@ from edfi_amt_data_lake.parquet.Common.pandasWrapper import (
     replace_null,
     subset,
     to_datetime_key,
+    to_flag,
+)
+from edfi_amt_data_lake.parquet.Common.parquet_writer import (
+    MonthPartition,
+    ParquetWriterOptions,
 )
 
 ENDPOINT_STUDENT_SCHOOL_ASSOCIATION = 'studentSchoolAssociations'
@@ -46,13 +57,24 @@ RESULT_COLUMNS = [
     'ReportedAsAbsentFromAnySection'
 ]
 
+# Memory taken by each row of a student school association joined to a calendar
+# date of the school while the fact is generated, the peak of a chunk.
+STUDENT_DAY_ROW_BYTES = 1500
+
+# One row per student and day: sorted, the row groups of the other schools and
+# students are skipped on read. Partitioned, a school and month is a file.
+PARQUET_WRITER_OPTIONS = ParquetWriterOptions(
+    sort_by=['SchoolKey', 'StudentKey', 'DateKey'],
+    partition_by=['SchoolKey', MonthPartition('DateKey')]
+)
+
 
 @create_parquet_file
 def chronic_absenteeism_attendance_fact_dataframe(
     file_name: str,
     columns: list[str],
     school_year: int
-) -> pd.DataFrame:
+) -> Iterator[pd.DataFrame]:
     student_school_associations_content = getEndpointJson(ENDPOINT_STUDENT_SCHOOL_ASSOCIATION, config('SILVER_DATA_LOCATION'), school_year)
     student_section_associations_content = getEndpointJson(ENDPOINT_STUDENT_SECTION_ASSOCIATION, config('SILVER_DATA_LOCATION'), school_year)
     student_school_attendance_events_content = getEndpointJson(ENDPOINT_STUDENT_SCHOOL_ATTENDANCE_EVENTS, config('SILVER_DATA_LOCATION'), school_year)
@@ -77,7 +99,7 @@ def chronic_absenteeism_attendance_fact_dataframe(
     )
 
     if is_data_frame_empty(student_school_associations_normalize):
-        return None
+        return
 
     calendar_dates_normalize = jsonNormalize(
         calendar_dates_content,
@@ -94,7 +116,7 @@ def chronic_absenteeism_attendance_fact_dataframe(
     )
 
     if is_data_frame_empty(calendar_dates_normalize):
-        return None
+        return
 
     calendar_dates_calendar_events_normalize = jsonNormalize(
         calendar_dates_content,
@@ -107,7 +129,7 @@ def chronic_absenteeism_attendance_fact_dataframe(
     )
 
     if is_data_frame_empty(calendar_dates_calendar_events_normalize):
-        return None
+        return
 
     calendar_dates_normalize = pdMerge(
         left=calendar_dates_normalize,
@@ -119,6 +141,117 @@ def chronic_absenteeism_attendance_fact_dataframe(
         suffixRight=None
     )
 
+    student_school_attendance_events = jsonNormalize(
+        student_school_attendance_events_content,
+        recordPath=None,
+        meta=[
+            'id',
+            'eventDate',
+            'attendanceEventCategoryDescriptor',
+            ['schoolReference', 'schoolId'],
+            ['studentReference', 'studentUniqueId'],
+            ['sessionReference', 'schoolYear']
+        ],
+        metaPrefix=None,
+        recordPrefix=None,
+        errors='ignore'
+    )
+
+    student_section_attendance_events = jsonNormalize(
+        student_section_attendance_events_content,
+        recordPath=None,
+        meta=[
+            'id',
+            'eventDate',
+            'attendanceEventCategoryDescriptor',
+            ['studentReference', 'studentUniqueId'],
+            ['sectionReference', 'localCourseCode'],
+            ['sectionReference', 'schoolId'],
+            ['sectionReference', 'schoolYear'],
+            ['sectionReference', 'sectionIdentifier'],
+            ['sectionReference', 'sessionName'],
+        ],
+        metaPrefix=None,
+        recordPrefix=None,
+        errors='ignore'
+    )
+
+    student_section_associations_normalize = jsonNormalize(
+        student_section_associations_content,
+        recordPath=None,
+        meta=[
+            'id',
+            'homeroomIndicator',
+            ['studentReference', 'studentUniqueId'],
+            ['sectionReference', 'localCourseCode'],
+            ['sectionReference', 'schoolId'],
+            ['sectionReference', 'schoolYear'],
+            ['sectionReference', 'sectionIdentifier'],
+            ['sectionReference', 'sessionName']
+        ],
+        metaPrefix=None,
+        recordPrefix=None,
+        errors='ignore'
+    )
+
+    chunk_memory_budget = get_chunk_memory_budget()
+    if not chunk_memory_budget:
+        yield _get_attendance_fact(
+            student_school_associations_normalize,
+            calendar_dates_normalize,
+            student_school_attendance_events,
+            student_section_attendance_events,
+            student_section_associations_normalize
+        )[columns]
+        return
+
+    # The rows of a student and school only join the calendar dates, attendance
+    # events and sections of the school and student: a chunk is a few schools, or
+    # the students of a school in ranges, with their calendar dates and events.
+    calendar_dates_by_school = calendar_dates_normalize['calendarReference.schoolId'].value_counts()
+    row_bytes = (
+        student_school_associations_normalize['schoolReference.schoolId'].map(calendar_dates_by_school).fillna(0)
+        * STUDENT_DAY_ROW_BYTES
+    )
+    chunk_numbers, chunks = get_chunk_numbers(
+        student_school_associations_normalize,
+        'schoolReference.schoolId',
+        'studentReference.studentUniqueId',
+        row_bytes,
+        chunk_memory_budget
+    )
+    get_dagster_logger().info(f'Chronic absenteeism attendance fact in {chunks} chunks.')
+    for chunk_number in range(chunks):
+        student_school_associations = student_school_associations_normalize[chunk_numbers == chunk_number]
+        schools = student_school_associations['schoolReference.schoolId'].unique()
+        students = student_school_associations['studentReference.studentUniqueId'].unique()
+        yield _get_attendance_fact(
+            student_school_associations.copy(),
+            calendar_dates_normalize[calendar_dates_normalize['calendarReference.schoolId'].isin(schools)],
+            student_school_attendance_events[
+                student_school_attendance_events['schoolReference.schoolId'].isin(schools)
+                & student_school_attendance_events['studentReference.studentUniqueId'].isin(students)
+            ].copy(),
+            student_section_attendance_events[
+                student_section_attendance_events['sectionReference.schoolId'].isin(schools)
+                & student_section_attendance_events['studentReference.studentUniqueId'].isin(students)
+            ].copy(),
+            student_section_associations_normalize[
+                student_section_associations_normalize['sectionReference.schoolId'].isin(schools)
+                & student_section_associations_normalize['studentReference.studentUniqueId'].isin(students)
+            ].copy()
+        )[columns]
+
+
+# One row per student, school and instructional day of the student school
+# associations given, with the attendance events of the days.
+def _get_attendance_fact(
+    student_school_associations_normalize: pd.DataFrame,
+    calendar_dates_normalize: pd.DataFrame,
+    student_school_attendance_events: pd.DataFrame,
+    student_section_attendance_events: pd.DataFrame,
+    student_section_associations_normalize: pd.DataFrame
+) -> pd.DataFrame:
     # - CalendarDateCalendarEvent
 
     student_school_associations_normalize['_calendar_dates'] = '|'
@@ -146,22 +279,7 @@ def chronic_absenteeism_attendance_fact_dataframe(
 
     # --- School attendance
 
-    student_attendance_events = jsonNormalize(
-        student_school_attendance_events_content,
-        recordPath=None,
-        meta=[
-            'id',
-            'eventDate',
-            'attendanceEventCategoryDescriptor',
-            ['schoolReference', 'schoolId'],
-            ['studentReference', 'studentUniqueId'],
-            ['sessionReference', 'schoolYear']
-        ],
-        metaPrefix=None,
-        recordPrefix=None,
-        errors='ignore'
-    )
-
+    student_attendance_events = student_school_attendance_events
     student_attendance_events['eventDate'] = to_datetime_key(student_attendance_events, 'eventDate')
 
     student_attendance_events = get_descriptor_constant(student_attendance_events, 'attendanceEventCategoryDescriptor')
@@ -243,25 +361,7 @@ def chronic_absenteeism_attendance_fact_dataframe(
 
     # --- Section attendance
 
-    student_attendance_events = jsonNormalize(
-        student_section_attendance_events_content,
-        recordPath=None,
-        meta=[
-            'id',
-            'eventDate',
-            'attendanceEventCategoryDescriptor',
-            ['studentReference', 'studentUniqueId'],
-            ['sectionReference', 'localCourseCode'],
-            ['sectionReference', 'schoolId'],
-            ['sectionReference', 'schoolYear'],
-            ['sectionReference', 'sectionIdentifier'],
-            ['sectionReference', 'sessionName'],
-        ],
-        metaPrefix=None,
-        recordPrefix=None,
-        errors='ignore'
-    )
-
+    student_attendance_events = student_section_attendance_events
     student_attendance_events['eventDate'] = to_datetime_key(student_attendance_events, 'eventDate')
 
     student_attendance_events = get_descriptor_constant(student_attendance_events, 'attendanceEventCategoryDescriptor')
@@ -317,24 +417,6 @@ def chronic_absenteeism_attendance_fact_dataframe(
         | (result_data_frame['sectionReference.schoolYear'] == '')
     )]
 
-    student_section_associations_normalize = jsonNormalize(
-        student_section_associations_content,
-        recordPath=None,
-        meta=[
-            'id',
-            'homeroomIndicator',
-            ['studentReference', 'studentUniqueId'],
-            ['sectionReference', 'localCourseCode'],
-            ['sectionReference', 'schoolId'],
-            ['sectionReference', 'schoolYear'],
-            ['sectionReference', 'sectionIdentifier'],
-            ['sectionReference', 'sessionName']
-        ],
-        metaPrefix=None,
-        recordPrefix=None,
-        errors='ignore'
-    )
-
     student_section_associations_normalize['_student_section_associations'] = '|'
 
     result_data_frame = pdMerge(
@@ -394,38 +476,27 @@ def chronic_absenteeism_attendance_fact_dataframe(
 
     result_data_frame['StudentSchoolKey'] = result_data_frame['StudentKey'].astype(str) + '-' + result_data_frame['SchoolKey'].astype(str)
 
-    result_data_frame["ReportedAsAbsentFromSchool"] = result_data_frame.apply(
-        lambda r: 1 if r["ReportedAsAbsentFromSchool"] > 0 else 0, axis=1
-    )
+    result_data_frame["ReportedAsAbsentFromSchool"] = to_flag(result_data_frame["ReportedAsAbsentFromSchool"] > 0)
 
-    result_data_frame["ReportedAsPresentAtSchool"] = result_data_frame.apply(
-        lambda r: 1 if r["ReportedAsPresentAtSchool"] > 0 else 0, axis=1
-    )
+    result_data_frame["ReportedAsPresentAtSchool"] = to_flag(result_data_frame["ReportedAsPresentAtSchool"] > 0)
 
-    result_data_frame["ReportedAsAbsentFromHomeRoom"] = result_data_frame.apply(
-        lambda r: 1 if r["ReportedAsAbsentFromHomeRoom"] > 0 else 0, axis=1
-    )
+    result_data_frame["ReportedAsAbsentFromHomeRoom"] = to_flag(result_data_frame["ReportedAsAbsentFromHomeRoom"] > 0)
 
-    result_data_frame["ReportedAsPresentAtHomeRoom"] = result_data_frame.apply(
-        lambda r: 1 if r["ReportedAsPresentAtHomeRoom"] > 0 else 0, axis=1
-    )
+    result_data_frame["ReportedAsPresentAtHomeRoom"] = to_flag(result_data_frame["ReportedAsPresentAtHomeRoom"] > 0)
 
-    result_data_frame["ReportedAsIsPresentInAllSections"] = result_data_frame.apply(
-        lambda r: 1 if r["ReportedAsAbsentFromHomeRoom"] == 0 & r["ReportedAsAbsentFromHomeRoom"] == 1 else 0, axis=1
+    result_data_frame["ReportedAsIsPresentInAllSections"] = to_flag(
+        (result_data_frame["ReportedAsAbsentFromHomeRoom"] == 0) & (result_data_frame["ReportedAsAbsentFromHomeRoom"] == 1)
     )
 
-    result_data_frame["ReportedAsAbsentFromAnySection"] = result_data_frame.apply(
-        lambda r: 1 if r["ReportedAsAbsentFromHomeRoom"] == 1 else 0, axis=1
-    )
+    result_data_frame["ReportedAsAbsentFromAnySection"] = to_flag(result_data_frame["ReportedAsAbsentFromHomeRoom"] == 1)
 
-    return result_data_frame[
-        columns
-    ]
+    return result_data_frame
 
 
 def chronic_absenteeism_attendance_fact(school_year) -> data_frame_generation_result:
     return chronic_absenteeism_attendance_fact_dataframe(
         file_name="chrab_chronicAbsenteeismAttendanceFact.parquet",
         columns=RESULT_COLUMNS,
+        writer_options=PARQUET_WRITER_OPTIONS,
         school_year=school_year
     )
@@ -177,7 +177,6 @@ def student_history_dim_data_frame(
     addColumnIfNotExists(attendance_history, 'AttendanceRate')
     replace_null_empty(attendance_history, 'AttendanceRate', 100)
     attendance_history['AttendanceRate'] = attendance_history['AttendanceRate'].astype(str)
-    attendance_history = attendance_history.set_index(['StudentSchoolKey'])
     ############################
     # Discipline Action
     ############################
@@ -4,7 +4,9 @@
 # See the LICENSE and NOTICES files in the project root for more information.
 
 from datetime import date
+from typing import Optional
 
+import pandas as pd
 from decouple import config
 
 from edfi_amt_data_lake.helper.data_frame_generation_result import (
@@ -26,6 +28,13 @@ from edfi_amt_data_lake.parquet.Common.pandasWrapper import (
     subset,
     to_datetime_key,
 )
+from edfi_amt_data_lake.parquet.Common.parquet_writer import (
+    MonthPartition,
+    ParquetWriterOptions,
+)
+from edfi_amt_data_lake.parquet.Common.student_partitions import (
+    run_by_student_partition,
+)
 
 ENDPOINT_CALENDAR_DATES = 'calendarDates'
 ENDPOINT_DISCIPLINE_INCIDENTS = 'disciplineIncidents'
@@ -57,6 +66,9 @@ RESULT_COLUMNS = [
     'CountByDayOfConductOffenses'
 ]
 
+# A row per student, school and day, partitioned by school and month.
+PARQUET_WRITER_OPTIONS = ParquetWriterOptions(partition_by=['SchoolKey', MonthPartition('DateKey')])
+
 
 @create_parquet_file
 def student_early_warning_fact_data_frame(
@@ -142,29 +154,6 @@ def student_early_warning_fact_data_frame(
         'calendarReference.schoolYear': 'schoolYear'
     })
 
-    ############################
-    # studentSchoolAssociations - calendarDates
-    ############################
-    result_data_frame = pdMerge(
-        left=student_school_association_normalized,
-        right=calendar_dates_normalized,
-        how='inner',
-        leftOn=['schoolId'],
-        rightOn=['schoolId'],
-        suffixLeft='_studentSchoolAssociation',
-        suffixRight='_calendarDates'
-    )
-    if is_data_frame_empty(result_data_frame):
-        return None
-    result_data_frame['exitWithdrawDateKey'] = to_datetime_key(result_data_frame, 'exitWithdrawDate')
-    result_data_frame['dateKey'] = to_datetime_key(result_data_frame, 'date')
-    result_data_frame['entryDateKey'] = to_datetime_key(result_data_frame, 'entryDate')
-    result_data_frame['date_now'] = date.today()
-    result_data_frame['date_now'] = to_datetime_key(result_data_frame, 'date_now')
-    result_data_frame = result_data_frame[result_data_frame['entryDateKey'] <= result_data_frame['dateKey']]
-    result_data_frame = result_data_frame[result_data_frame['exitWithdrawDateKey'] >= result_data_frame['dateKey']]
-    result_data_frame = result_data_frame[result_data_frame['dateKey'] <= result_data_frame['date_now']]
-
     ############################
     # StudentSchoolAttendance
     ############################
@@ -190,36 +179,7 @@ def student_early_warning_fact_data_frame(
         'schoolReference.schoolId': 'schoolId',
         'studentReference.studentUniqueId': 'studentUniqueId'
     })
-    # 'Transpose' Attendance table.
-    student_school_attendance_events_normalized = crossTab(
-        index=[
-            student_school_attendance_events_normalized['schoolId'],
-            student_school_attendance_events_normalized['studentUniqueId'],
-            student_school_attendance_events_normalized['eventDate']
-        ],
-        columns=student_school_attendance_events_normalized['attendanceEventCategoryDescriptor_constantName']).reset_index()
-    # Rename attendance columns
-    student_school_attendance_events_normalized = renameColumns(student_school_attendance_events_normalized, {
-        'AttendanceEvent.Present': 'IsPresentSchool',
-        'AttendanceEvent.ExcusedAbsence': 'IsAbsentFromSchoolExcused',
-        'AttendanceEvent.UnexcusedAbsence': 'IsAbsentFromSchoolUnexcused',
-        'AttendanceEvent.Tardy': 'IsTardyToSchool'
-    })
 
-    ############################
-    # Result - student_school_attendance_events_normalized
-    ############################
-    result_data_frame = pdMerge(
-        left=result_data_frame,
-        right=student_school_attendance_events_normalized,
-        how='left',
-        leftOn=['schoolId', 'studentUniqueId', 'date'],
-        rightOn=['schoolId', 'studentUniqueId', 'eventDate'],
-        suffixLeft='_studentSchoolAssociation',
-        suffixRight='_studentSchoolAttendanceEvents'
-    )
-    if is_data_frame_empty(result_data_frame):
-        return None
     ####################################################################################
     # By Section
     ####################################################################################
@@ -313,6 +273,151 @@ def student_early_warning_fact_data_frame(
         'studentReference.studentUniqueId' : 'studentUniqueId'
     })
 
+    ############################
+    # Discipline Incident
+    ############################
+    discipline_incident_normalized = jsonNormalize(
+        discipline_incident_content,
+        recordPath=None,
+        meta=[
+            'schoolReference.schoolId',
+            'incidentIdentifier',
+            'incidentDate'
+        ],
+        metaPrefix=None,
+        recordPrefix='',
+        errors='ignore'
+    )
+
+    # Select needed columns.
+    discipline_incident_normalized = subset(discipline_incident_normalized, [
+        'schoolReference.schoolId',
+        'incidentIdentifier',
+        'incidentDate'
+    ])
+
+    discipline_incident_normalized = renameColumns(discipline_incident_normalized, {
+        'schoolReference.schoolId': 'schoolId'
+    })
+
+    ############################
+    # Student Discipline Behavior
+    ############################
+    student_discipline_incident_behavior_associations_normalized = jsonNormalize(
+        student_discipline_incident_behavior_associations_content,
+        recordPath=None,
+        meta=[
+            'disciplineIncidentReference.incidentIdentifier',
+            'disciplineIncidentReference.schoolId',
+            'studentReference.studentUniqueId',
+            'behaviorDescriptor'
+        ],
+        metaPrefix=None,
+        recordPrefix='calendarEvents_',
+        errors='ignore'
+    )
+
+    # Select needed columns.
+    student_discipline_incident_behavior_associations_normalized = subset(student_discipline_incident_behavior_associations_normalized, [
+        'disciplineIncidentReference.incidentIdentifier',
+        'disciplineIncidentReference.schoolId',
+        'studentReference.studentUniqueId',
+        'behaviorDescriptor'
+    ])
+
+    student_discipline_incident_behavior_associations_normalized = renameColumns(student_discipline_incident_behavior_associations_normalized, {
+        'disciplineIncidentReference.incidentIdentifier': 'incidentIdentifier',
+        'disciplineIncidentReference.schoolId': 'schoolId',
+        'studentReference.studentUniqueId': 'studentUniqueId'
+    })
+
+    # The rows of a student are only joined to the rows of the same student, and
+    # to the calendar dates and discipline incidents of the schools: the students
+    # are generated in partitions, each one in its own process.
+    return run_by_student_partition(
+        _get_student_early_warning_fact,
+        partitioned={
+            'student_school_association_normalized': (student_school_association_normalized, 'studentUniqueId'),
+            'student_school_attendance_events_normalized': (student_school_attendance_events_normalized, 'studentUniqueId'),
+            'student_section_associations_normalized': (student_section_associations_normalized, 'studentUniqueId'),
+            'student_section_attendance_events_normalized': (student_section_attendance_events_normalized, 'studentUniqueId'),
+            'student_discipline_incident_behavior_associations_normalized': (
+                student_discipline_incident_behavior_associations_normalized, 'studentUniqueId'
+            )
+        },
+        shared={
+            'calendar_dates_normalized': calendar_dates_normalized,
+            'discipline_incident_normalized': discipline_incident_normalized,
+            'columns': columns
+        }
+    )
+
+
+# The fact of the students of the student school associations given.
+def _get_student_early_warning_fact(
+    student_school_association_normalized: pd.DataFrame,
+    calendar_dates_normalized: pd.DataFrame,
+    student_school_attendance_events_normalized: pd.DataFrame,
+    student_section_associations_normalized: pd.DataFrame,
+    student_section_attendance_events_normalized: pd.DataFrame,
+    discipline_incident_normalized: pd.DataFrame,
+    student_discipline_incident_behavior_associations_normalized: pd.DataFrame,
+    columns: list[str]
+) -> Optional[pd.DataFrame]:
+    ############################
+    # studentSchoolAssociations - calendarDates
+    ############################
+    result_data_frame = pdMerge(
+        left=student_school_association_normalized,
+        right=calendar_dates_normalized,
+        how='inner',
+        leftOn=['schoolId'],
+        rightOn=['schoolId'],
+        suffixLeft='_studentSchoolAssociation',
+        suffixRight='_calendarDates'
+    )
+    if is_data_frame_empty(result_data_frame):
+        return None
+    result_data_frame['exitWithdrawDateKey'] = to_datetime_key(result_data_frame, 'exitWithdrawDate')
+    result_data_frame['dateKey'] = to_datetime_key(result_data_frame, 'date')
+    result_data_frame['entryDateKey'] = to_datetime_key(result_data_frame, 'entryDate')
+    result_data_frame['date_now'] = date.today()
+    result_data_frame['date_now'] = to_datetime_key(result_data_frame, 'date_now')
+    result_data_frame = result_data_frame[result_data_frame['entryDateKey'] <= result_data_frame['dateKey']]
+    result_data_frame = result_data_frame[result_data_frame['exitWithdrawDateKey'] >= result_data_frame['dateKey']]
+    result_data_frame = result_data_frame[result_data_frame['dateKey'] <= result_data_frame['date_now']]
+
+    # 'Transpose' Attendance table.
+    student_school_attendance_events_normalized = crossTab(
+        index=[
+            student_school_attendance_events_normalized['schoolId'],
+            student_school_attendance_events_normalized['studentUniqueId'],
+            student_school_attendance_events_normalized['eventDate']
+        ],
+        columns=student_school_attendance_events_normalized['attendanceEventCategoryDescriptor_constantName']).reset_index()
+    # Rename attendance columns
+    student_school_attendance_events_normalized = renameColumns(student_school_attendance_events_normalized, {
+        'AttendanceEvent.Present': 'IsPresentSchool',
+        'AttendanceEvent.ExcusedAbsence': 'IsAbsentFromSchoolExcused',
+        'AttendanceEvent.UnexcusedAbsence': 'IsAbsentFromSchoolUnexcused',
+        'AttendanceEvent.Tardy': 'IsTardyToSchool'
+    })
+
+    ############################
+    # Result - student_school_attendance_events_normalized
+    ############################
+    result_data_frame = pdMerge(
+        left=result_data_frame,
+        right=student_school_attendance_events_normalized,
+        how='left',
+        leftOn=['schoolId', 'studentUniqueId', 'date'],
+        rightOn=['schoolId', 'studentUniqueId', 'eventDate'],
+        suffixLeft='_studentSchoolAssociation',
+        suffixRight='_studentSchoolAttendanceEvents'
+    )
+    if is_data_frame_empty(result_data_frame):
+        return None
+
     student_section_attendance_events_normalized = crossTab(
         index=[
             student_section_attendance_events_normalized['localCourseCode'],
@@ -488,64 +593,6 @@ def student_early_warning_fact_data_frame(
         suffixRight='_studentSectionAssociationAttendance'
     )
 
-    ############################
-    # Discipline Incident
-    ############################
-    discipline_incident_normalized = jsonNormalize(
-        discipline_incident_content,
-        recordPath=None,
-        meta=[
-            'schoolReference.schoolId',
-            'incidentIdentifier',
-            'incidentDate'
-        ],
-        metaPrefix=None,
-        recordPrefix='',
-        errors='ignore'
-    )
-
-    # Select needed columns.
-    discipline_incident_normalized = subset(discipline_incident_normalized, [
-        'schoolReference.schoolId',
-        'incidentIdentifier',
-        'incidentDate'
-    ])
-
-    discipline_incident_normalized = renameColumns(discipline_incident_normalized, {
-        'schoolReference.schoolId': 'schoolId'
-    })
-
-    ############################
-    # Student Discipline Behavior
-    ############################
-    student_discipline_incident_behavior_associations_normalized = jsonNormalize(
-        student_discipline_incident_behavior_associations_content,
-        recordPath=None,
-        meta=[
-            'disciplineIncidentReference.incidentIdentifier',
-            'disciplineIncidentReference.schoolId',
-            'studentReference.studentUniqueId',
-            'behaviorDescriptor'
-        ],
-        metaPrefix=None,
-        recordPrefix='calendarEvents_',
-        errors='ignore'
-    )
-
-    # Select needed columns.
-    student_discipline_incident_behavior_associations_normalized = subset(student_discipline_incident_behavior_associations_normalized, [
-        'disciplineIncidentReference.incidentIdentifier',
-        'disciplineIncidentReference.schoolId',
-        'studentReference.studentUniqueId',
-        'behaviorDescriptor'
-    ])
-
-    student_discipline_incident_behavior_associations_normalized = renameColumns(student_discipline_incident_behavior_associations_normalized, {
-        'disciplineIncidentReference.incidentIdentifier': 'incidentIdentifier',
-        'disciplineIncidentReference.schoolId': 'schoolId',
-        'studentReference.studentUniqueId': 'studentUniqueId'
-    })
-
     result_discipline_dataFrame = pdMerge(
         left=discipline_incident_normalized,
         right=student_discipline_incident_behavior_associations_normalized,
@@ -641,5 +688,6 @@ def student_early_warning_fact(school_year) -> data_frame_generation_result:
     return student_early_warning_fact_data_frame(
         file_name="ews_StudentEarlyWarningFact.parquet",
         columns=RESULT_COLUMNS,
+        writer_options=PARQUET_WRITER_OPTIONS,
         school_year=school_year
     )
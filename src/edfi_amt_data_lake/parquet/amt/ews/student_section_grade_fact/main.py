@@ -8,6 +8,7 @@ from decouple import config
 from edfi_amt_data_lake.parquet.Common.descriptor_mapping import get_descriptor_constant
 from edfi_amt_data_lake.parquet.Common.functions import getEndpointJson
 from edfi_amt_data_lake.parquet.Common.pandasWrapper import (
+    CATEGORY,
     addColumnIfNotExists,
     create_parquet_file,
     createDataFrame,
@@ -19,6 +20,7 @@ from edfi_amt_data_lake.parquet.Common.pandasWrapper import (
     subset,
     toDateTime,
 )
+from edfi_amt_data_lake.parquet.Common.parquet_writer import ParquetWriterOptions
 
 RESULT_COLUMNS = [
     'StudentKey',
@@ -31,6 +33,15 @@ RESULT_COLUMNS = [
     'GradeType'
 
 ]
+
+RESULT_COLUMN_TYPES = {
+    'LetterGradeEarned': CATEGORY,
+    'GradeType': CATEGORY
+}
+
+# Grades of a school written together, by student and grading period.
+PARQUET_WRITER_OPTIONS = ParquetWriterOptions(sort_by=['SchoolKey', 'StudentKey', 'GradingPeriodKey'])
+
 ENDPOINT_GRADES = 'grades'
 GRADING_PERIOD = 'gradingPeriods'
 GRADING_PERIOD_DESCRIPTOR_GRADES = 'gradingPeriodDescriptors'
@@ -246,5 +257,7 @@ def student_section_grade_fact(school_year: int):
     return student_section_grade_fact_data_frame(
         file_name="ews_studentSectionGradeFact.parquet",
         columns=RESULT_COLUMNS,
+        column_types=RESULT_COLUMN_TYPES,
+        writer_options=PARQUET_WRITER_OPTIONS,
         school_year=school_year
     )
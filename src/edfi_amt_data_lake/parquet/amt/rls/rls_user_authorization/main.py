@@ -170,10 +170,10 @@ def rls_user_authorization_dataframe(
     ############################
     # Filters
     ############################
-    result_section_data_frame["UserScope_DistrictOrSchool"] = result_section_data_frame.apply(
-        lambda r: (True)
-        if r['staffClassificationDescriptor_constantName'] == 'AuthorizationScope.School'
-        or r['staffClassificationDescriptor_constantName'] == 'AuthorizationScope.District' else False, axis=1
+    result_section_data_frame["UserScope_DistrictOrSchool"] = (
+        result_section_data_frame['staffClassificationDescriptor_constantName'].isin(
+            ['AuthorizationScope.School', 'AuthorizationScope.District']
+        )
     )
 
     result_section_data_frame['date_now'] = date.today()
@@ -183,10 +183,14 @@ def rls_user_authorization_dataframe(
     )
     result_section_data_frame['endDateKey_staff_section_association'] = result_section_data_frame['endDateKey_staff_section_association'].fillna('')
 
-    result_section_data_frame["Result"] = result_section_data_frame.apply(
-        lambda r: (True)
-        if (r['endDateKey_staff_section_association'] >= r['date_now']
-            and r['id']) or r['UserScope_DistrictOrSchool'] else False, axis=1)
+    # A missing id is a NaN, which is true.
+    result_section_data_frame["Result"] = (
+        (
+            (result_section_data_frame['endDateKey_staff_section_association'] >= result_section_data_frame['date_now'])
+            & result_section_data_frame['id'].astype(bool)
+        )
+        | result_section_data_frame['UserScope_DistrictOrSchool']
+    )
 
     result_section_data_frame = result_section_data_frame[result_section_data_frame['Result']]
 
@@ -4,6 +4,7 @@
 # See the LICENSE and NOTICES files in the project root for more information.
 
 from datetime import date
+from typing import Optional
 
 import pandas as pd
 from decouple import config
@@ -11,6 +12,7 @@ from decouple import config
 from edfi_amt_data_lake.parquet.Common.descriptor_mapping import get_descriptor_constant
 from edfi_amt_data_lake.parquet.Common.functions import getEndpointJson
 from edfi_amt_data_lake.parquet.Common.pandasWrapper import (
+    CATEGORY,
     addColumnIfNotExists,
     create_parquet_file,
     get_reference_from_href,
@@ -33,18 +35,78 @@ RESULT_COLUMNS = [
     'StudentKey'
 ]
 
+# Every user and student is repeated in many pairs, each one is kept once.
+RESULT_COLUMN_TYPES = {
+    'UserKey': CATEGORY,
+    'StudentKey': CATEGORY
+}
 
-@create_parquet_file
-def rls_user_student_data_authorization_dataframe(
-    file_name: str,
-    columns: list[str],
-    school_year: int
-):
-    file_name = file_name
+USER_SCOPE_RESULT_COLUMNS = [
+    'UserKey',
+    'ScopeKey',
+    'Scope'
+]
+
+USER_SCOPE_RESULT_COLUMN_TYPES = {
+    'Scope': CATEGORY
+}
+
+SCOPE_STUDENT_RESULT_COLUMNS = [
+    'ScopeKey',
+    'StudentKey'
+]
+
+SCOPE_STUDENT_RESULT_COLUMN_TYPES = {
+    'ScopeKey': CATEGORY
+}
+
+SCOPE_DISTRICT = 'District'
+SCOPE_SCHOOL = 'School'
+SCOPE_SECTION = 'Section'
+
+RLS_FORMAT_PAIRS = 'pairs'
+RLS_FORMAT_SCOPES = 'scopes'
+RLS_FORMAT_BOTH = 'both'
+
+
+# The scopes of each user (rls_UserScopeAuthorization) and the students of each
+# scope (rls_ScopeStudentAuthorization) are always written, the pairs expand from
+# them. pairs and both: the UserKey-StudentKey pairs
+# (rls_UserStudentDataAuthorization) too, scopes: the scopes only.
+def get_rls_authorization_format() -> str:
+    rls_format = config('RLS_AUTHORIZATION_FORMAT', default=RLS_FORMAT_PAIRS).lower()
+    return rls_format if rls_format in [RLS_FORMAT_SCOPES, RLS_FORMAT_BOTH] else RLS_FORMAT_PAIRS
+
+
+def is_user_student_pairs_enabled() -> bool:
+    return get_rls_authorization_format() in [RLS_FORMAT_PAIRS, RLS_FORMAT_BOTH]
+
+
+# The assignments of the staff of a scope, once per user and education organization.
+def get_scope_staff(staff_edorg_assignment_association: pd.DataFrame, scope: str, scope_columns: list) -> pd.DataFrame:
+    return subset(
+        staff_edorg_assignment_association[
+            staff_edorg_assignment_association['staffClassificationDescriptor_constantName'].str.contains(scope)
+        ],
+        scope_columns
+    ).drop_duplicates()
+
+
+# The user of each grant gets every student of its scope.
+def _add_scope_key(data: pd.DataFrame, scope: str, scope_columns: list) -> pd.DataFrame:
+    data = data.copy()
+    data['ScopeKey'] = scope
+    for column in scope_columns:
+        data['ScopeKey'] = data['ScopeKey'] + '-' + data[column].astype(str)
+    data['Scope'] = scope
+    return data
+
+
+# The scopes granted to the users (UserKey, ScopeKey, Scope): the districts and
+# schools of their assignments in effect today and the sections of the staff with a
+# section scope. The staff of a scope is read once per education organization.
+def get_user_scopes(school_year) -> pd.DataFrame:
     staff_edorg_assignment_association_content = getEndpointJson(ENDPOINT_STAFF_EDORG_ASSIGNMENT_ASSOCIATION, config('SILVER_DATA_LOCATION'), school_year)
-    student_school_association_content = getEndpointJson(ENDPOINT_STUDENT_SCHOOL_ASSOCIATION, config('SILVER_DATA_LOCATION'), school_year)
-    school_content = getEndpointJson(ENDPOINT_SCHOOL, config('SILVER_DATA_LOCATION'), school_year)
-    student_section_association_content = getEndpointJson(ENDPOINT_STUDENT_SECTION_ASSOCIATION, config('SILVER_DATA_LOCATION'), school_year)
     staff_section_association_content = getEndpointJson(ENDPOINT_STAFF_SECTION_ASSOCIATION, config('SILVER_DATA_LOCATION'), school_year)
     ############################
     # staffEducationOrganizationAssignmentAssociations
@@ -93,14 +155,9 @@ def rls_user_student_data_authorization_dataframe(
     staff_edorg_assignment_association_normalize['endDateKey'] = (
         to_datetime_key(staff_edorg_assignment_association_normalize, 'endDate')
     )
-    staff_edorg_assignment_association_normalize['date_now'] = date.today()
-    staff_edorg_assignment_association_normalize['date_now'] = (
-        to_datetime_key(staff_edorg_assignment_association_normalize, 'date_now')
-    )
     # Select needed columns.
     staff_edorg_assignment_association_normalize = subset(staff_edorg_assignment_association_normalize, [
         'UserKey',
-        'date_now',
         'endDateKey',
         'edOrgReferenceId',
         'staffClassificationDescriptor_constantName',
@@ -108,6 +165,107 @@ def rls_user_student_data_authorization_dataframe(
         'staffReferenceId'
     ])
     ############################
+    # staff-section
+    ############################
+    staff_section_association_normalize = jsonNormalize(
+        staff_section_association_content,
+        recordPath=None,
+        meta=[
+            'id',
+            'sectionReference.link.href',
+            'staffReference.link.href',
+            'schoolId',
+            'nameOfInstitution'
+        ],
+        metaPrefix=None,
+        recordPrefix=None,
+        errors='ignore'
+    )
+    get_reference_from_href(
+        staff_section_association_normalize,
+        'sectionReference.link.href',
+        'sectionReferenceId',
+    )
+    get_reference_from_href(
+        staff_section_association_normalize,
+        'staffReference.link.href',
+        'staffReferenceId',
+    )
+    # Select needed columns.
+    staff_section_association_normalize = subset(staff_section_association_normalize, [
+        'sectionReferenceId',
+        'staffReferenceId',
+    ]).drop_duplicates()
+    ############################
+    # Active assignments
+    ############################
+    date_now = date.today().strftime('%Y%m%d')
+    active_staff_edorg_assignment_association = staff_edorg_assignment_association_normalize[
+        staff_edorg_assignment_association_normalize['endDateKey'] >= date_now
+    ]
+    ############################
+    # District -> EdOrg = LEA
+    ############################
+    district_scope = _add_scope_key(
+        get_scope_staff(
+            active_staff_edorg_assignment_association,
+            'AuthorizationScope.District',
+            ['UserKey', 'edOrgReferenceId']
+        ),
+        SCOPE_DISTRICT,
+        ['edOrgReferenceId']
+    )
+    ############################
+    # School -> EdOrg = School
+    ############################
+    school_scope = _add_scope_key(
+        get_scope_staff(
+            active_staff_edorg_assignment_association,
+            'AuthorizationScope.School',
+            ['UserKey', 'edOrgReferenceId']
+        ),
+        SCOPE_SCHOOL,
+        ['edOrgReferenceId']
+    )
+    ############################
+    # Section -> EdOrg = Section
+    ############################
+    # The section scope is given by the sections of the staff, whatever the end
+    # date of the assignment.
+    section_scope = pdMerge(
+        left=get_scope_staff(
+            staff_edorg_assignment_association_normalize,
+            'AuthorizationScope.Section',
+            ['UserKey', 'staffReferenceId', 'educationOrganizationId']
+        ),
+        right=staff_section_association_normalize,
+        how='inner',
+        leftOn=['staffReferenceId'],
+        rightOn=['staffReferenceId'],
+        suffixLeft=None,
+        suffixRight=None
+    )
+    section_scope = _add_scope_key(
+        subset(section_scope, ['UserKey', 'educationOrganizationId', 'sectionReferenceId']).drop_duplicates(),
+        SCOPE_SECTION,
+        ['sectionReferenceId', 'educationOrganizationId']
+    )
+    user_scope = pd_concat([
+        subset(scope, USER_SCOPE_RESULT_COLUMNS) for scope in [district_scope, school_scope, section_scope]
+    ])
+    return user_scope.drop_duplicates().sort_values(USER_SCOPE_RESULT_COLUMNS, ignore_index=True)
+
+
+# The students enrolled today in the scopes granted (ScopeKey, StudentKey): a
+# district is its schools, a school its students and a section the students of the
+# section. The schools and sections are given their ScopeKey like the scopes of the
+# users, only the ones granted are joined to the students.
+def get_scope_students(user_scope: pd.DataFrame, school_year) -> pd.DataFrame:
+    student_school_association_content = getEndpointJson(ENDPOINT_STUDENT_SCHOOL_ASSOCIATION, config('SILVER_DATA_LOCATION'), school_year)
+    school_content = getEndpointJson(ENDPOINT_SCHOOL, config('SILVER_DATA_LOCATION'), school_year)
+    student_section_association_content = getEndpointJson(ENDPOINT_STUDENT_SECTION_ASSOCIATION, config('SILVER_DATA_LOCATION'), school_year)
+    granted_scopes = user_scope['ScopeKey'].unique()
+    ############################
     # school
     ############################
     school_normalize = jsonNormalize(
@@ -222,95 +380,38 @@ def rls_user_student_data_authorization_dataframe(
         'sectionReferenceId'
     ])
     ############################
-    # staff-section
+    # Active enrollments
     ############################
-    staff_section_association_normalize = jsonNormalize(
-        staff_section_association_content,
-        recordPath=None,
-        meta=[
-            'id',
-            'sectionReference.link.href',
-            'staffReference.link.href',
-            'schoolId',
-            'nameOfInstitution'
-        ],
-        metaPrefix=None,
-        recordPrefix=None,
-        errors='ignore'
-    )
-    get_reference_from_href(
-        staff_section_association_normalize,
-        'sectionReference.link.href',
-        'sectionReferenceId',
-    )
-    get_reference_from_href(
-        staff_section_association_normalize,
-        'staffReference.link.href',
-        'staffReferenceId',
-    )
-    # Select needed columns.
-    staff_section_association_normalize = subset(staff_section_association_normalize, [
-        'sectionReferenceId',
-        'staffReferenceId',
-    ]).drop_duplicates()
+    date_now = date.today().strftime('%Y%m%d')
+    student_school_association_normalize = student_school_association_normalize[
+        student_school_association_normalize['exitWithdrawDateKey'] >= date_now
+    ]
+    student_section_association_normalize = student_section_association_normalize[
+        student_section_association_normalize['sectionEndDateKey'] >= date_now
+    ]
     ############################
     # District -> EdOrg = LEA
     ############################
-    result_district_data_frame = renameColumns(staff_edorg_assignment_association_normalize, {
-        'edOrgReferenceId': 'localEducationAgencyReferenceId',
-    })
-    result_district_data_frame.reset_index()
-    result_district_data_frame = pdMerge(
-        left=result_district_data_frame,
-        right=school_normalize,
-        how='inner',
-        leftOn=['localEducationAgencyReferenceId'],
-        rightOn=['localEducationAgencyReferenceId'],
-        suffixLeft=None,
-        suffixRight=None
-    )
-    result_district_data_frame = pdMerge(
-        left=result_district_data_frame,
+    district_school = _add_scope_key(school_normalize, SCOPE_DISTRICT, ['localEducationAgencyReferenceId'])
+    district_student = pdMerge(
+        left=subset(
+            district_school[district_school['ScopeKey'].isin(granted_scopes)], ['ScopeKey', 'schoolReferenceId']
+        ).drop_duplicates(),
         right=student_school_association_normalize,
         how='inner',
         leftOn=['schoolReferenceId'],
         rightOn=['schoolReferenceId'],
-        suffixLeft='district_',
-        suffixRight="school_"
+        suffixLeft=None,
+        suffixRight=None
     )
-    if not (result_district_data_frame is None):
-        result_district_data_frame = (
-            result_district_data_frame[
-                (result_district_data_frame['staffClassificationDescriptor_constantName'].str.contains('AuthorizationScope.District'))
-            ]
-        )
-        result_district_data_frame = (
-            result_district_data_frame[result_district_data_frame['endDateKey'] >= result_district_data_frame['date_now']]
-        )
-        result_district_data_frame = (
-            result_district_data_frame[result_district_data_frame['exitWithdrawDateKey'] >= result_district_data_frame['date_now']]
-        )
-        # Select needed columns.
-        result_district_data_frame = subset(result_district_data_frame, [
-            'UserKey',
-            'StudentKey'
-        ]).drop_duplicates()
-    else:
-        result_district_data_frame = pd.DataFrame(columns=columns)
     ############################
     # School -> EdOrg = School
     ############################
-    result_school_data_frame = pdMerge(
-        left=staff_edorg_assignment_association_normalize,
-        right=school_normalize,
-        how='inner',
-        leftOn=['edOrgReferenceId'],
-        rightOn=['schoolReferenceId'],
-        suffixLeft=None,
-        suffixRight=None
-    )
-    result_school_data_frame = pdMerge(
-        left=result_school_data_frame,
+    school_school = _add_scope_key(school_normalize, SCOPE_SCHOOL, ['schoolReferenceId'])
+    school_student = pdMerge(
+        left=subset(
+            school_school[school_school['ScopeKey'].isin(granted_scopes)], ['ScopeKey', 'schoolReferenceId', 'schoolKey']
+        ).drop_duplicates(),
         right=student_school_association_normalize,
         how='inner',
         leftOn=['schoolReferenceId', 'schoolKey'],
@@ -318,55 +419,16 @@ def rls_user_student_data_authorization_dataframe(
         suffixLeft=None,
         suffixRight=None
     )
-
-    if not (result_school_data_frame is None):
-        result_school_data_frame = (
-            result_school_data_frame[
-                (result_school_data_frame['staffClassificationDescriptor_constantName'].str.contains('AuthorizationScope.School'))
-            ]
-        )
-        result_school_data_frame = (
-            result_school_data_frame[result_school_data_frame['endDateKey'] >= result_school_data_frame['date_now']]
-        )
-        result_school_data_frame = (
-            result_school_data_frame[result_school_data_frame['exitWithdrawDateKey'] >= result_school_data_frame['date_now']]
-        )
-        # Select needed columns.
-        result_school_data_frame = subset(result_school_data_frame, [
-            'UserKey',
-            'StudentKey'
-        ]).drop_duplicates()
-    else:
-        result_school_data_frame = pd.DataFrame(columns=columns)
     ############################
     # Section -> EdOrg = Section
     ############################
-    result_section_data_frame = pdMerge(
-        left=staff_edorg_assignment_association_normalize,
-        right=staff_section_association_normalize,
-        how='inner',
-        leftOn=['staffReferenceId'],
-        rightOn=['staffReferenceId'],
-        suffixLeft=None,
-        suffixRight=None
+    section_student = _add_scope_key(
+        student_section_association_normalize, SCOPE_SECTION, ['sectionReferenceId', 'schoolKey']
     )
-    result_section_data_frame = pdMerge(
-        left=result_section_data_frame,
-        right=student_section_association_normalize,
-        how='inner',
-        leftOn=[
-            'educationOrganizationId',
-            'sectionReferenceId'
-        ],
-        rightOn=[
-            'schoolKey',
-            'sectionReferenceId'
-        ],
-        suffixLeft=None,
-        suffixRight=None
-    )
-    result_section_data_frame = pdMerge(
-        left=result_section_data_frame,
+    section_student = pdMerge(
+        left=subset(
+            section_student[section_student['ScopeKey'].isin(granted_scopes)], ['ScopeKey', 'schoolKey', 'StudentKey']
+        ).drop_duplicates(),
         right=student_school_association_normalize,
         how='inner',
         leftOn=[
@@ -380,43 +442,86 @@ def rls_user_student_data_authorization_dataframe(
         suffixLeft=None,
         suffixRight=None
     )
-    if not (result_district_data_frame is None):
-        result_section_data_frame = (
-            result_section_data_frame[
-                (result_section_data_frame['staffClassificationDescriptor_constantName'].str.contains('AuthorizationScope.Section'))
-            ]
-        )
-        result_section_data_frame = (
-            result_section_data_frame[result_section_data_frame['sectionEndDateKey'] >= result_section_data_frame['date_now']]
-        )
-        result_section_data_frame = (
-            result_section_data_frame[result_section_data_frame['exitWithdrawDateKey'] >= result_section_data_frame['date_now']]
-        )
-        # Select needed columns.
-        result_section_data_frame = subset(result_section_data_frame, [
-            'UserKey',
-            'StudentKey'
-        ]).drop_duplicates()
-    else:
-        result_section_data_frame = pd.DataFrame(columns=columns)
-    ############################
-    # CONCAT RESULTS
-    ############################
-    result_data_frame = pd_concat(
-        [
-            result_district_data_frame,
-            result_section_data_frame,
-            result_school_data_frame,
-        ],
+    scope_student = pd_concat([
+        subset(student, SCOPE_STUDENT_RESULT_COLUMNS) for student in [district_student, school_student, section_student]
+    ])
+    return scope_student.drop_duplicates().sort_values(SCOPE_STUDENT_RESULT_COLUMNS, ignore_index=True)
+
+
+# The UserKey-StudentKey pairs of the scopes of the users, or only of the users
+# given. One row per user and student, sorted.
+def expand_scope_authorization(user_scope: pd.DataFrame, scope_student: pd.DataFrame, users: Optional[list] = None) -> pd.DataFrame:
+    if users is not None:
+        user_scope = user_scope[user_scope['UserKey'].isin(users)]
+    result_data_frame = pdMerge(
+        left=subset(user_scope, ['UserKey', 'ScopeKey']),
+        right=scope_student,
+        how='inner',
+        leftOn=['ScopeKey'],
+        rightOn=['ScopeKey'],
+        suffixLeft=None,
+        suffixRight=None
     )
-    # Select needed columns.
-    result_data_frame = subset(result_data_frame, columns).drop_duplicates()
-    return result_data_frame
+    return subset(result_data_frame, RESULT_COLUMNS).drop_duplicates().sort_values(RESULT_COLUMNS, ignore_index=True)
+
+
+# The pairs are expanded from the scope views, the scopes are only computed by
+# them.
+@create_parquet_file
+def rls_user_student_data_authorization_dataframe(
+    file_name: str,
+    columns: list[str],
+    school_year: int
+):
+    file_name = file_name
+    user_scope = rls_user_scope_authorization(school_year).data_frame
+    scope_student = rls_scope_student_authorization(school_year).data_frame
+    return expand_scope_authorization(user_scope, scope_student)[columns]
+
+
+@create_parquet_file
+def rls_user_scope_authorization_dataframe(
+    file_name: str,
+    columns: list[str],
+    school_year: int
+):
+    file_name = file_name
+    return get_user_scopes(school_year)[columns]
+
+
+@create_parquet_file
+def rls_scope_student_authorization_dataframe(
+    file_name: str,
+    columns: list[str],
+    school_year: int
+):
+    file_name = file_name
+    user_scope = rls_user_scope_authorization(school_year).data_frame
+    return get_scope_students(user_scope, school_year)[columns]
 
 
 def rls_user_student_data_authorization(school_year) -> None:
     return rls_user_student_data_authorization_dataframe(
         file_name="rls_UserStudentDataAuthorization.parquet",
         columns=RESULT_COLUMNS,
+        column_types=RESULT_COLUMN_TYPES,
+        school_year=school_year
+    )
+
+
+def rls_user_scope_authorization(school_year) -> None:
+    return rls_user_scope_authorization_dataframe(
+        file_name="rls_UserScopeAuthorization.parquet",
+        columns=USER_SCOPE_RESULT_COLUMNS,
+        column_types=USER_SCOPE_RESULT_COLUMN_TYPES,
+        school_year=school_year
+    )
+
+
+def rls_scope_student_authorization(school_year) -> None:
+    return rls_scope_student_authorization_dataframe(
+        file_name="rls_ScopeStudentAuthorization.parquet",
+        columns=SCOPE_STUDENT_RESULT_COLUMNS,
+        column_types=SCOPE_STUDENT_RESULT_COLUMN_TYPES,
         school_year=school_year
     )
@@ -6,36 +6,40 @@
 from dagster import get_dagster_logger
 
 from edfi_amt_data_lake.helper.helper import clean_parquet_folder
-from edfi_amt_data_lake.parquet.amt.asmt.asmt_collection import asmt_collection
-from edfi_amt_data_lake.parquet.amt.base.base_collection import base_collection
-from edfi_amt_data_lake.parquet.amt.chrab.chrab_collection import chrab_collection
-from edfi_amt_data_lake.parquet.amt.engage.engage_collection import engage_collection
-from edfi_amt_data_lake.parquet.amt.epp.epp_collection import epp_collection
-from edfi_amt_data_lake.parquet.amt.equity.equity_collection import equity_collection
-from edfi_amt_data_lake.parquet.amt.ews.ews_collection import ews_collection
-from edfi_amt_data_lake.parquet.amt.qews.qews_collection import qews_collection
-from edfi_amt_data_lake.parquet.amt.rls.rls_collection import rls_collection
+from edfi_amt_data_lake.parquet.amt.amt_planner import (
+    clean_planned_views,
+    is_incremental_generation_enabled,
+    plan_amt_views,
+    save_amt_state,
+)
+from edfi_amt_data_lake.parquet.amt.amt_scheduler import run_amt_views
 
 
-def generate_amt_parquet(school_year) -> None:
+# Returns the names of the views that failed, their parquet files are missing.
+def generate_amt_parquet(school_year) -> list:
     parquet_logger = get_dagster_logger()
     parquet_logger.info(
         '*************************************\n'
         + f'* Start Parquet Generation {school_year}'
         + '\n*************************************'
     )
-    clean_parquet_folder(school_year)
-    asmt_collection(school_year)
-    base_collection(school_year)
-    chrab_collection(school_year)
-    engage_collection(school_year)
-    epp_collection(school_year)
-    equity_collection(school_year)
-    ews_collection(school_year)
-    qews_collection(school_year)
-    rls_collection(school_year)
+    # Only the views whose inputs changed are generated again, the parquet files
+    # of the other views are read.
+    plan = plan_amt_views(school_year)
+    if is_incremental_generation_enabled():
+        clean_planned_views(plan, school_year)
+    else:
+        clean_parquet_folder(school_year)
+    # The views are generated in parallel, each one after the views it reads.
+    failed_views = run_amt_views(plan, school_year)
+    save_amt_state(plan, school_year)
+    if failed_views:
+        parquet_logger.error(
+            f"{len(failed_views)} of {len(plan.views)} views failed: {', '.join(failed_views)}"
+        )
     parquet_logger.info(
         '*************************************\n'
         + f'* Finished Parquet Generation Process {school_year}'
         + '\n*************************************'
     )
+    return failed_views